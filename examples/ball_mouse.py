@@ -5,7 +5,7 @@ game.start()
 ball = game.create_image("ball.gif", (100, 100))
 speed = 4
 
-# mouse button event
+# mouse button event, targeted=False to get clicks anywhere, not just on the ball
 def ball_mouse(ball, buttons):
     if 'left' in buttons:
         ball.move_by((speed, 0))
@@ -13,13 +13,13 @@ def ball_mouse(ball, buttons):
         ball.move_by((-speed, 0))
     elif 'middle' in buttons:
         ball.move_by((speed, 0))
-game.handle(ball.on_mousebutton, ball_mouse)
+game.handle(ball.on_mousebutton, ball_mouse, targeted=False)
 
 # mouse wheel event
 def ball_mousewheel(ball, horizotal_scroll, vertical_scroll,
                     *args):
     ball.move_by((horizotal_scroll, vertical_scroll))
-game.handle(ball.on_mousewheel, ball_mousewheel)
+game.handle(ball.on_mousewheel, ball_mousewheel, targeted=False)
 
 # mouse move event
 def screen_mousemove(noone, pos, *args):
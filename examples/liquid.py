@@ -1,20 +1,16 @@
-import random
-from pygamejr import game, DrawOptions
+from pygamejr import game
 
 game.start(gravity=-900,
            screen_width=600, screen_height=600, screen_color=(0,0,0))
 
 game.create_screen_walls(left=True, right=True, bottom=True)
 
-ball = game.create_circle(center=(300, 800), radius=100, color="red",
-                          mass=100)
+ball = game.create_circle(center=(300, 800), radius=50, color="red",
+                          density=3)
+crate = game.create_rect(width=80, height=50, bottom_left=(80, 450),
+                         color="sienna", density=0.4)
 
-particles = []
-for _ in range(1000):
-    particle = game.create_circle(center=(random.randint(100, 450),
-                                          random.randint(480, 580)),
-                                  radius=3, color="blue",
-                                  mass=1)
-    particles.append(particle)
+water = game.create_fluid(spacing=5, color="dodgerblue")
+water.fill_rect(bottom_left=(0, 0), width=600, height=250)
 
-game.keep_running()
\ No newline at end of file
+game.keep_running()
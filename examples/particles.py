@@ -0,0 +1,23 @@
+import numpy as np
+from pygamejr import game
+
+game.start(gravity=-900, screen_color="black")
+
+game.create_screen_walls(bottom=True)
+game.create_line((300, 300), (700, 200), color="yellow")
+
+# rain falling from top of the screen
+rain = game.create_particles(capacity=20000, size=2, color="skyblue",
+                             lifetime=3, fade=False, collide=True, elasticity=0.2)
+
+# sparks follow the mouse
+sparks = game.create_particles(capacity=5000, size=3, color="orange",
+                               lifetime=1, velocity=(0, 300), velocity_spread=150,
+                               rate=1000, collide=True, elasticity=0.6)
+
+while game.is_running():
+    xs = np.random.uniform(0, game.screen_width(), 100)
+    rain.emit(100, position=np.stack((xs, [game.screen_height()]*100), axis=1),
+              velocity=(0, -200))
+    sparks.position = game.mouse_xy()
+    game.update()
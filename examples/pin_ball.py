@@ -63,14 +63,22 @@ def left_flipper_on_keypress(flipper, keys):
         flipper.apply_impulse(Vec2d.unit() * -40000, (-100,0))
 game.handle(left_flipper.on_keypress, left_flipper_on_keypress)
 
+# balls are recycled instead of created and removed every time
+balls = game.pool(lambda: game.create_circle(ball_radius, color="red",
+                                             mass=1, elasticity=0.95), size=2)
 current_ball = None
+
+# balls that fall below the screen go back to the pool
+def ball_fell(ball):
+    global current_ball
+    current_ball = None
+game.set_world_bounds(bottom_left=(-1000, 0), top_right=(1600, 5000), on_exit=ball_fell)
+
 while game.is_running():
     keys = game.key_pressed()
     if 'space' in keys:
         if current_ball is None:
-            current_ball = game.create_circle(ball_radius, color="red",
-                center=(random.randint(115, 350), 400),
-                mass=1, elasticity=0.95)
+            current_ball = balls.acquire(center=(random.randint(115, 350), 400))
 
     # repostion the flippers
     right_flipper.position = Vec2d(*right_flipper_center)
@@ -79,11 +87,6 @@ while game.is_running():
     left_flipper.velocity = Vec2d(0, 0)
     bar.angular_velocity = min(bar.angular_velocity*0.99, 3600)
 
-    # remove balls that are off the screen
-    if current_ball is not None and current_ball.position.y < 0:
-        game.remove(current_ball)
-        current_ball = None
-
     game.update()
 
 
@@ -0,0 +1,25 @@
+from pygamejr import game
+
+game.start(gravity=-900)
+
+level = game.create_level(friction=0.5)
+level.add_rect(width=game.screen_width(), height=20, bottom_left=(0, 0))
+
+# rope hanging from the ceiling with a ball tied to its end
+rope = game.create_rope((150, 550), (350, 550), segments=25, color="tan", width=3, mass=0.5)
+ball = game.create_circle(15, center=(350, 550), color="red", mass=1)
+game.create_pin_joint(rope[len(rope) - 1], ball)
+
+# chain bridge fixed at both ends
+bridge = game.create_chain((400, 300), (750, 300), links=14, width=8, color="gray", mass=2, fixed_end=True)
+
+# jelly dropped on the bridge
+jelly = game.create_soft_body([(520, 450), (620, 450), (620, 520), (520, 520)],
+                              resolution=12, color="green", mass=1)
+
+def on_keypress(noone, keys):
+    if "space" in keys:
+        ball.apply_impulse((400, 0))
+game.handle(game.noone.on_keypress, on_keypress)
+
+game.keep_running()
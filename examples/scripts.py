@@ -0,0 +1,28 @@
+from pygamejr import game
+
+game.start()
+
+cat = game.create_image("cat.sprite3", center=(300, 300))
+cat.start_animation()
+
+# runs a bit every frame, like a Scratch script
+async def patrol():
+    while True:
+        await cat.glide((900, 300), seconds=2)
+        await game.wait(1)
+        cat.turn_by(180)
+        await cat.glide((300, 300), seconds=2)
+        await game.wait(1)
+        cat.turn_by(180)
+game.start_script(patrol, actor=cat)
+
+# scripts can be generators too, yield sleeps for that many seconds
+def blink():
+    while True:
+        cat.add_text("Meow!")
+        yield 0.5
+        cat.remove_text("Meow!")
+        yield 1.5
+game.start_script(blink())
+
+game.keep_running()
@@ -0,0 +1,29 @@
+from pygamejr import game
+
+game.start(gravity=-900)
+
+# 1 is ground, 2 is brick, first row is the top of the map
+layout = [[0]*80 for _ in range(20)]
+for row in range(17, 20):
+    layout[row] = [1]*80
+for col in range(10, 70, 12):
+    for c in range(col, col+5):
+        layout[12][c] = 2
+    layout[16][col+6] = 2
+
+level = game.create_tilemap(layout, tiles={1: "darkgreen", 2: "mario/bricks.png"},
+                            tile_size=32, friction=1.0)
+
+ball = game.create_circle(15, center=(100, 600), color="red", mass=1, friction=1.0)
+game.camera_follow_actor(ball)
+
+def on_keypress(noone, keys):
+    if "right" in keys:
+        ball.apply_impulse((100, 0))
+    if "left" in keys:
+        ball.apply_impulse((-100, 0))
+    if "up" in keys and ball.is_grounded():
+        ball.apply_impulse((0, 600))
+game.handle(game.noone.on_keypress, on_keypress)
+
+game.keep_running()
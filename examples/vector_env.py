@@ -0,0 +1,64 @@
+import numpy as np
+
+from pygamejr import game
+from pygamejr.envs import Env, VectorEnv
+
+class CatchEnv(Env):
+    """Move the paddle left or right to catch the falling ball"""
+    observation_shape = (4,)
+    action_shape = ()
+    action_dtype = np.int64
+    frames_per_step = 4
+    max_steps = 500
+
+    def start(self):
+        game.start(screen_width=400, screen_height=400, gravity=-300, headless=True)
+
+    def reset(self, rng):
+        self.paddle = game.create_rect(width=80, height=10, bottom_left=(160, 10))
+        self.ball = game.create_circle(radius=8, center=(rng.uniform(20, 380), 390), density=1)
+
+    def act(self, action):
+        # 0 stays, 1 goes left, 2 goes right
+        self.paddle.move_by(((0, -8, 8)[int(action)], 0))
+
+    def outcome(self):
+        ball = self.ball.shape.body.position
+        if ball.y > 30:
+            return 0., False
+        caught = abs(ball.x - self.paddle.shape.body.position.x) < 48
+        return (1. if caught else -1.), True
+
+    def observe(self, out):
+        ball, paddle = self.ball.shape.body, self.paddle.shape.body
+        out[:] = (ball.position.x, ball.position.y, ball.velocity.y, paddle.position.x)
+
+class CatchPixelsEnv(CatchEnv):
+    """Same game seen as 32x32 grayscale pixels, drawn straight into the shared observations"""
+    observation_shape = (32, 32)
+    observation_dtype = np.uint8
+    pixels = None
+
+    def observe(self, out):
+        if self.pixels is None or not np.may_share_memory(self.pixels.array, out):
+            self.pixels = game.create_observation(32, 32, grayscale=True, out=out)
+        game.render_observation(self.pixels)
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    with VectorEnv(CatchEnv, num_envs=16, processes=2) as envs:
+        observations = envs.reset()
+        returns = np.zeros(envs.num_envs)
+        for step in range(300):
+            # follow the ball, a little randomly
+            actions = np.where(observations[:, 0] < observations[:, 3], 1, 2)
+            actions[rng.random(envs.num_envs) < 0.2] = 0
+            observations, rewards, terminated, truncated = envs.step(actions)
+            returns += rewards
+        print("return per env over 300 steps:", returns)
+
+    with VectorEnv(CatchPixelsEnv, num_envs=16, processes=2) as envs:
+        frames = envs.reset()
+        for step in range(100):
+            frames, rewards, terminated, truncated = envs.step(rng.integers(0, 3, envs.num_envs))
+        print("pixel observations:", frames.shape, frames.dtype, "ball and paddle pixels:", (frames[0] < 255).sum())
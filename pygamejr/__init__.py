@@ -1 +1 @@
-from pygamejr.common import Vector2, ImagePaintMode, DrawOptions, Vec2d
\ No newline at end of file
+from pygamejr.common import Vector2, ImagePaintMode, DrawOptions, Vec2d, BoundsAction
\ No newline at end of file
@@ -2,6 +2,8 @@ from typing import Any, Dict, List, Optional, Set, Tuple, Union, Iterable, Calla
 import math
 import timeit
 
+import numpy as np
+
 import pygame
 import pymunk
 from pymunk import pygame_util, Vec2d
@@ -11,6 +13,10 @@ from pygamejr.common import PyGameColor, AnimationSpec, TextInfo,  \
                             DrawOptions, ImagePaintMode, Camera, draw_shape, \
                             Grounding
 from pygamejr import common
+from pygamejr import contacts
+from pygamejr import bullets
+from pygamejr import scripts
+from pygamejr import layers
 
 
 class Actor:
@@ -117,6 +123,20 @@ class Actor:
     @group.setter
     def group(self, value:int):
         self.shape.group = value
+    @property
+    def bullet(self)->bool:
+        """Fast moving actor that is swept along its path so it doesn't pass through thin things"""
+        return bullets.is_bullet(self.shape)
+    @bullet.setter
+    def bullet(self, value:bool):
+        bullets.set_bullet(self.shape, value)
+    @property
+    def layer(self)->str:
+        return layers.collision_layers.layer_of(self.shape)
+    @layer.setter
+    def layer(self, value:str):
+        collision_layers = layers.collision_layers # of the current world
+        collision_layers.apply(self.shape, value, can_collide=collision_layers.can_collide(self.shape))
 
     def apply_force(self, force:Coordinates, local_point:Coordinates=(0,0))->None:
         self.shape.body.apply_force_at_local_point(force, local_point)
@@ -191,6 +211,23 @@ class Actor:
             target_vector = target_vector.normalized() * speed
             self.shape.body.position = self.shape.body.position + target_vector
 
+    def glide(self, xy:Coordinates, seconds:float=1.0):
+        """
+        Move the body to a new position over seconds of game time, for scripts:
+        await actor.glide(xy, seconds) or yield from actor.glide(xy, seconds)
+        """
+        body, end = self.shape.body, Vec2d(*xy)
+        start = body.position
+        def move(t:float)->None:
+            nonlocal start
+            if t == 0.:
+                start = body.position # start from wherever the body is when glide begins
+            body.position = start + (end - start) * t
+            body.velocity = Vec2d.zero()
+            if body.space is not None:
+                body.space.reindex_shapes_for_body(body)
+        return scripts.tween(seconds, move)
+
     def move_by(self, delta:Coordinates)->None:
         """Move the body by a vector."""
         self.shape.body.position = self.shape.body.position + Vec2d(*delta)
@@ -223,22 +260,49 @@ class Actor:
         return query_result.distance <= 0
 
 
-    def touches(self, other:Optional[Union['Actor', Sequence['Actor']]])->bool:
-        if self.shape.space is None:
-            return False
+    def _exact_contacts(self, exact:Optional[bool])->bool:
+        """Should contacts come from fresh shape query instead of last physics step?"""
+        if exact is None:
+            # solver doesn't make contacts between kinematic and static bodies so these
+            # are usually moved by hand and need exact query
+            return self.shape.body.body_type != pymunk.Body.DYNAMIC
+        return exact
 
-        colliding_shapes = self.shape.space.shape_query(self.shape)
+    def touches(self, other:Optional[Union['Actor', Sequence['Actor']]]=None,
+                exact:Optional[bool]=None)->bool:
+        """
+        Does actor touch other actor, any of other actors or anything at all if other is None?
+        Contacts are read from last physics step unless exact is True, by default exact
+        query is used for actors that are not dynamic.
+        """
+        space = self.shape.space
+        if space is None:
+            return False
 
         if other  is None:
             other = []
         elif not isinstance(other, Sequence):
             other = [other]
 
+        if self._exact_contacts(exact):
+            colliding_shapes = space.shape_query(self.shape)
+            if len(other) == 0:
+                return len(colliding_shapes) > 0
+            else:
+                other_shapes = {o.shape:o for o in other}
+                return any(other_shapes[s.shape] for s in colliding_shapes if s.shape in other_shapes)
+
+        graph = contacts.graph_of(space)
+        body = self.shape.body
         if len(other) == 0:
-            return len(colliding_shapes) > 0
-        else:
-            other_shapes = {o.shape:o for o in other}
-            return any(other_shapes[s.shape] for s in colliding_shapes if s.shape in other_shapes)
+            return graph.degree(body) > 0
+        for o in other:
+            if graph.touches(body, o.shape.body):
+                # level geometry and compounds share a body so check the shape itself
+                if (o.shape.body is not space.static_body and len(o.shape.body.shapes) == 1) or \
+                        any(s.shape is o.shape for s in space.shape_query(self.shape)):
+                    return True
+        return False
 
     def distance_to(self, xy:Coordinates)->float:
         """Return the distance to another sprite."""
@@ -295,8 +359,7 @@ class Actor:
                 self.set_cosume(None)
 
     def update(self)->None:
-        if self.current_costume is not None:
-            self.current_costume.update()
+        pass # costume animations are advanced by animation.animator
 
     def _recreate_shape(self, new_width, new_height)->None:
         self.shape.cache_bb()
@@ -321,36 +384,30 @@ class Actor:
         space.add(self.shape)
 
 
-    def is_grounded(self)->bool:
-        if self.shape.space is None:
+    def is_grounded(self, exact:Optional[bool]=None)->bool:
+        """Is actor standing on something?"""
+        space = self.shape.space
+        if space is None:
             return False
 
-        colliding_shapes = self.shape.space.shape_query(self.shape)
+        if not self._exact_contacts(exact):
+            return contacts.graph_of(space).is_grounded(self.shape.body)
+
+        colliding_shapes = space.shape_query(self.shape)
 
         for s in colliding_shapes:
             if s.shape is not None and s.shape.body is not None and s.shape.body != self.shape.body:
+                # normal points from actor to what it touches
                 n = s.contact_point_set.normal
-                if n.y > 0:
+                if n.y < 0:
                     return True
         return False
 
     def get_grounding(self)->Grounding:
-        grounding = Grounding()
-        def f(arbitrater):
-            n = arbitrater.contact_point_set.normal
-            if n.y > grounding.normal.y:
-                grounding.normal = n
-                grounding.penetration = -arbitrater.contact_point_set.points[0].distance
-                grounding.impulse = arbitrater.total_impulse
-                grounding.position = arbitrater.contact_point_set.points[0].point_b
-                grounding.has_body = arbitrater.shapes[1].body is not None
-                if grounding.has_body:
-                    grounding.friction = abs(n.x/n.y)
-                    grounding.velocity = arbitrater.shapes[1].body.velocity
-
-        self.shape.body.each_arbiter(f)
-
-        return grounding
+        """Contact with the ground from last physics step, normal points up from the ground"""
+        if self.shape.space is None:
+            return Grounding()
+        return contacts.graph_of(self.shape.space).grounding(self.shape.body)
 
 
     def fit_to_image(self)->None:
@@ -417,3 +474,134 @@ class Actor:
                                          camera=camera,
                                          costume=self.current_costume)
 
+
+
+class Drawable:
+    """Base class for things other than single actors that game draws every frame,
+    for example, groups of actors created in bulk."""
+    def __init__(self, visible:bool=True, z_order:int=0):
+        self.visible = visible
+        self.z_order = z_order # negative values are drawn before actors, others after
+
+    def show(self):
+        self.visible = True
+    def hide(self):
+        self.visible = False
+    def is_hidden(self)->bool:
+        return not self.visible
+
+    def physics_objects(self)->List[Any]:
+        """Bodies, shapes and constraints owned by this drawable"""
+        return []
+
+    def update(self, dt:float)->None:
+        """Advance by dt seconds of game time, called every frame the game isn't paused"""
+        pass
+
+    def draw(self, screen:pygame.Surface, camera:Camera)->None:
+        pass
+
+
+class ActorGroup(Drawable):
+    """
+    Many bodies of same kind of shape created in bulk and drawn in one pass.
+
+    Members are not full actors, instead group[i] returns an Actor view that
+    can be used to read or change physics of that member. Costumes, texts and
+    per-member draw options of the view are not drawn, use the group colors instead.
+    Colors with transparency are drawn as opaque because members are drawn
+    directly on the screen.
+    """
+    def __init__(self, shapes:Sequence[pymunk.Shape],
+                 colors:Sequence[PyGameColor],
+                 border:int=0,
+                 visible:bool=True):
+        super().__init__(visible=visible)
+        self.shapes = list(shapes)
+        self.bodies = [shape.body for shape in self.shapes]
+        self.colors = [pygame.Color(c) for c in colors]
+        self.border = border
+        self.alive = np.ones(len(self.shapes), dtype=bool)
+
+        self._views:Dict[int, Actor] = {}
+        self._body_ids:Optional[np.ndarray] = None
+        self._is_circle = isinstance(self.shapes[0], pymunk.Circle) if len(self.shapes) else False
+        if self._is_circle:
+            self._radii = np.array([s.radius for s in self.shapes], dtype=float)
+        elif self.shapes and all(isinstance(s, pymunk.Poly) for s in self.shapes):
+            # local vertices of each polygon, all polygons must have same number of vertices
+            self._vertices = np.array([[tuple(v) for v in s.get_vertices()] for s in self.shapes],
+                                      dtype=float).reshape(len(self.shapes), -1, 2)
+
+    def __len__(self)->int:
+        """Members still in game, same ones iteration gives, group[i] indexes all of group.shapes"""
+        return int(self.alive.sum())
+
+    def __getitem__(self, index:int)->Actor:
+        view = self._views.get(index, None)
+        if view is None:
+            view = Actor(shape=self.shapes[index], color=self.colors[index],
+                         border=self.border, visible=False)
+            self._views[index] = view
+        return view
+
+    def __iter__(self)->Iterator[Actor]:
+        for i in range(len(self.shapes)):
+            if self.alive[i]:
+                yield self[i]
+
+    def index_of(self, body:pymunk.Body)->int:
+        return self.bodies.index(body)
+
+    def positions(self)->np.ndarray:
+        """(n, 2) array of member positions"""
+        return np.array([tuple(b.position) for b in self.bodies], dtype=float).reshape(-1, 2)
+
+    def angles(self)->np.ndarray:
+        """array of member angles in radians"""
+        return np.array([b.angle for b in self.bodies], dtype=float)
+
+    def body_ids(self)->np.ndarray:
+        """pymunk ids of member bodies, used to find members in batch results"""
+        if self._body_ids is None:
+            self._body_ids = np.array([b.id for b in self.bodies], dtype=np.uint64)
+        return self._body_ids
+
+    def physics_objects(self)->List[Any]:
+        return [o for i, (b, s) in enumerate(zip(self.bodies, self.shapes)) if self.alive[i]
+                  for o in (b, s)]
+
+    def _remove_member(self, index:int)->List[Any]:
+        """Mark member as removed and return its physics objects"""
+        if not self.alive[index]:
+            return []
+        self.alive[index] = False
+        self._views.pop(index, None)
+        return [self.shapes[index], self.bodies[index]]
+
+    def draw(self, screen:pygame.Surface, camera:Camera)->None:
+        if not self.visible or not len(self.shapes):
+            return
+
+        alive_idx = np.flatnonzero(self.alive)
+        bodies = self.bodies
+        positions = np.array([tuple(bodies[i].position) for i in alive_idx], dtype=float).reshape(-1, 2)
+        screen_height = screen.get_height()
+
+        if self._is_circle:
+            centers = camera.apply_array(positions)
+            centers[:, 1] = screen_height - centers[:, 1]
+            radii = self._radii[alive_idx] * camera.scale
+            for i, (x, y), r in zip(alive_idx.tolist(), centers.tolist(), radii.tolist()):
+                pygame.draw.circle(screen, self.colors[i], (x, y), r, self.border)
+        else:
+            angles = np.array([bodies[i].angle for i in alive_idx], dtype=float)
+            cos, sin = np.cos(angles)[:, None], np.sin(angles)[:, None]
+            local = self._vertices[alive_idx]
+            world = np.stack((local[..., 0]*cos - local[..., 1]*sin,
+                              local[..., 0]*sin + local[..., 1]*cos), axis=-1) + positions[:, None, :]
+            n, k, _ = world.shape
+            vertices = camera.apply_array(world.reshape(-1, 2)).reshape(n, k, 2)
+            vertices[..., 1] = screen_height - vertices[..., 1]
+            for i, points in zip(alive_idx.tolist(), vertices.tolist()):
+                pygame.draw.polygon(screen, self.colors[i], points, self.border)
@@ -0,0 +1,101 @@
+from typing import List, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from pygamejr.common import AnimationSpec
+
+class Animator:
+    """
+    All running animations kept in arrays of frame index, frame time and time of next frame,
+    advanced together in one vectorized pass per frame on game time. Only animations that
+    were started are in the arrays, stopped ones and ones of removed actors cost nothing.
+    """
+    def __init__(self, capacity:int=64):
+        self.time = 0. # game time of last advance()
+        self._specs:List['AnimationSpec'] = []
+        self._index = np.zeros(capacity, dtype=np.int64) # image shown now
+        self._frame_time = np.zeros(capacity) # seconds each image is shown
+        self._deadline = np.zeros(capacity) # game time to show next image
+        self._count = np.zeros(capacity, dtype=np.int64) # images in animation
+        self._loop = np.zeros(capacity, dtype=bool)
+
+    def __len__(self)->int:
+        return len(self._specs)
+
+    def play(self, spec:'AnimationSpec')->None:
+        """Run animation from its current image, its first image change is one frame time from now"""
+        assert spec.frame_time_s > 0, "frame time must be positive"
+        slot = spec._slot
+        if slot < 0:
+            slot = len(self._specs)
+            if slot == len(self._index):
+                self._grow()
+            self._specs.append(spec)
+            spec._slot = slot
+        self._index[slot] = spec.image_index
+        self._frame_time[slot] = spec.frame_time_s
+        self._deadline[slot] = self.time + spec.frame_time_s
+        self._count[slot] = spec.image_count
+        self._loop[slot] = spec.loop
+
+    def stop(self, spec:'AnimationSpec')->None:
+        """Take animation out of the arrays, last one moves into its slot"""
+        slot = spec._slot
+        if slot < 0:
+            return
+        last = len(self._specs) - 1
+        if slot != last:
+            moved = self._specs[last]
+            self._specs[slot] = moved
+            moved._slot = slot
+            for array in (self._index, self._frame_time, self._deadline, self._count, self._loop):
+                array[slot] = array[last]
+        self._specs.pop()
+        spec._slot = -1
+
+    def set_image_count(self, spec:'AnimationSpec')->None:
+        if spec._slot >= 0:
+            self._count[spec._slot] = spec.image_count
+
+    def _grow(self)->None:
+        for name in ("_index", "_frame_time", "_deadline", "_count", "_loop"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate((array, np.zeros_like(array))))
+
+    def clear(self)->None:
+        for spec in self._specs:
+            spec._slot = -1
+        self._specs.clear()
+
+    def advance(self, time:float)->None:
+        """Show next images of animations whose time has come, as many as passed since"""
+        self.time = time
+        n = len(self._specs)
+        if n == 0:
+            return
+        deadline = self._deadline[:n]
+        due = np.flatnonzero(deadline <= time + 1e-9)
+        if len(due) == 0:
+            return
+
+        frame_time = self._frame_time[due]
+        steps = np.floor((time - deadline[due]) / frame_time + 1e-9).astype(np.int64) + 1
+        deadline[due] += steps * frame_time
+        index, count = self._index[due] + steps, np.maximum(self._count[due], 1)
+        loop = self._loop[due]
+        ended = ~loop & (index >= count)
+        index = np.where(loop, index % count, np.minimum(index, count - 1))
+        self._index[due] = index
+
+        specs = self._specs
+        for slot, image_index in zip(due.tolist(), index.tolist()):
+            specs[slot].image_index = image_index
+        # animations that don't loop stop at their last image, highest slots first so
+        # moving the last animation into a freed slot never moves one still to be stopped
+        for slot in sorted(due[ended].tolist(), reverse=True):
+            spec = specs[slot]
+            spec.started = False
+            self.stop(spec)
+
+animator = Animator() # animations of all actors, advanced by game.update()
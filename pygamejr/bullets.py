@@ -0,0 +1,71 @@
+from typing import Optional
+import weakref
+
+import pymunk
+from pymunk import Vec2d
+
+_bullets:'weakref.WeakKeyDictionary[pymunk.Shape, float]' = weakref.WeakKeyDictionary() # shape to sweep radius
+
+def _sweep_radius(shape:pymunk.Shape)->float:
+    """Radius of circle that fits inside the shape, used to sweep it along its path"""
+    if isinstance(shape, pymunk.Circle):
+        return shape.radius
+    if isinstance(shape, pymunk.Poly):
+        vertices = shape.get_vertices()
+        center = shape.center_of_gravity
+        distances = []
+        for a, b in zip(vertices, vertices[1:] + vertices[:1]):
+            edge = b - a
+            if edge.length > 0:
+                distances.append(abs(edge.cross(center - a)) / edge.length)
+        return (min(distances) if distances else 0.) + shape.radius
+    return shape.radius
+
+def _sweep_center(shape:pymunk.Shape)->Vec2d:
+    if isinstance(shape, pymunk.Circle):
+        return shape.offset
+    if isinstance(shape, pymunk.Poly):
+        return shape.center_of_gravity
+    return (shape.a + shape.b) / 2.
+
+def set_bullet(shape:pymunk.Shape, bullet:bool=True)->None:
+    if bullet:
+        _bullets[shape] = _sweep_radius(shape)
+    else:
+        _bullets.pop(shape, None)
+
+def is_bullet(shape:pymunk.Shape)->bool:
+    return shape in _bullets
+
+def sweep(space:pymunk.Space, dt:float)->None:
+    """
+    Call before space.step. Each bullet that would move further than its own radius
+    in this step is swept along its path, if it would pass through something it is
+    moved back so that the step ends with it just touching the thing it hit. The step
+    then finds the contact and the solver bounces it like any other collision.
+    Only the position is changed, velocity and rotation are left to the solver.
+    """
+    for shape, radius in list(_bullets.items()):
+        body = shape.body
+        if body is None or body.space is not space or body.is_sleeping or \
+           body.body_type == pymunk.Body.STATIC:
+            continue
+        travel = body.velocity * dt
+        distance = travel.length
+        if distance <= radius:
+            continue # can't skip over anything in one step
+
+        start = body.local_to_world(_sweep_center(shape))
+        hit:Optional[pymunk.SegmentQueryInfo] = None
+        for info in space.segment_query(start, start + travel, radius, shape.filter):
+            other = info.shape
+            if other is None or other.body is body or other.sensor or info.alpha <= 0:
+                continue
+            if hit is None or info.alpha < hit.alpha:
+                hit = info
+        if hit is None:
+            continue
+        # sink slightly into the target so collision detection can't miss the contact
+        penetration = min(space.collision_slop, radius)
+        alpha = min(1., hit.alpha + penetration / distance)
+        body.position = body.position + travel * (alpha - 1.)
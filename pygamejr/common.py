@@ -1,9 +1,8 @@
-from typing import Optional, List, Tuple, Dict, Union, Sequence, Iterable, Iterator
+from typing import Optional, List, Tuple, Dict, Union, Sequence, Iterable, Iterator, Any
 from collections import namedtuple
 from dataclasses import dataclass, field
 import math
 import os
-import timeit
 from enum import Enum
 import random
 import json
@@ -14,6 +13,8 @@ import pygame
 import pymunk
 from pymunk import pygame_util, Vec2d
 from pygamejr import utils
+from pygamejr import animation
+from pygamejr.animation import Animator
 import zipfile
 
 RGBAOutput = Tuple[int, int, int, int]
@@ -164,38 +165,39 @@ class Grounding:
 
 @dataclass
 class AnimationSpec:
+    """
+    Images of a costume shown one after another. Started animations are advanced
+    on game time by animation.animator of the world they were started in, which sets image_index.
+    """
     frame_time_s:float=0.1
-    last_frame_time:float=timeit.default_timer()
     loop:bool=True
     started:bool=False
     image_index:int=0
-
-    def __post_init__(self):
-        pass
+    image_count:int=0
+    _slot:int=field(default=-1, repr=False, compare=False) # place in animator arrays, -1 if not running
+    _animator:Optional[Animator]=field(default=None, repr=False, compare=False)
 
     def start(self, loop:bool=True, from_index=0, frame_time_s:float=0.1):
         self.started = True
         self.loop = loop
         self.frame_time_s = frame_time_s
         self.image_index = from_index
-        self.last_frame_time = timeit.default_timer()
+        if self._animator is not None and self._animator is not animation.animator:
+            self._animator.stop(self)
+        self._animator = animation.animator
+        self._animator.play(self)
 
     def stop(self):
         self.started = False
+        if self._animator is not None:
+            self._animator.stop(self)
 
     def update(self, image_count:int)->None:
-        if not self.started:
-            return
-        current_time = timeit.default_timer()
-        if current_time - self.last_frame_time > self.frame_time_s:
-            self.last_frame_time = current_time
-            self.image_index += 1
-            if self.image_index >= image_count:
-                if self.loop:
-                    self.image_index = 0
-                else:
-                    self.image_index -= 1
-                    self.stop()
+        """Animator advances images, this only keeps count of images up to date"""
+        if image_count != self.image_count:
+            self.image_count = image_count
+            if self._animator is not None:
+                self._animator.set_image_count(self)
 
 @dataclass
 class ImageSpec:
@@ -214,6 +216,12 @@ class ImagePaintMode(Enum):
     CENTER = 1
     TILE = 2
 
+class BoundsAction(Enum):
+    """What happens to actor that leaves world bounds"""
+    DESPAWN = 1 # remove from game (or return to its pool)
+    SLEEP = 2 # put body to sleep, it wakes up when something touches it
+    FREEZE = 3 # make body kinematic, stop it and hide it
+
 @dataclass
 class TextInfo:
     text:str
@@ -284,6 +292,7 @@ class CostumeSpec:
                             image = image.convert_alpha()
                 self._images.append(image)
                 self._scaled_images.append(self._get_scaled_image(image))
+        self.animation.update(len(self._images))
 
 @dataclass
 class CameraControls:
@@ -307,6 +316,7 @@ class Camera:
         self._update_transform()
 
     def _update_transform(self):
+        self._cos, self._sin = math.cos(self.angle), math.sin(self.angle)
         if self.angle == 0:
             self.theta = 0
             self.rotation_matrix = np.eye(2)
@@ -324,18 +334,35 @@ class Camera:
         if self.angle == 0 and self.scale == 1.0 and self.bottom_left == Vec2d.zero():
             return points
 
-        points = np.array(points) # type: ignore
+        # few points per shape, plain arithmetic is faster than numpy here
+        s = self.scale if scale else 1.
+        cos, sin = (self._cos, self._sin) if rotate else (1., 0.)
+        dx, dy = self.bottom_left if translate else (0., 0.)
+        return [Vec2d((x*cos - y*sin)*s - dx, (x*sin + y*cos)*s - dy) for x, y in points]
 
-        if scale:
-            points = np.dot(points, self.scaling_matrix)
-
-        if rotate:
-            points = np.dot(points, self.rotation_matrix.T) # type: ignore
+    def apply_array(self, points:np.ndarray,
+                    translate=True, scale=True, rotate=True)->np.ndarray:
+        """Same as apply() but for (n, 2) array of points, returns (n, 2) array."""
+        if self.angle == 0 and self.scale == 1.0 and self.bottom_left == Vec2d.zero():
+            return points
 
+        if scale:
+            points = points * self.scale
+        if rotate and self.angle != 0:
+            points = points @ self.rotation_matrix.T
         if translate:
-            points = points - self.bottom_left # type: ignore
+            points = points - np.array(self.bottom_left)
+        return points
+
+    def unapply_array(self, points:np.ndarray)->np.ndarray:
+        """Inverse of apply_array(), from screen (y up) to world coordinates."""
+        if self.angle == 0 and self.scale == 1.0 and self.bottom_left == Vec2d.zero():
+            return points
 
-        return [Vec2d(*v) for v in points]
+        points = points + np.array(self.bottom_left)
+        if self.angle != 0:
+            points = points @ self.rotation_matrix
+        return points / self.scale
 
     def move_by(self, delta:Coordinates):
         self.bottom_left += Vec2d(*delta)
@@ -410,6 +437,13 @@ def interpolate(start:float, end:float, max_amount:float)->float:
     return start + clamp((end - start), -max_amount, max_amount)
 
 
+def add_shuffled(space:pymunk.Space, bodies:Sequence[pymunk.Body], shapes:Sequence[pymunk.Shape],
+                 *others:Any)->None:
+    """Add bodies, shapes and others like joints to space, shapes in shuffled order"""
+    # BB tree degrades when many shapes are inserted in spatial order so insert them shuffled
+    order = np.random.default_rng(0).permutation(len(shapes)).tolist()
+    space.add(*bodies, *[shapes[i] for i in order], *others)
+
 def spring_line_segments(damped_spring:pymunk.DampedSpring, segments=10)->List[Vec2d]:
     """
     Generates line segments for drawing a spring based on a pymunk.DampedSpring object.
@@ -508,10 +542,36 @@ def draw_vertices(screen:pygame.Surface, vertices:List[Vec2d],
     unit_vec = unit_vec - centroid
     vertices = vertices[:-2]
 
-    # draw the shape on shape surface
-    # we don't draw directly on screen as it doesn't support transparency
     # get bounding rect of the shape
     width, height, min_x, min_y, max_x, max_y = get_bounding_rect(vertices)
+
+    # plain opaque shapes need no transparency, draw them directly on screen which is
+    # much faster than blitting a shape surface, most of all on small palette surfaces
+    # shapes crossing an edge of screen take the slow path, pygame clips and rounds
+    # them differently from the shape surface they would be drawn on
+    if costume is None and not texts and not (draw_options and (draw_options.angle_line_width or draw_options.center_radius)) \
+            and min_x >= 0 and min_y >= 0 and max_x <= screen.get_width() and max_y <= screen.get_height() \
+            and pygame.Color(color).a == 255:
+        # same offset and clip rect as shape surface blitted at offset would have, within
+        # caller's clip, except that shapes smaller than a pixel, common on small surfaces,
+        # still get one
+        offset_x, offset_y = int(min_x), int(min_y)
+        previous_clip = screen.get_clip()
+        screen.set_clip(pygame.Rect(offset_x, offset_y, max(int(width), 1), max(int(height), 1)).clip(previous_clip))
+        if radius is not None:
+            pygame.draw.circle(screen, color, (offset_x + int(width/2.), offset_y + int(height/2.)),
+                               max(radius, 1.), border)
+        else:
+            points = [(offset_x + (v.x-min_x), offset_y + (v.y-min_y)) for v in vertices]
+            if polygone_or_lines:
+                pygame.draw.polygon(screen, color, points, border)
+            else:
+                pygame.draw.lines(screen, color, closed=False, points=points, width=border)
+        screen.set_clip(previous_clip)
+        return
+
+    # draw the shape on shape surface
+    # we don't draw directly on screen as it doesn't support transparency
     shape_surface = pygame.Surface((width, height), pygame.SRCALPHA)
     shape_surface.fill((0, 0, 0, 0)) # transparent initial surface
 
@@ -0,0 +1,278 @@
+from typing import Any, Dict, List, Optional, Sequence, Iterator
+
+import numpy as np
+
+import pygame
+import pymunk
+
+from pygamejr.common import PyGameColor, Coordinates, Camera
+from pygamejr.actor import Actor, Drawable
+from pygamejr import common
+from pygamejr import layers
+
+
+class Compound(Drawable):
+    """
+    Many shapes sharing one body, drawn in one pass.
+
+    Used for level geometry where all walls and platforms hang off space.static_body
+    instead of each having its own body and actor, and for compound objects
+    where several shapes make up one rigid body. Coordinates given to add_* are
+    relative to the body, for level geometry that is the world origin.
+
+    Like ActorGroup, compound[i] returns an Actor view of piece i. Views share
+    the body, so moving or pushing a view moves the whole compound.
+    Only pieces inside the screen are drawn and colors are drawn as opaque.
+    """
+    def __init__(self, space:pymunk.Space, body:pymunk.Body,
+                 color:PyGameColor="gray",
+                 border:int=0,
+                 density:Optional[float]=None,
+                 mass:Optional[float]=None,
+                 elasticity:Optional[float]=None,
+                 friction:Optional[float]=None,
+                 colliision_group:Optional[int]=None,
+                 collision_type:Optional[int]=None,
+                 layer:Optional[str]=None,
+                 visible:bool=True,
+                 z_order:int=0):
+        super().__init__(visible=visible, z_order=z_order)
+        self.space = space
+        self.body = body
+        self.color = color
+        self.border = border
+        self.density = density
+        self.mass = mass
+        self.elasticity = elasticity
+        self.friction = friction
+        self.colliision_group = colliision_group
+        self.collision_type = collision_type
+        self.layer = layer
+
+        self.shapes:List[pymunk.Shape] = []
+        self.colors:List[pygame.Color] = []
+        self.alive:List[bool] = []
+        self._views:Dict[int, Actor] = {}
+        self._indices:Dict[pymunk.Shape, int] = {}
+        self._geometry:Optional[Dict[str, Any]] = None # local vertices for drawing, rebuilt on change
+
+    def __len__(self)->int:
+        return len(self.shapes)
+
+    def __getitem__(self, index:int)->Actor:
+        view = self._views.get(index, None)
+        if view is None:
+            view = Actor(shape=self.shapes[index], color=self.colors[index],
+                         border=self.border, visible=False)
+            self._views[index] = view
+        return view
+
+    def __iter__(self)->Iterator[Actor]:
+        for i in range(len(self.shapes)):
+            if self.alive[i]:
+                yield self[i]
+
+    def index_of(self, shape:pymunk.Shape)->Optional[int]:
+        return self._indices.get(shape, None)
+
+    def add_shape(self, shape:pymunk.Shape, color:Optional[PyGameColor]=None,
+                  elasticity:Optional[float]=None, friction:Optional[float]=None,
+                  can_collide:bool=True)->int:
+        """Add shape created on compound's body, returns index of the piece"""
+        return self.add_shapes([shape], color=color, elasticity=elasticity, friction=friction,
+                               can_collide=can_collide)[0]
+
+    def add_shapes(self, shapes:Sequence[pymunk.Shape], color:Optional[PyGameColor]=None,
+                   elasticity:Optional[float]=None, friction:Optional[float]=None,
+                   can_collide:bool=True)->List[int]:
+        """Add many shapes created on compound's body in one go, returns indices of the pieces"""
+        elasticity = elasticity if elasticity is not None else self.elasticity
+        friction = friction if friction is not None else self.friction
+        color = color if color is not None else self.color
+        for shape in shapes:
+            assert shape.body is self.body, "Shape must be attached to compound's body"
+            if elasticity is not None:
+                shape.elasticity = elasticity
+            if friction is not None:
+                shape.friction = friction
+            if self.density is not None:
+                shape.density = self.density
+            elif self.mass is not None:
+                shape.density = 1.
+            layers.collision_layers.apply(shape, self.layer, can_collide=can_collide)
+            if self.colliision_group is not None:
+                shape.group = self.colliision_group
+            if self.collision_type is not None:
+                shape.collision_type = self.collision_type
+
+        bodies = [self.body] if self.body.space is None else [] # dynamic body can't be in space without shapes
+        common.add_shuffled(self.space, bodies, shapes)
+        first = len(self.shapes)
+        self.shapes.extend(shapes)
+        self.colors.extend(pygame.Color(color) for _ in shapes)
+        self._indices.update((shape, first + i) for i, shape in enumerate(shapes))
+        self.alive.extend([True] * len(shapes))
+        self._geometry = None
+        self._set_mass()
+        return list(range(first, len(self.shapes)))
+
+    def add_rect(self, width:float, height:float,
+                 bottom_left:Optional[Coordinates]=None, center:Optional[Coordinates]=None,
+                 angle:float=0., color:Optional[PyGameColor]=None,
+                 elasticity:Optional[float]=None, friction:Optional[float]=None,
+                 can_collide:bool=True)->int:
+        assert not(bottom_left is not None and center is not None), "Don't specify both bottom_left and center, only one or the other."
+        if center is None:
+            bottom_left = bottom_left if bottom_left is not None else (0, 0)
+            center = (bottom_left[0] + width/2., bottom_left[1] + height/2.)
+        w, h = width/2., height/2.
+        transform = pymunk.Transform.translation(*center).rotated(angle)
+        shape = pymunk.Poly(self.body, [(-w, -h), (w, -h), (w, h), (-w, h)], transform=transform, radius=0)
+        return self.add_shape(shape, color=color, elasticity=elasticity, friction=friction,
+                              can_collide=can_collide)
+
+    def add_circle(self, radius:float, center:Coordinates=(0, 0),
+                   color:Optional[PyGameColor]=None,
+                   elasticity:Optional[float]=None, friction:Optional[float]=None,
+                   can_collide:bool=True)->int:
+        shape = pymunk.Circle(self.body, radius, offset=center)
+        return self.add_shape(shape, color=color, elasticity=elasticity, friction=friction,
+                              can_collide=can_collide)
+
+    def add_line(self, start_pt:Coordinates, end_pt:Coordinates, radius:float=1.,
+                 color:Optional[PyGameColor]=None,
+                 elasticity:Optional[float]=None, friction:Optional[float]=None,
+                 can_collide:bool=True)->int:
+        shape = pymunk.Segment(self.body, start_pt, end_pt, radius=radius)
+        return self.add_shape(shape, color=color, elasticity=elasticity, friction=friction,
+                              can_collide=can_collide)
+
+    def add_lines(self, points:Sequence[Coordinates], radius:float=1., closed:bool=False,
+                  color:Optional[PyGameColor]=None,
+                  elasticity:Optional[float]=None, friction:Optional[float]=None)->List[int]:
+        """Chain of segments through points, neighbours are set so things slide over joints smoothly"""
+        points = [tuple(p) for p in points]
+        if closed:
+            points.append(points[0])
+        segments = []
+        for i in range(len(points) - 1):
+            segment = pymunk.Segment(self.body, points[i], points[i+1], radius=radius)
+            prev_pt = points[i-1] if i > 0 else (points[-2] if closed else points[i])
+            next_pt = points[i+2] if i+2 < len(points) else (points[1] if closed else points[i+1])
+            segment.set_neighbors(prev_pt, next_pt)
+            segments.append(segment)
+        return self.add_shapes(segments, color=color, elasticity=elasticity, friction=friction)
+
+    def add_polygon(self, points:Sequence[Coordinates], radius:float=0.,
+                    color:Optional[PyGameColor]=None,
+                    elasticity:Optional[float]=None, friction:Optional[float]=None,
+                    can_collide:bool=True)->int:
+        """Convex polygon, concave points are wrapped by their convex hull"""
+        shape = pymunk.Poly(self.body, [tuple(p) for p in points], radius=radius)
+        return self.add_shape(shape, color=color, elasticity=elasticity, friction=friction,
+                              can_collide=can_collide)
+
+    def _set_mass(self)->None:
+        """Spread total mass over pieces by area"""
+        if self.mass is None or self.body.body_type != pymunk.Body.DYNAMIC:
+            return
+        shapes = [s for s, alive in zip(self.shapes, self.alive) if alive]
+        area = sum(s.area for s in shapes)
+        if area > 0:
+            for s in shapes:
+                s.density = self.mass / area
+
+    def remove_piece(self, index:int)->None:
+        if not self.alive[index]:
+            return
+        self.alive[index] = False
+        self._views.pop(index, None)
+        self._indices.pop(self.shapes[index], None)
+        self.space.remove(self.shapes[index])
+        if not any(self.alive) and self.body is not self.space.static_body:
+            self.space.remove(self.body)
+        self._geometry = None
+        self._set_mass()
+
+    def clear(self)->None:
+        """Remove all pieces"""
+        objs = self.physics_objects()
+        if objs:
+            self.space.remove(*objs)
+        self.shapes, self.colors, self.alive = [], [], []
+        self._views.clear()
+        self._indices.clear()
+        self._geometry = None
+
+    def physics_objects(self)->List[Any]:
+        objs:List[Any] = [s for s, alive in zip(self.shapes, self.alive) if alive]
+        if self.body is not self.space.static_body and self.body.space is not None:
+            objs.append(self.body)
+        return objs
+
+    def _build_geometry(self)->Dict[str, Any]:
+        """Local outline of every piece as polygons and circles for vectorized drawing"""
+        polygons:List[np.ndarray] = []
+        poly_index:List[int] = []
+        circles:List[Any] = []
+        circle_index:List[int] = []
+        for i, (shape, alive) in enumerate(zip(self.shapes, self.alive)):
+            if not alive:
+                continue
+            if isinstance(shape, pymunk.Circle):
+                circles.append((*shape.offset, shape.radius))
+                circle_index.append(i)
+                continue
+            if isinstance(shape, pymunk.Poly):
+                vertices = [tuple(v) for v in shape.get_vertices()]
+            else:
+                vertices = [tuple(v) for v in common.rectangle_from_line(shape.a, shape.b, width=max(1., 2*shape.radius))]
+            polygons.append(np.array(vertices, dtype=float))
+            poly_index.append(i)
+        counts = np.array([len(p) for p in polygons], dtype=int)
+        return {'vertices': np.concatenate(polygons) if polygons else np.zeros((0, 2)),
+                'starts': np.concatenate(([0], np.cumsum(counts)[:-1])).astype(int) if polygons else np.zeros(0, dtype=int),
+                'poly_index': poly_index,
+                'circles': np.array(circles, dtype=float).reshape(-1, 3),
+                'circle_index': circle_index}
+
+    def _to_screen(self, local:np.ndarray, screen:pygame.Surface, camera:Camera)->np.ndarray:
+        body = self.body
+        points = local
+        if body.angle != 0:
+            cos, sin = np.cos(body.angle), np.sin(body.angle)
+            points = points @ np.array([[cos, sin], [-sin, cos]])
+        points = camera.apply_array(points + np.array(tuple(body.position)))
+        points[:, 1] = screen.get_height() - points[:, 1]
+        return points
+
+    def draw(self, screen:pygame.Surface, camera:Camera)->None:
+        if not self.visible or not len(self.shapes):
+            return
+        if self._geometry is None:
+            self._geometry = self._build_geometry()
+        geometry = self._geometry
+        width, height = screen.get_size()
+
+        vertices = geometry['vertices']
+        if len(vertices):
+            points = self._to_screen(vertices, screen, camera)
+            starts = geometry['starts']
+            # skip polygons outside screen
+            low, high = np.minimum.reduceat(points, starts), np.maximum.reduceat(points, starts)
+            on_screen = (high[:, 0] >= 0) & (low[:, 0] <= width) & (high[:, 1] >= 0) & (low[:, 1] <= height)
+            ends = np.append(starts[1:], len(points))
+            points = points.tolist()
+            for k in np.flatnonzero(on_screen).tolist():
+                i = geometry['poly_index'][k]
+                pygame.draw.polygon(screen, self.colors[i], points[starts[k]:ends[k]], self.border)
+
+        circles = geometry['circles']
+        if len(circles):
+            centers = self._to_screen(circles[:, :2], screen, camera)
+            radii = circles[:, 2] * camera.scale
+            on_screen = (centers[:, 0] + radii >= 0) & (centers[:, 0] - radii <= width) & \
+                        (centers[:, 1] + radii >= 0) & (centers[:, 1] - radii <= height)
+            for k in np.flatnonzero(on_screen).tolist():
+                i = geometry['circle_index'][k]
+                pygame.draw.circle(screen, self.colors[i], centers[k].tolist(), radii[k], self.border)
@@ -0,0 +1,170 @@
+from typing import Dict, Optional, List, Tuple, Iterator, NamedTuple
+import weakref
+
+import numpy as np
+import pymunk
+from pymunk import Vec2d
+import pymunk.batch
+
+from pygamejr.common import Grounding
+
+_FIELDS = pymunk.batch.ArbiterFields(pymunk.batch.ArbiterFields.BODY_A_ID |
+                                     pymunk.batch.ArbiterFields.BODY_B_ID |
+                                     pymunk.batch.ArbiterFields.CONTACT_COUNT |
+                                     pymunk.batch.ArbiterFields.TOTAL_IMPULSE |
+                                     pymunk.batch.ArbiterFields.NORMAL |
+                                     pymunk.batch.ArbiterFields.POINT_A_1 |
+                                     pymunk.batch.ArbiterFields.POINT_B_1 |
+                                     pymunk.batch.ArbiterFields.DISTANCE_1)
+_INTS, _FLOATS = 3, 9 # values per arbiter in batch buffers, in field order
+
+class ContactGraph:
+    """
+    Who touches whom after the last physics step. Graph is built from arbiters solver
+    has already computed, once per step and only if somebody asks. Each contact is stored
+    for both bodies, sorted by body id so contacts of a body are one slice of the arrays.
+    Normals point from the body to the other body, impulses are the ones applied to the body.
+    """
+    def __init__(self, space:pymunk.Space):
+        self._space = weakref.ref(space)
+        self._buffer = pymunk.batch.Buffer()
+        self._stale = True
+        self._bodies:Optional[Dict[int, pymunk.Body]] = None
+        self.ids = np.zeros(0, dtype=np.uint64)
+        self.others = np.zeros(0, dtype=np.uint64)
+        self.normals = np.zeros((0, 2))
+        self.impulses = np.zeros((0, 2))
+        self.points = np.zeros((0, 2)) # contact point on the body
+        self.other_points = np.zeros((0, 2)) # contact point on the other body
+        self.depths = np.zeros(0) # penetration depth
+
+    def invalidate(self)->None:
+        """Call after space.step so graph is rebuilt on next query"""
+        self._stale = True
+        self._bodies = None
+
+    def _build(self)->None:
+        space = self._space()
+        assert space is not None, "space was deleted"
+        self._buffer.clear()
+        pymunk.batch.get_space_arbiters(space, _FIELDS, self._buffer)
+        ints = np.frombuffer(self._buffer.int_buf(), dtype=np.uint64).reshape(-1, _INTS)
+        floats = np.frombuffer(self._buffer.float_buf(), dtype=float).reshape(-1, _FLOATS)
+
+        # cached arbiters are kept around for a few steps after bodies separate
+        touching = ints[:, 2] > 0
+        ints, floats = ints[touching], floats[touching]
+        impulse, normal, point_a, point_b = floats[:, 0:2], floats[:, 2:4], floats[:, 4:6], floats[:, 6:8]
+
+        ids = np.concatenate((ints[:, 0], ints[:, 1]))
+        order = np.argsort(ids, kind='stable')
+        self.ids = ids[order]
+        self.others = np.concatenate((ints[:, 1], ints[:, 0]))[order]
+        self.normals = np.concatenate((normal, -normal))[order]
+        self.impulses = np.concatenate((impulse, -impulse))[order]
+        self.points = np.concatenate((point_a, point_b))[order]
+        self.other_points = np.concatenate((point_b, point_a))[order]
+        self.depths = -np.concatenate((floats[:, 8], floats[:, 8]))[order]
+        self._stale = False
+
+    def rows(self, body:pymunk.Body)->'ContactRows':
+        """Contacts of the body, a slice of graph arrays"""
+        if body.is_sleeping:
+            # arbiters of sleeping bodies are parked with the bodies
+            return _sleeping_rows(body)
+        if self._stale:
+            self._build()
+        body_id = np.uint64(body.id)
+        s = slice(int(np.searchsorted(self.ids, body_id, side='left')),
+                  int(np.searchsorted(self.ids, body_id, side='right')))
+        return ContactRows(self.others[s], self.normals[s], self.impulses[s],
+                           self.points[s], self.other_points[s], self.depths[s])
+
+    def pair_count(self)->int:
+        """Number of touching pairs of shapes of awake bodies"""
+        if self._stale:
+            self._build()
+        return len(self.ids) // 2
+
+    def degree(self, body:pymunk.Body)->int:
+        return len(self.rows(body).others)
+
+    def touches(self, body:pymunk.Body, other:pymunk.Body)->bool:
+        return bool(np.any(self.rows(body).others == np.uint64(other.id)))
+
+    def body_of(self, body_id:int)->Optional[pymunk.Body]:
+        if self._bodies is None:
+            space = self._space()
+            assert space is not None, "space was deleted"
+            self._bodies = {b.id: b for b in space.bodies}
+            self._bodies[space.static_body.id] = space.static_body
+        return self._bodies.get(int(body_id), None)
+
+    def contacts(self, body:pymunk.Body)->Iterator[Tuple[pymunk.Body, pymunk.ContactPointSet]]:
+        """Bodies touching the body with contact points as pymunk reports them"""
+        rows = self.rows(body)
+        for other_id, n, p, q, d in zip(rows.others.tolist(), rows.normals.tolist(),
+                                        rows.points.tolist(), rows.other_points.tolist(),
+                                        rows.depths.tolist()):
+            other = self.body_of(other_id)
+            if other is not None:
+                point = pymunk.ContactPoint(Vec2d(*p), Vec2d(*q), -d)
+                yield other, pymunk.ContactPointSet(Vec2d(*n), (point,))
+
+    def is_grounded(self, body:pymunk.Body)->bool:
+        """Is anything below the body holding it up?"""
+        return bool(np.any(self.rows(body).normals[:, 1] < 0))
+
+    def grounding(self, body:pymunk.Body)->Grounding:
+        """Contact with the most upward facing ground normal"""
+        grounding = Grounding()
+        rows = self.rows(body)
+        if len(rows.others) == 0:
+            return grounding
+        # ground normal points from the ground to the body
+        up = -rows.normals[:, 1]
+        i = int(np.argmax(up))
+        if up[i] <= 0:
+            return grounding
+        n = Vec2d(*(-rows.normals[i]).tolist())
+        grounding.normal = n
+        grounding.penetration = float(rows.depths[i])
+        grounding.impulse = Vec2d(*rows.impulses[i].tolist())
+        grounding.position = Vec2d(*rows.other_points[i].tolist())
+        other = self.body_of(rows.others[i])
+        grounding.has_body = other is not None
+        if other is not None:
+            grounding.friction = abs(n.x/n.y)
+            grounding.velocity = other.velocity
+        return grounding
+
+class ContactRows(NamedTuple):
+    others:np.ndarray
+    normals:np.ndarray
+    impulses:np.ndarray
+    points:np.ndarray
+    other_points:np.ndarray
+    depths:np.ndarray
+
+def _sleeping_rows(body:pymunk.Body)->ContactRows:
+    rows:List[Tuple[int, float, float, float, float, float, float, float, float, float]] = []
+    def add(arbiter:pymunk.Arbiter):
+        # each_arbiter puts the body first
+        point_set = arbiter.contact_point_set
+        if point_set.points:
+            p = point_set.points[0]
+            rows.append((arbiter.shapes[1].body.id, *point_set.normal, *arbiter.total_impulse,
+                         *p.point_a, *p.point_b, -p.distance))
+    body.each_arbiter(add)
+    data = np.array([r[1:] for r in rows], dtype=float).reshape(-1, 9)
+    return ContactRows(np.array([r[0] for r in rows], dtype=np.uint64),
+                       data[:, 0:2], data[:, 2:4], data[:, 4:6], data[:, 6:8], data[:, 8])
+
+_graphs:'weakref.WeakKeyDictionary[pymunk.Space, ContactGraph]' = weakref.WeakKeyDictionary()
+
+def graph_of(space:pymunk.Space)->ContactGraph:
+    """Contact graph for the space, created on first use"""
+    graph = _graphs.get(space, None)
+    if graph is None:
+        graph = _graphs[space] = ContactGraph(space)
+    return graph
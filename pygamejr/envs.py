@@ -0,0 +1,265 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from abc import ABC, abstractmethod
+import os
+import gc
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+
+import numpy as np
+
+from pygamejr import game
+from pygamejr.game import World
+
+class Env(ABC):
+    """
+    A game made into an environment for training agents. Methods are called with the
+    env's own headless world current, so they build and read the game with game.*
+    functions like any game script. Subclass it, set the shapes of observations
+    and actions and implement reset, act, outcome and observe.
+    """
+    observation_shape:Tuple[int, ...] = (1,)
+    observation_dtype:Any = np.float32
+    action_shape:Tuple[int, ...] = ()
+    action_dtype:Any = np.float32
+    frames_per_step:int = 1 # game frames each step() runs
+    max_steps:Optional[int] = None # episodes longer than this are cut short
+
+    def start(self)->None:
+        """Start the world, called once"""
+        game.start(headless=True)
+
+    @abstractmethod
+    def reset(self, rng:np.random.Generator)->None:
+        """Build a new episode, the world was emptied with remove_all()"""
+        pass
+
+    @abstractmethod
+    def act(self, action:np.ndarray)->None:
+        """Apply action before the frames of a step run"""
+        pass
+
+    @abstractmethod
+    def outcome(self)->Tuple[float, bool]:
+        """Reward for the step that just ran and whether the episode is over"""
+        pass
+
+    @abstractmethod
+    def observe(self, out:np.ndarray)->None:
+        """Write observation of current state into out, which has observation_shape"""
+        pass
+
+@dataclass
+class _Buffers:
+    """Arrays of all envs, in shared memory when envs run in worker processes"""
+    observations:np.ndarray
+    actions:np.ndarray
+    rewards:np.ndarray
+    terminated:np.ndarray
+    truncated:np.ndarray
+
+_FIELDS = ("observations", "actions", "rewards", "terminated", "truncated")
+
+def _buffer_specs(env:Env, num_envs:int)->Dict[str, Tuple[Tuple[int, ...], Any]]:
+    return dict(observations=((num_envs, *env.observation_shape), env.observation_dtype),
+                actions=((num_envs, *env.action_shape), env.action_dtype),
+                rewards=((num_envs,), np.float32),
+                terminated=((num_envs,), np.bool_),
+                truncated=((num_envs,), np.bool_))
+
+class _Runner:
+    """Worlds of a slice of envs, stepped one after another and reset when their episode ends"""
+    def __init__(self, make_env:Callable[[], Env], indices:Sequence[int],
+                 buffers:_Buffers, seed:int):
+        self.indices = list(indices)
+        self.buffers = buffers
+        self.seed = seed
+        self.envs:List[Env] = []
+        self.worlds:List[World] = []
+        self.steps = [0] * len(self.indices)
+        self.episodes = [0] * len(self.indices)
+        for _ in self.indices:
+            env, world = make_env(), World()
+            with world:
+                env.start()
+            self.envs.append(env)
+            self.worlds.append(world)
+
+    def _reset(self, k:int)->None:
+        env, world, index = self.envs[k], self.worlds[k], self.indices[k]
+        rng = np.random.default_rng([self.seed, index, self.episodes[k]])
+        self.episodes[k] += 1
+        self.steps[k] = 0
+        with world:
+            game.remove_all()
+            env.reset(rng)
+
+    def reset(self)->None:
+        for k, index in enumerate(self.indices):
+            self._reset(k)
+            with self.worlds[k]:
+                self.envs[k].observe(self.buffers.observations[index])
+
+    def step(self)->None:
+        b = self.buffers
+        for k, index in enumerate(self.indices):
+            env, world = self.envs[k], self.worlds[k]
+            with world:
+                env.act(b.actions[index])
+                for _ in range(env.frames_per_step):
+                    game.update()
+                reward, terminated = env.outcome()
+            self.steps[k] += 1
+            truncated = not terminated and env.max_steps is not None and self.steps[k] >= env.max_steps
+            b.rewards[index], b.terminated[index], b.truncated[index] = reward, terminated, truncated
+            # finished episodes start over, observation is the first one of the new episode
+            if terminated or truncated:
+                self._reset(k)
+            with world:
+                env.observe(b.observations[index])
+
+def _attach(names:Dict[str, str], specs:Dict[str, Tuple[Tuple[int, ...], Any]])->Tuple[_Buffers, List[shared_memory.SharedMemory]]:
+    blocks = [shared_memory.SharedMemory(name=names[field]) for field in _FIELDS]
+    arrays = [np.ndarray(specs[field][0], dtype=specs[field][1], buffer=block.buf)
+              for field, block in zip(_FIELDS, blocks)]
+    return _Buffers(*arrays), blocks
+
+def _worker(pipe:Connection, make_env:Callable[[], Env], indices:Sequence[int],
+            names:Dict[str, str], specs:Dict[str, Tuple[Tuple[int, ...], Any]], seed:int)->None:
+    buffers, blocks = _attach(names, specs)
+    runner:Optional[_Runner] = None
+    try:
+        runner = _Runner(make_env, indices, buffers, seed)
+        pipe.send(("ready", None))
+        while True:
+            command = pipe.recv()
+            if command == "reset":
+                runner.reset()
+            elif command == "step":
+                runner.step()
+            elif command == "close":
+                break
+            pipe.send(("ok", None))
+    except Exception as e:
+        pipe.send(("error", repr(e)))
+        raise
+    finally:
+        # arrays and surfaces drawn into them must let go of shared memory before it is closed
+        runner = buffers = None # type: ignore
+        gc.collect()
+        for block in blocks:
+            block.close()
+
+class VectorEnv:
+    """
+    num_envs copies of an env stepped together with reset()/step(), each in its own
+    headless world. With processes > 0 worlds are split among that many worker processes
+    and observations, actions, rewards and flags live in shared memory, so nothing but a
+    short command goes through pipes each step. Envs whose episode ends are reset right
+    away and their returned observation is the first one of the next episode.
+
+    Returned arrays are reused by the next step, copy them to keep them.
+    make_env must be picklable, like a top level function or class, when processes > 0
+    and the multiprocessing start method is spawn.
+    """
+    def __init__(self, make_env:Callable[[], Env], num_envs:int,
+                 processes:int=0, seed:int=0, start_method:Optional[str]=None):
+        self.num_envs = num_envs
+        specs = _buffer_specs(make_env(), num_envs)
+        self._blocks:List[shared_memory.SharedMemory] = []
+        self._pipes:List[Connection] = []
+        self._processes:List[Any] = []
+        self._runner:Optional[_Runner] = None
+
+        if processes <= 0:
+            self._buffers = _Buffers(*[np.zeros(*specs[field]) for field in _FIELDS])
+            self._runner = _Runner(make_env, range(num_envs), self._buffers, seed)
+            return
+
+        names = {}
+        for field in _FIELDS:
+            shape, dtype = specs[field]
+            block = shared_memory.SharedMemory(create=True,
+                                               size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+            self._blocks.append(block)
+            names[field] = block.name
+        self._buffers = _Buffers(*[np.ndarray(specs[field][0], dtype=specs[field][1], buffer=block.buf)
+                                   for field, block in zip(_FIELDS, self._blocks)])
+
+        context = multiprocessing.get_context(start_method)
+        # worker worlds are headless, keep pygame in workers away from display and audio
+        saved = {name: os.environ.get(name) for name in ("SDL_VIDEODRIVER", "SDL_AUDIODRIVER")}
+        os.environ.update(SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+        try:
+            for indices in np.array_split(np.arange(num_envs), min(processes, num_envs)):
+                parent, child = context.Pipe()
+                process = context.Process(target=_worker, daemon=True,
+                                          args=(child, make_env, indices.tolist(), names, specs, seed))
+                process.start()
+                self._pipes.append(parent)
+                self._processes.append(process)
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+        self._wait()
+
+    def _wait(self)->None:
+        for pipe in self._pipes:
+            try:
+                status, message = pipe.recv()
+            except EOFError:
+                status, message = "error", "worker exited"
+            if status == "error":
+                self.close()
+                raise RuntimeError(f"env worker failed: {message}")
+
+    def _run(self, command:str)->None:
+        if self._runner is not None:
+            getattr(self._runner, command)()
+            return
+        for pipe in self._pipes:
+            pipe.send(command)
+        self._wait()
+
+    def reset(self)->np.ndarray:
+        """Start new episodes in all envs, returns (num_envs, *observation_shape) observations"""
+        self._run("reset")
+        return self._buffers.observations
+
+    def step(self, actions:np.ndarray)->Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Apply one action per env and run frames_per_step frames in each.
+        Returns observations, rewards, terminated and truncated flags, one row per env.
+        """
+        self._buffers.actions[...] = actions
+        self._run("step")
+        b = self._buffers
+        return b.observations, b.rewards, b.terminated, b.truncated
+
+    def close(self)->None:
+        for pipe in self._pipes:
+            try:
+                pipe.send("close")
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._pipes.clear()
+        self._processes.clear()
+        self._buffers = None # type: ignore
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self)->'VectorEnv':
+        return self
+
+    def __exit__(self, *exc_info)->None:
+        self.close()
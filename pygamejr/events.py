@@ -0,0 +1,173 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+from dataclasses import dataclass
+
+import pygame
+
+# events that go to actors under the mouse cursor
+MOUSE_EVENTS = frozenset(("on_mousedown", "on_mouseup", "on_mousebutton",
+                          "on_mousemove", "on_mousewheel"))
+
+@dataclass(eq=False)
+class Subscription:
+    """Handler subscribed to an event, call unsubscribe() to stop it"""
+    event:str # name of the event method, like "on_keydown"
+    callback:Callable
+    priority:int=0 # handlers with higher priority are called first
+    owner:Optional[Any]=None # subscriptions of an owner go away with it
+    targeted:bool=False # only called when the event hits the owner, like a click on it
+    order:int=0 # handlers with the same priority are called in subscription order
+    suspended:bool=False
+    bus:Optional['EventBus']=None
+
+    @property
+    def active(self)->bool:
+        return self.bus is not None and not self.suspended
+
+    def unsubscribe(self)->None:
+        if self.bus is not None:
+            self.bus.unsubscribe(self)
+
+def _rank(sub:Subscription):
+    return (-sub.priority, sub.order)
+
+class EventBus:
+    """
+    Handlers of events kept in per event lists sorted by priority. Targeted handlers
+    are indexed by owner, so publishing an event that hits a few owners costs only
+    as much as the handlers of those owners, no matter how many subscribed.
+    """
+    def __init__(self):
+        self._everyone:Dict[str, List[Subscription]] = {}
+        self._targeted:Dict[str, Dict[Any, List[Subscription]]] = {}
+        self._by_owner:Dict[Any, Set[Subscription]] = {}
+        self._suspended:Set[Any] = set()
+        self._order = 0
+
+    def subscribe(self, event:str, callback:Callable, priority:int=0,
+                  owner:Optional[Any]=None, targeted:bool=False)->Subscription:
+        assert not targeted or owner is not None, "targeted subscription needs an owner"
+        self._order += 1
+        sub = Subscription(event=event, callback=callback, priority=priority,
+                           owner=owner, targeted=targeted, order=self._order, bus=self)
+        if owner is not None:
+            self._by_owner.setdefault(owner, set()).add(sub)
+        if owner in self._suspended:
+            sub.suspended = True
+        else:
+            self._insert(sub)
+        return sub
+
+    def _insert(self, sub:Subscription)->None:
+        if sub.targeted:
+            subs = self._targeted.setdefault(sub.event, {}).setdefault(sub.owner, [])
+        else:
+            subs = self._everyone.setdefault(sub.event, [])
+        subs.append(sub)
+        subs.sort(key=_rank)
+
+    def _take_out(self, sub:Subscription)->None:
+        if sub.targeted:
+            targeted = self._targeted[sub.event]
+            targeted[sub.owner].remove(sub)
+            if not targeted[sub.owner]:
+                del targeted[sub.owner]
+        else:
+            self._everyone[sub.event].remove(sub)
+
+    def unsubscribe(self, sub:Subscription)->None:
+        if sub.bus is not self:
+            return
+        if not sub.suspended:
+            self._take_out(sub)
+        subs = self._by_owner.get(sub.owner, None)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._by_owner[sub.owner]
+        sub.bus = None
+
+    def subscriptions_of(self, owner:Any)->Set[Subscription]:
+        return set(self._by_owner.get(owner, ()))
+
+    def detach(self, owner:Any)->None:
+        """Unsubscribe all handlers of the owner"""
+        for sub in list(self._by_owner.get(owner, ())):
+            self.unsubscribe(sub)
+        self._suspended.discard(owner)
+
+    def suspend(self, owner:Any)->None:
+        """Stop handlers of the owner until resume(), new ones start suspended too"""
+        if owner in self._suspended:
+            return
+        self._suspended.add(owner)
+        for sub in self._by_owner.get(owner, ()):
+            self._take_out(sub)
+            sub.suspended = True
+
+    def resume(self, owner:Any)->None:
+        if owner not in self._suspended:
+            return
+        self._suspended.remove(owner)
+        for sub in self._by_owner.get(owner, ()):
+            sub.suspended = False
+            self._insert(sub)
+
+    def wants_hits(self, event:str)->bool:
+        """Are there targeted handlers of the event, so hit testing is worth doing?"""
+        return bool(self._targeted.get(event, None))
+
+    def targets(self, event:str)->List[Any]:
+        """Owners with targeted handlers of the event that aren't suspended, the only ones worth hit testing"""
+        return [owner for owner in self._targeted.get(event, ()) if owner not in self._suspended]
+
+    def publish(self, event:str, *args:Any, hits:Iterable[Any]=())->None:
+        """Call handlers of the event for everyone and targeted handlers of owners that are hit"""
+        subs = self._everyone.get(event, ())
+        targeted = self._targeted.get(event, None)
+        if targeted:
+            hit = [sub for owner in hits for sub in targeted.get(owner, ())]
+            if hit:
+                subs = sorted([*subs, *hit], key=_rank)
+        # handlers can subscribe and unsubscribe while the event is delivered
+        for sub in tuple(subs):
+            if sub.bus is self and not sub.suspended:
+                sub.callback(*args)
+
+    def clear(self, keep:Optional[Any]=None)->None:
+        """Unsubscribe all handlers except the ones of owner keep"""
+        for owner in list(self._by_owner):
+            if owner is not keep:
+                self.detach(owner)
+        for sub in [s for subs in self._everyone.values() for s in subs if s.owner is None]:
+            self.unsubscribe(sub)
+        self._suspended.intersection_update((keep,))
+
+def coalesce(events:Sequence[pygame.event.Event])->List[pygame.event.Event]:
+    """
+    Merge events of one frame so each kind of input is handled once. Mouse motion becomes
+    one event at the place of the last motion with its position and all relative moves
+    added up. Key downs repeated for a key that is already down in this frame are dropped.
+    """
+    merged:List[Optional[pygame.event.Event]] = []
+    motion_at, rel_x, rel_y = -1, 0, 0
+    down:Set[int] = set()
+    for event in events:
+        if event.type == pygame.MOUSEMOTION:
+            if motion_at >= 0:
+                merged[motion_at] = None
+            rel_x, rel_y = rel_x + event.rel[0], rel_y + event.rel[1]
+            motion_at = len(merged)
+        elif event.type == pygame.KEYDOWN:
+            if event.key in down:
+                continue
+            down.add(event.key)
+        elif event.type == pygame.KEYUP:
+            down.discard(event.key)
+        merged.append(event)
+
+    if motion_at >= 0:
+        last = merged[motion_at]
+        assert last is not None
+        if tuple(last.rel) != (rel_x, rel_y):
+            merged[motion_at] = pygame.event.Event(pygame.MOUSEMOTION, {**last.dict, "rel": (rel_x, rel_y)})
+    return [event for event in merged if event is not None]
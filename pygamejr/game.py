@@ -1,25 +1,48 @@
 from typing import List, Tuple, Optional, Set, Dict, Any, Union, Callable, Iterable, Sequence, Iterator
 import random
 import math
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import timeit
 from enum import Enum
 import time
+import weakref
+from multiprocessing import shared_memory
 
 
+import numpy as np
 import pygame
 import pymunk
+import pymunk.batch
 from pymunk import pygame_util, Vec2d
 
 from pygamejr import utils
 from pygamejr import common
-from pygamejr.actor import Actor
+from pygamejr import contacts
+from pygamejr import bullets
+from pygamejr import layers
+from pygamejr.layers import CollisionLayers, collision_layers, PairCounts, count_pairs
+from pygamejr.actor import Actor, ActorGroup, Drawable
+from pygamejr.particles import ParticleSystem
+from pygamejr.fluid import Fluid
+from pygamejr.compound import Compound
+from pygamejr.tilemap import Tilemap, load_tile_grid
+from pygamejr.ropes import Rope, soft_body_mesh
+from pygamejr.joints import JointRegistry
+from pygamejr.events import EventBus, Subscription, MOUSE_EVENTS, coalesce
+from pygamejr.profiler import FrameProfiler, FrameStats, StatsOverlay
+from pygamejr.pacing import FramePacer
+from pygamejr.observation import ObservationTarget
+from pygamejr.scripts import Scheduler, Script, ScriptCoroutine, wait, next_frame
+from pygamejr.timers import GameClock, Timer, Timers
+from pygamejr import animation
+from pygamejr.animation import Animator, animator
 from pygamejr.common import PyGameColor, DrawOptions, Coordinates, Vector2, \
-                            ImagePaintMode, Camera, CameraControls, TextInfo
+                            ImagePaintMode, Camera, CameraControls, TextInfo, BoundsAction
 
 TRANSPARENT_COLOR = (0, 0, 0, 0)
 
 show_mouse_coordinates = False # show mouse coordinates in console?
+show_stats = False # show frame time of each phase and object counts on screen?
 
 clock = pygame.time.Clock() # game clock
 screen:Optional[pygame.Surface] = None # game screen
@@ -52,9 +75,28 @@ class CameraFollow:
 # private variables
 _actors:Set[Actor] = set() # list of all actors
 _body_to_actor:Dict[pymunk.Body, Actor] = {} # map from pymunk body to actor
+_drawables:List[Drawable] = [] # actor groups and other things drawn every frame
+_body_to_group:Dict[pymunk.Body, Tuple[ActorGroup, int]] = {} # map from pymunk body to group member
+_actor_pools:Dict[Actor, 'ActorPool'] = {} # pool that owns the actor
+_world_bounds:Optional['WorldBounds'] = None # what to do with actors that leave the world
+_shape_to_actor:Dict[pymunk.Shape, Actor] = {} # actors sharing space.static_body
+_body_to_compounds:Dict[pymunk.Body, List[Compound]] = {} # compounds using the body, levels share static body
+_collision_handlers:Dict[Tuple[Optional[int], Optional[int]], List['CollisionHandler']] = {}
+_collision_owners:Dict[Any, Set['CollisionHandler']] = {} # handlers by actor's shape, group or compound they filter on
+_next_collision_type = 1 << 16 # collision types given out by on_collision
+_next_shape_group = 1 << 16 # filter groups given to ropes and soft bodies so their parts don't collide
+_batched_constraints:'weakref.WeakSet[pymunk.Constraint]' = weakref.WeakSet() # joints drawn by their rope instead of one by one
+_joints = JointRegistry() # joints of the game indexed by body
 _camera_follow:CameraFollow = CameraFollow() # actor to follow with camera
-# for each handler type, keep list of actors that have that handler
-_actors_handlers:Dict[int, Set[Actor]] = {}
+_events = EventBus() # event handlers, owned by shapes of actors that subscribed
+_frame_events:List[pygame.event.Event] = [] # raw events drained from pygame queue this frame
+_profiler = FrameProfiler() # time spent in each phase of update()
+_stats_overlay = StatsOverlay()
+_pacer = FramePacer() # skips drawing when frames fall behind
+_clock = GameClock() # game time, which scripts, timers and physics follow
+_physics_steps_due = 0. # physics steps owed to game time, fractional when time is scaled
+_scheduler = Scheduler() # actor scripts resumed every frame on game time
+_timers = Timers() # delayed and repeating callbacks on game time
 _running = False # is game currently running?
 _default_poly_radius = 1.0
 _sounds:Dict[str, pygame.mixer.Sound] = {} # sounds
@@ -71,6 +113,7 @@ class ScreenProps:
     image:Optional[pygame.Surface]=None # image to display on screen
     image_scaled:Optional[pygame.Surface]=None # scaled image to display on screen
     title:str="PyGameJr Rocks"
+    headless:bool=False # draw on an offscreen surface only when render() is called, no window or events
 _screen_props = ScreenProps()
 
 def mute():
@@ -179,12 +222,20 @@ def event_to_code(name:str)->int:
     else:
         raise ValueError(f"Unknown event name: {name}")
 
-def handle(event_method:Callable, handler:Callable)->None:
+def handle(event_method:Callable, handler:Callable, priority:int=0,
+           targeted:Optional[bool]=None)->Subscription:
     """
     Assign a handler to a given event method.
 
+    Mouse events go only to actors under the mouse cursor, except for noone which
+    gets all events. Handlers with higher priority are called first.
+
     :param event_method: The bound method of the event to handle (e.g., obj.on_keydown).
-    :param handler: The handler function to replace the original method.
+    :param handler: The handler function, called with the actor and event arguments.
+    :param priority: Order among handlers of the same event, higher goes first.
+    :param targeted: For mouse events, False gets them wherever the mouse is, default is
+        True for actors and False for noone.
+    :return: Subscription, call its unsubscribe() to remove the handler.
     """
     if not callable(event_method):
         raise ValueError("The first argument must be a callable method.")
@@ -194,16 +245,14 @@ def handle(event_method:Callable, handler:Callable)->None:
 
     # Get the name of the method
     method_name = event_method.__name__
+    event_to_code(method_name) # check it is an event
 
-    # register this actor for this event
-    event_code = event_to_code(method_name)
-    global _actors_handlers
-    if event_code not in _actors_handlers:
-        _actors_handlers[event_code] = set()
-    _actors_handlers[event_code].add(self)
-
-    # Set the handler to replace the original event method, making sure it's bound
-    setattr(self, method_name, handler.__get__(self, type(self)))
+    # mouse events are delivered by hit testing the shape, noone is everywhere
+    if targeted is None:
+        targeted = self is not noone
+    targeted = targeted and method_name in MOUSE_EVENTS
+    return _events.subscribe(method_name, handler.__get__(self, type(self)), priority=priority,
+                             owner=self.shape, targeted=targeted)
 
 
 # TODO: replace asserts with exceptions
@@ -223,6 +272,7 @@ def create_image(image_path:Union[str, Iterable[str]],
                 paint_mode:ImagePaintMode=ImagePaintMode.CENTER,
                 draw_options:Optional[DrawOptions]=None,
                 visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                layer:Optional[str]=None,
                 density:Optional[float]=None, elasticity:Optional[float]=None, friction:Optional[float]=None,
                 mass:Optional[float]=None, moment:Optional[float]=None,
                 fixed_object=False, can_rotate=True, can_collide=True,
@@ -273,8 +323,7 @@ def create_image(image_path:Union[str, Iterable[str]],
         shape.elasticity = elasticity
     if friction is not None:
         shape.friction = friction
-    if not can_collide:
-        shape.filter = pymunk.ShapeFilter(categories=0x1, mask=0x0)
+    collision_layers.apply(shape, layer, can_collide=can_collide)
     if not can_rotate:
         shape.body.moment = float('inf')
     if colliision_group is not None:
@@ -300,16 +349,406 @@ def create_image(image_path:Union[str, Iterable[str]],
 
     return actor
 
-def touches_who(actor:Actor)->Iterator[Tuple[Actor, pymunk.ContactPointSet]]:
-    """Return set of actors that actor touches"""
+def touches_who(actor:Actor, exact:Optional[bool]=None)->Iterator[Tuple[Actor, pymunk.ContactPointSet]]:
+    """
+    Return set of actors that actor touches. Contacts are read from last physics step
+    unless exact is True, by default exact query is used for actors that are not dynamic.
+    """
     if actor.shape.space is None:
         return
 
-    colliding_shapes = actor.shape.space.shape_query(actor.shape)
+    if actor._exact_contacts(exact):
+        colliding_shapes = actor.shape.space.shape_query(actor.shape)
+    else:
+        colliding_shapes = []
+        shared_bodies = set()
+        for body, contact_point_set in contacts.graph_of(space).contacts(actor.shape.body):
+            other = _actor_of(body)
+            if other is not None:
+                yield (other, contact_point_set)
+            else:
+                shared_bodies.add(body)
+        if shared_bodies:
+            # level geometry and compounds share a body between many shapes so find which ones actor touches
+            colliding_shapes = [s for s in space.shape_query(actor.shape) if s.shape.body in shared_bodies]
 
     for s in colliding_shapes:
         if s.shape is not None and s.shape.body is not None and s.shape.body != actor.shape.body:
-            yield (_body_to_actor[s.shape.body], s.contact_point_set)
+            other = _actor_of_shape(s.shape)
+            if other is not None:
+                yield (other, s.contact_point_set)
+
+def _actor_of(body:Optional[pymunk.Body])->Optional[Actor]:
+    """Return actor for the body, group members are returned as their actor view"""
+    actor = _body_to_actor.get(body, None) # type: ignore
+    if actor is None:
+        member = _body_to_group.get(body, None) # type: ignore
+        if member is not None:
+            actor = member[0][member[1]]
+    return actor
+
+def _actor_of_shape(shape:pymunk.Shape)->Optional[Actor]:
+    """Return actor for the shape, this also works for shapes sharing space.static_body"""
+    actor = _shape_to_actor.get(shape, None)
+    if actor is None:
+        for compound in _body_to_compounds.get(shape.body, ()):
+            index = compound.index_of(shape)
+            if index is not None:
+                return compound[index]
+        actor = _actor_of(shape.body)
+    return actor
+
+CollisionSide = Optional[Union[Actor, ActorGroup, Compound, int]]
+CollisionCallback = Callable[[Actor, Actor, pymunk.Arbiter], Any]
+
+class CollisionHandler:
+    """Callbacks registered with on_collision, call cancel() to stop receiving them"""
+    def __init__(self, key:Tuple[Optional[int], Optional[int]],
+                 filter_a:Optional[Union[Actor, ActorGroup, Compound]], filter_b:Optional[Union[Actor, ActorGroup, Compound]],
+                 swapped:bool,
+                 begin:Optional[CollisionCallback], pre_solve:Optional[CollisionCallback],
+                 post_solve:Optional[CollisionCallback], separate:Optional[CollisionCallback]):
+        self.key = key
+        self.filter_a, self.filter_b = filter_a, filter_b
+        self.swapped = swapped # user's a is second in key
+        self.callbacks = {'begin': begin, 'pre_solve': pre_solve,
+                          'post_solve': post_solve, 'separate': separate}
+
+    @property
+    def owners(self)->List[Any]:
+        return [_collision_owner(f) for f in (self.filter_a, self.filter_b) if f is not None]
+
+    def cancel(self)->None:
+        for owner in self.owners:
+            handlers = _collision_owners.get(owner, None)
+            if handlers is not None:
+                handlers.discard(self)
+                if not handlers:
+                    del _collision_owners[owner]
+        handlers = _collision_handlers.get(self.key, None)
+        if handlers is not None and self in handlers:
+            handlers.remove(self)
+            _register_collision_phases(self.key)
+            if not handlers:
+                del _collision_handlers[self.key]
+
+def _collision_owner(filter:Union[Actor, ActorGroup, Compound])->Any:
+    """Key handlers are kept under, same as actor's events, scripts and timers"""
+    return filter.shape if isinstance(filter, Actor) else filter
+
+def _cancel_collisions(owner:Any)->None:
+    """Cancel collision handlers that filter on owner, which is going away"""
+    for handler in list(_collision_owners.get(owner, ())):
+        handler.cancel()
+
+def _matches(filter:Optional[Union[Actor, ActorGroup, Compound]], actor:Actor)->bool:
+    if filter is None or filter is actor:
+        return True
+    if isinstance(filter, Compound):
+        return filter.index_of(actor.shape) is not None
+    if isinstance(filter, ActorGroup):
+        member = _body_to_group.get(actor.shape.body, None)
+        return member is not None and member[0] is filter
+    return False
+
+def _collision_type_of(side:CollisionSide)->Tuple[Optional[int], Optional[Union[Actor, ActorGroup, Compound]]]:
+    """Collision type to register handler for and actor or group to filter callbacks by"""
+    global _next_collision_type
+    if side is None or isinstance(side, int):
+        return side, None
+    shapes = side.shapes if isinstance(side, (ActorGroup, Compound)) else [side.shape]
+    types = set(s.collision_type for s in shapes)
+    if len(types) == 1 and 0 not in types:
+        return types.pop(), side
+    # give actor its own type so that pymunk only calls us for its contacts
+    _next_collision_type += 1
+    for s in shapes:
+        s.collision_type = _next_collision_type
+    if isinstance(side, Compound):
+        side.collision_type = _next_collision_type # for pieces added later
+    return _next_collision_type, side
+
+def _dispatch_collision(phase:str, arbiter:pymunk.Arbiter, space:pymunk.Space, key:Any)->None:
+    shape_a, shape_b = arbiter.shapes
+    actor_a, actor_b = _actor_of_shape(shape_a), _actor_of_shape(shape_b)
+    if actor_a is None or actor_b is None:
+        return
+    for handler in list(_collision_handlers.get(key, [])):
+        callback = handler.callbacks[phase]
+        if callback is None:
+            continue
+        first, second = (actor_b, actor_a) if handler.swapped else (actor_a, actor_b)
+        if not (_matches(handler.filter_a, first) and _matches(handler.filter_b, second)):
+            # shapes of same collision type come in any order
+            if key[0] != key[1] or not (_matches(handler.filter_a, second) and _matches(handler.filter_b, first)):
+                continue
+            first, second = second, first
+        if callback(first, second, arbiter) is False and phase in ('begin', 'pre_solve'):
+            arbiter.process_collision = False
+
+def _register_collision_phases(key:Tuple[Optional[int], Optional[int]])->None:
+    """Install pymunk callbacks only for phases somebody listens to"""
+    handlers = _collision_handlers.get(key, [])
+    phases = {}
+    for phase in ('begin', 'pre_solve', 'post_solve', 'separate'):
+        if any(h.callbacks[phase] is not None for h in handlers):
+            phases[phase] = lambda arbiter, space, data, phase=phase: _dispatch_collision(phase, arbiter, space, data)
+        else:
+            phases[phase] = pymunk.empty_callback
+    space.on_collision(key[0], key[1], data=key, **phases)
+
+def on_collision(a:CollisionSide, b:CollisionSide=None,
+                 begin:Optional[CollisionCallback]=None,
+                 separate:Optional[CollisionCallback]=None,
+                 pre_solve:Optional[CollisionCallback]=None,
+                 post_solve:Optional[CollisionCallback]=None)->CollisionHandler:
+    """
+    Call back when a collides with b. Each side can be an actor, actor group, collision_type
+    number or None for anything. Callbacks are called as callback(actor_a, actor_b, arbiter)
+    using contacts physics engine has already found, begin when they start touching and separate
+    when they stop. If begin or pre_solve returns False, the collision is ignored.
+    """
+    assert any(c is not None for c in (begin, separate, pre_solve, post_solve)), "Specify at least one callback."
+    type_a, filter_a = _collision_type_of(a)
+    type_b, filter_b = _collision_type_of(b)
+    swapped = type_a is None and type_b is not None # pymunk wants wildcard second
+    key = (type_b, type_a) if swapped else (type_a, type_b)
+
+    handler = CollisionHandler(key, filter_a, filter_b, swapped,
+                               begin=begin, pre_solve=pre_solve,
+                               post_solve=post_solve, separate=separate)
+    _collision_handlers.setdefault(key, []).append(handler)
+    for owner in handler.owners:
+        _collision_owners.setdefault(owner, set()).add(handler)
+    _register_collision_phases(key)
+    return handler
+
+ActorFilter = Callable[[Actor], bool]
+
+def set_layers_collide(a:str, b:str, collides:bool=True)->None:
+    """Make actors on layer a collide with actors on layer b or pass through them"""
+    collision_layers.set_collides(a, b, collides)
+
+def set_collision_matrix(matrix:Dict[str, Iterable[str]])->None:
+    """
+    Set which layers each layer collides with, for example
+    {"bullet": ["enemy", "terrain"], "particle": ["terrain"]} makes bullets pass through
+    bullets and particles hit only terrain. Actors without layer are on "default" layer.
+    """
+    collision_layers.set_matrix(matrix)
+
+def layers_collide(a:str, b:str)->bool:
+    return collision_layers.collides(a, b)
+
+def collision_pair_counts()->PairCounts:
+    """Shape pairs in broad phase, narrow phase and in contact after the last step, for debugging"""
+    return count_pairs(space)
+
+@dataclass
+class RaycastHit:
+    """Where ray hit an actor, alpha is fraction of the way from start to end"""
+    actor:Actor
+    point:Vec2d
+    normal:Vec2d
+    alpha:float
+
+_query_body = pymunk.Body(body_type=pymunk.Body.STATIC) # holds temporary shapes used for queries
+_any_shape = pymunk.ShapeFilter()
+
+def _actors_of_shapes(shapes:Iterable[pymunk.Shape], filter:Optional[ActorFilter])->List[Actor]:
+    """Unique actors of shapes in order, shapes without actor are skipped"""
+    found:Dict[Actor, None] = {}
+    for shape in shapes:
+        actor = _actor_of_shape(shape)
+        if actor is not None and actor not in found and (filter is None or filter(actor)):
+            found[actor] = None
+    return list(found)
+
+def actors_in_rect(bottom_left:Coordinates, top_right:Coordinates,
+                   filter:Optional[ActorFilter]=None, exact:bool=True)->List[Actor]:
+    """
+    Actors overlapping the rectangle. filter(actor) can be used to only keep some actors.
+    If exact is False, actors whose bounding box overlaps the rectangle are returned which is faster.
+    Only actors that can collide are found.
+    """
+    bb = pymunk.BB(bottom_left[0], bottom_left[1], top_right[0], top_right[1])
+    if exact:
+        box = pymunk.Poly(_query_body, [(bb.left, bb.bottom), (bb.right, bb.bottom),
+                                        (bb.right, bb.top), (bb.left, bb.top)])
+        box.cache_bb()
+        shapes:Iterable[pymunk.Shape] = [info.shape for info in space.shape_query(box)]
+    else:
+        shapes = space.bb_query(bb, _any_shape)
+    return _actors_of_shapes(shapes, filter)
+
+def actors_in_radius(center:Coordinates, radius:float,
+                     filter:Optional[ActorFilter]=None)->List[Actor]:
+    """Actors within radius of center, nearest first"""
+    infos = sorted(space.point_query(center, radius, _any_shape), key=lambda info: info.distance)
+    return _actors_of_shapes((info.shape for info in infos), filter)
+
+def nearest_actor(point:Coordinates, filter:Optional[ActorFilter]=None,
+                  max_distance:float=math.inf)->Optional[Actor]:
+    """Actor nearest to the point that passes filter, None if nothing within max_distance"""
+    info = space.point_query_nearest(point, max_distance, _any_shape)
+    if info is None or info.shape is None:
+        return None
+    actor = _actor_of_shape(info.shape)
+    if actor is not None and (filter is None or filter(actor)):
+        return actor
+    # nearest one is filtered out so look at everything in range
+    actors = actors_in_radius(point, max_distance, filter)
+    return actors[0] if actors else None
+
+def raycast_all(start:Coordinates, end:Coordinates, radius:float=0.,
+                filter:Optional[ActorFilter]=None)->List[RaycastHit]:
+    """Every actor the segment from start to end (thickened by radius) hits, nearest first"""
+    hits:Dict[Actor, RaycastHit] = {}
+    for info in sorted(space.segment_query(start, end, radius, _any_shape), key=lambda info: info.alpha):
+        actor = _actor_of_shape(info.shape)
+        if actor is not None and actor not in hits and (filter is None or filter(actor)):
+            hits[actor] = RaycastHit(actor=actor, point=info.point, normal=info.normal, alpha=info.alpha)
+    return list(hits.values())
+
+def raycast(start:Coordinates, end:Coordinates, radius:float=0.,
+            filter:Optional[ActorFilter]=None)->Optional[RaycastHit]:
+    """First actor the segment from start to end (thickened by radius) hits"""
+    if filter is None:
+        info = space.segment_query_first(start, end, radius, _any_shape)
+        if info is not None:
+            actor = _actor_of_shape(info.shape)
+            if actor is not None:
+                return RaycastHit(actor=actor, point=info.point, normal=info.normal, alpha=info.alpha)
+            # ray hit something that isn't an actor, look further
+    hits = raycast_all(start, end, radius=radius, filter=filter)
+    return hits[0] if hits else None
+
+def actors_in_rects(bottom_lefts:Union[np.ndarray, Sequence[Coordinates]],
+                    top_rights:Union[np.ndarray, Sequence[Coordinates]],
+                    filter:Optional[ActorFilter]=None, exact:bool=True)->List[List[Actor]]:
+    """actors_in_rect for each pair of corners given as (n, 2) arrays"""
+    bottom_lefts = np.asarray(bottom_lefts, dtype=float).reshape(-1, 2)
+    top_rights = _broadcast_xy(top_rights, len(bottom_lefts))
+    return [actors_in_rect(bl, tr, filter=filter, exact=exact)
+            for bl, tr in zip(bottom_lefts.tolist(), top_rights.tolist())]
+
+def actors_in_radii(centers:Union[np.ndarray, Sequence[Coordinates]],
+                    radii:Union[float, Sequence[float], np.ndarray],
+                    filter:Optional[ActorFilter]=None)->List[List[Actor]]:
+    """actors_in_radius for each center, radii can be one value for all or one per center"""
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    radii = _broadcast(radii, len(centers))
+    return [actors_in_radius(c, r, filter=filter) for c, r in zip(centers.tolist(), radii.tolist())]
+
+def nearest_actors(points:Union[np.ndarray, Sequence[Coordinates]],
+                   filter:Optional[ActorFilter]=None,
+                   max_distance:float=math.inf)->List[Optional[Actor]]:
+    """nearest_actor for each of (n, 2) points"""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    return [nearest_actor(p, filter=filter, max_distance=max_distance) for p in points.tolist()]
+
+def raycasts(starts:Union[np.ndarray, Sequence[Coordinates]],
+             ends:Union[np.ndarray, Sequence[Coordinates]],
+             radius:float=0., filter:Optional[ActorFilter]=None)->List[Optional[RaycastHit]]:
+    """raycast for each pair of start and end points given as (n, 2) arrays"""
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = _broadcast_xy(ends, len(starts))
+    return [raycast(s, e, radius=radius, filter=filter) for s, e in zip(starts.tolist(), ends.tolist())]
+
+@dataclass
+class BodyStates:
+    """Physics state of many actors, row i belongs to actor i"""
+    positions:np.ndarray # (n, 2)
+    velocities:np.ndarray # (n, 2)
+    angles:np.ndarray # (n,) degrees
+    angular_velocities:np.ndarray # (n,) degrees per second
+
+ActorsLike = Union[ActorGroup, Sequence[Actor]]
+
+_STATE_FIELDS = pymunk.batch.BodyFields(pymunk.batch.BodyFields.BODY_ID |
+                                        pymunk.batch.BodyFields.POSITION |
+                                        pymunk.batch.BodyFields.ANGLE |
+                                        pymunk.batch.BodyFields.VELOCITY |
+                                        pymunk.batch.BodyFields.ANGULAR_VELOCITY)
+_state_buffer = pymunk.batch.Buffer()
+
+def _bodies_of(actors:ActorsLike)->Tuple[List[pymunk.Body], np.ndarray]:
+    """Bodies and their pymunk ids, for a group only alive members are used"""
+    if isinstance(actors, ActorGroup):
+        alive = np.flatnonzero(actors.alive)
+        bodies = actors.bodies
+        return [bodies[i] for i in alive.tolist()], actors.body_ids()[alive]
+    bodies = [a.shape.body for a in actors]
+    return bodies, np.array([b.id for b in bodies], dtype=np.uint64)
+
+def get_states(actors:ActorsLike)->BodyStates:
+    """
+    Positions, velocities, angles and angular velocities of many actors as arrays.
+    State of every body in the space is read in one batch call, so this is much
+    faster than reading actor properties one by one.
+    """
+    bodies, ids = _bodies_of(actors)
+    _state_buffer.clear()
+    pymunk.batch.get_space_bodies(space, _STATE_FIELDS, _state_buffer)
+    all_ids = np.frombuffer(_state_buffer.int_buf(), dtype=np.uint64)
+    # position, angle, velocity, angular velocity in field order
+    data = np.frombuffer(_state_buffer.float_buf(), dtype=float).reshape(-1, 6)
+
+    order = np.argsort(all_ids)
+    found = np.searchsorted(all_ids, ids, sorter=order)
+    assert np.all(found < len(order)) and np.all(all_ids[order[np.minimum(found, len(order) - 1)]] == ids), \
+        "All actors must be in the game"
+    rows = data[order[found]]
+    return BodyStates(positions=rows[:, 0:2].copy(),
+                      velocities=rows[:, 3:5].copy(),
+                      angles=np.degrees(rows[:, 2]),
+                      angular_velocities=np.degrees(rows[:, 5]))
+
+def set_states(actors:ActorsLike, states:Optional[BodyStates]=None,
+               positions:Optional[Union[np.ndarray, Coordinates]]=None,
+               velocities:Optional[Union[np.ndarray, Vector2]]=None,
+               angles:Optional[Union[np.ndarray, float]]=None,
+               angular_velocities:Optional[Union[np.ndarray, float]]=None)->None:
+    """
+    Write states back to actors, either whole BodyStates or only some of the arrays.
+    One value instead of an array is used for all actors.
+    """
+    if states is not None:
+        positions, velocities = states.positions, states.velocities
+        angles, angular_velocities = states.angles, states.angular_velocities
+    bodies, _ = _bodies_of(actors)
+    n = len(bodies)
+    # batch write would touch every body in the space and wake sleeping ones,
+    # so only requested bodies are written, from plain lists to keep it cheap
+    if positions is not None:
+        for body, xy in zip(bodies, _broadcast_xy(positions, n).tolist()):
+            body.position = xy
+    if velocities is not None:
+        for body, v in zip(bodies, _broadcast_xy(velocities, n).tolist()):
+            body.velocity = v
+    if angles is not None:
+        for body, a in zip(bodies, np.radians(_broadcast(angles, n)).tolist()):
+            body.angle = a
+    if angular_velocities is not None:
+        for body, w in zip(bodies, np.radians(_broadcast(angular_velocities, n)).tolist()):
+            body.angular_velocity = w
+
+def apply_forces(actors:ActorsLike, forces:Union[np.ndarray, Vector2],
+                 torques:Optional[Union[np.ndarray, float]]=None)->None:
+    """Apply force to center of each actor for the next physics step, one force is used for all"""
+    bodies, _ = _bodies_of(actors)
+    n = len(bodies)
+    for body, f in zip(bodies, _broadcast_xy(forces, n).tolist()):
+        body.apply_force_at_local_point(f)
+    if torques is not None:
+        for body, t in zip(bodies, _broadcast(torques, n).tolist()):
+            body.torque += t
+
+def apply_impulses(actors:ActorsLike, impulses:Union[np.ndarray, Vector2])->None:
+    """Apply impulse to center of each actor right away, one impulse is used for all"""
+    bodies, _ = _bodies_of(actors)
+    for body, j in zip(bodies, _broadcast_xy(impulses, len(bodies)).tolist()):
+        body.apply_impulse_at_local_point(j)
 
 
 def create_rect(width:float=20, height:float=20,
@@ -324,6 +763,7 @@ def create_rect(width:float=20, height:float=20,
                 paint_mode:ImagePaintMode=ImagePaintMode.CENTER,
                 draw_options:Optional[DrawOptions]=None,
                 visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                layer:Optional[str]=None,
                 density:Optional[float]=None, elasticity:Optional[float]=None, friction:Optional[float]=None,
                 mass:Optional[float]=None, moment:Optional[float]=None,
                 fixed_object=False, can_rotate=True, can_collide=True,
@@ -367,8 +807,7 @@ def create_rect(width:float=20, height:float=20,
         shape.elasticity = elasticity
     if friction is not None:
         shape.friction = friction
-    if not can_collide:
-        shape.filter = pymunk.ShapeFilter(categories=0x1, mask=0x0)
+    collision_layers.apply(shape, layer, can_collide=can_collide)
     if not can_rotate:
         shape.body.moment = float('inf')
     if colliision_group is not None:
@@ -406,6 +845,7 @@ def create_line(start_pt:Coordinates,
                 paint_mode:ImagePaintMode=ImagePaintMode.CENTER,
                 draw_options:Optional[DrawOptions]=None,
                 visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                layer:Optional[str]=None,
                 density:Optional[float]=None, elasticity:Optional[float]=None, friction:Optional[float]=None,
                 mass:Optional[float]=None, moment:Optional[float]=None,
                 fixed_object=True, can_rotate=True, can_collide=True,
@@ -440,8 +880,7 @@ def create_line(start_pt:Coordinates,
         shape.elasticity = elasticity
     if friction is not None:
         shape.friction = friction
-    if not can_collide:
-        shape.filter = pymunk.ShapeFilter(categories=0x1, mask=0x0)
+    collision_layers.apply(shape, layer, can_collide=can_collide)
     if not can_rotate:
         shape.body.moment = float('inf')
     if colliision_group is not None:
@@ -465,7 +904,10 @@ def create_line(start_pt:Coordinates,
                   draw_options=draw_options,)
 
     _actors.add(actor)
-    _body_to_actor[shape.body] = actor
+    if body is space.static_body:
+        _shape_to_actor[shape] = actor
+    else:
+        _body_to_actor[shape.body] = actor
 
     return actor
 
@@ -482,6 +924,7 @@ def create_circle(radius:float=20,
                 paint_mode:ImagePaintMode=ImagePaintMode.CENTER,
                 draw_options:Optional[DrawOptions]=None,
                 visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                layer:Optional[str]=None,
                 density:Optional[float]=None, elasticity:Optional[float]=None, friction:Optional[float]=None,
                 mass:Optional[float]=None, moment:Optional[float]=None,
                 fixed_object=False, can_rotate=True, can_collide=True,
@@ -520,8 +963,7 @@ def create_circle(radius:float=20,
         shape.elasticity = elasticity
     if friction is not None:
         shape.friction = friction
-    if not can_collide:
-        shape.filter = pymunk.ShapeFilter(categories=0x1, mask=0x0)
+    collision_layers.apply(shape, layer, can_collide=can_collide)
     if not can_rotate:
         shape.body.moment = float('inf')
     if colliision_group is not None:
@@ -559,6 +1001,7 @@ def create_ellipse(width:int=20, height:int=20,
                 paint_mode:ImagePaintMode=ImagePaintMode.CENTER,
                 draw_options:Optional[DrawOptions]=None,
                 visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                layer:Optional[str]=None,
                 density:Optional[float]=None, elasticity:Optional[float]=None, friction:Optional[float]=None,
                 mass:Optional[float]=None, moment:Optional[float]=None,
                 fixed_object=False, can_rotate=True, can_collide=True,
@@ -598,8 +1041,7 @@ def create_ellipse(width:int=20, height:int=20,
         shape.elasticity = elasticity
     if friction is not None:
         shape.friction = friction
-    if not can_collide:
-        shape.filter = pymunk.ShapeFilter(categories=0x1, mask=0x0)
+    collision_layers.apply(shape, layer, can_collide=can_collide)
     if not can_rotate:
         shape.body.moment = float('inf')
     if colliision_group is not None:
@@ -638,6 +1080,7 @@ def create_polygon_any(points:Sequence[Coordinates],
                 paint_mode:ImagePaintMode=ImagePaintMode.CENTER,
                 draw_options:Optional[DrawOptions]=None,
                 visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                layer:Optional[str]=None,
                 density:Optional[float]=None, elasticity:Optional[float]=None, friction:Optional[float]=None,
                 mass:Optional[float]=None, moment:Optional[float]=None,
                 fixed_object=False, can_rotate=True, can_collide=True,
@@ -685,8 +1128,7 @@ def create_polygon_any(points:Sequence[Coordinates],
         shape.elasticity = elasticity
     if friction is not None:
         shape.friction = friction
-    if not can_collide:
-        shape.filter = pymunk.ShapeFilter(categories=0x1, mask=0x0)
+    collision_layers.apply(shape, layer, can_collide=can_collide)
     if not can_rotate:
         shape.body.moment = float('inf')
     if colliision_group is not None:
@@ -724,6 +1166,7 @@ def create_polygon(sides:int, width:int=20, height:int=20,
                 paint_mode:ImagePaintMode=ImagePaintMode.CENTER,
                 draw_options:Optional[DrawOptions]=None,
                 visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                layer:Optional[str]=None,
                 density:Optional[float]=None, elasticity:Optional[float]=None, friction:Optional[float]=None,
                 mass:Optional[float]=None, moment:Optional[float]=None,
                 fixed_object=False, can_rotate=True, can_collide=True,
@@ -742,12 +1185,308 @@ def create_polygon(sides:int, width:int=20, height:int=20,
                 transparency_enabled=transparency_enabled,
                 paint_mode=paint_mode,
                 draw_options=draw_options,
-                visible=visible, colliision_group=colliision_group, collision_type=collision_type,
+                visible=visible, colliision_group=colliision_group, collision_type=collision_type, layer=layer,
                 density=density, elasticity=elasticity, friction=friction,
                 mass=mass, moment=moment,
                 fixed_object=fixed_object, can_rotate=can_rotate, can_collide=can_collide,
                 velocity=velocity, angular_velocity=angular_velocity)
 
+def _broadcast(value:Any, n:int)->np.ndarray:
+    """Broadcast scalar or sequence to array of n floats"""
+    return np.broadcast_to(np.asarray(value, dtype=float), (n,))
+
+def _broadcast_xy(value:Any, n:int)->np.ndarray:
+    """Broadcast coordinates or sequence of coordinates to (n, 2) array"""
+    return np.broadcast_to(np.asarray(value, dtype=float).reshape(-1, 2), (n, 2))
+
+def _broadcast_colors(color:Any, n:int)->List[PyGameColor]:
+    """Single color or sequence of colors to list of n colors"""
+    is_single = isinstance(color, (str, int, pygame.Color)) or \
+                (len(color) in (3, 4) and all(isinstance(c, (int, np.integer)) for c in color))
+    if is_single:
+        return [color] * n
+    colors = list(color)
+    assert len(colors) == n, f"Expected {n} colors but got {len(colors)}"
+    return colors
+
+def _create_group(shapes:List[pymunk.Shape], bodies:List[pymunk.Body],
+                  color:Any, border:int, visible:bool,
+                  density:Optional[float], elasticity:Optional[float], friction:Optional[float],
+                  can_rotate:bool, can_collide:bool,
+                  colliision_group:Optional[int], collision_type:Optional[int], layer:Optional[str],
+                  velocities:Optional[Any], angular_velocity:float)->ActorGroup:
+    n = len(shapes)
+    if velocities is not None:
+        for body, v in zip(bodies, _broadcast_xy(velocities, n).tolist()):
+            body.velocity = v
+    if angular_velocity:
+        w = math.radians(angular_velocity)
+        for body in bodies:
+            body.angular_velocity = w
+    for shape in shapes:
+        if density is not None:
+            shape.density = density
+        if elasticity is not None:
+            shape.elasticity = elasticity
+        if friction is not None:
+            shape.friction = friction
+        collision_layers.apply(shape, layer, can_collide=can_collide)
+        if not can_rotate:
+            shape.body.moment = float('inf')
+        if colliision_group is not None:
+            shape.group = colliision_group
+        if collision_type is not None:
+            shape.collision_type = collision_type
+
+    common.add_shuffled(space, bodies, shapes)
+
+    group = ActorGroup(shapes, colors=_broadcast_colors(color, n),
+                       border=border, visible=visible)
+    _drawables.append(group)
+    _body_to_group.update((body, (group, i)) for i, body in enumerate(bodies))
+    return group
+
+def _create_bodies(positions:np.ndarray, angles:np.ndarray,
+                   masses:Optional[np.ndarray], moments:Optional[np.ndarray],
+                   body_type:int)->List[pymunk.Body]:
+    n = len(positions)
+    if masses is None:
+        masses = np.zeros(n)
+    if moments is None:
+        moments = np.zeros(n)
+    bodies = []
+    for m, i, p, a in zip(masses.tolist(), moments.tolist(), positions.tolist(), angles.tolist()):
+        body = pymunk.Body(mass=m, moment=i, body_type=body_type)
+        body.position = p
+        body.angle = a
+        bodies.append(body)
+    return bodies
+
+def create_circles(centers:Union[np.ndarray, Sequence[Coordinates]],
+                radii:Union[float, Sequence[float], np.ndarray]=20,
+                color:Union[PyGameColor, Sequence[PyGameColor]]="red",
+                border=0,
+                visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                layer:Optional[str]=None,
+                density:Optional[float]=None, elasticity:Optional[float]=None, friction:Optional[float]=None,
+                mass:Optional[Union[float, Sequence[float], np.ndarray]]=None,
+                fixed_object=False, can_rotate=True, can_collide=True,
+                velocities:Optional[Union[Vector2, Sequence[Vector2], np.ndarray]]=None,
+                angular_velocity:float=0.) -> ActorGroup:
+    """
+    Create many circles in one go. Centers is (n, 2) array or sequence of coordinates,
+    radii, mass and color can be one value for all circles or one value per circle.
+    All bodies and shapes are added to the space at once and returned group is drawn in one pass.
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    n = len(centers)
+    radii = _broadcast(radii, n)
+
+    body_type = pymunk.Body.DYNAMIC if any(v is not None for v in (density, mass)) else pymunk.Body.KINEMATIC
+    if fixed_object:
+        body_type = pymunk.Body.STATIC
+
+    masses = moments = None
+    if mass is not None:
+        masses = _broadcast(mass, n)
+        moments = masses * radii * radii / 2. # same as pymunk.moment_for_circle(mass, 0, radius)
+
+    bodies = _create_bodies(centers, np.zeros(n), masses, moments, body_type)
+    shapes:List[pymunk.Shape] = [pymunk.Circle(body, r) for body, r in zip(bodies, radii.tolist())]
+
+    return _create_group(shapes, bodies, color=color, border=border, visible=visible,
+                         density=density, elasticity=elasticity, friction=friction,
+                         can_rotate=can_rotate, can_collide=can_collide,
+                         colliision_group=colliision_group, collision_type=collision_type, layer=layer,
+                         velocities=velocities, angular_velocity=angular_velocity)
+
+def create_rects(centers:Optional[Union[np.ndarray, Sequence[Coordinates]]]=None,
+                widths:Union[float, Sequence[float], np.ndarray]=20,
+                heights:Union[float, Sequence[float], np.ndarray]=20,
+                color:Union[PyGameColor, Sequence[PyGameColor]]="red",
+                bottom_lefts:Optional[Union[np.ndarray, Sequence[Coordinates]]]=None,
+                angles:Union[float, Sequence[float], np.ndarray]=0.0, border=0,
+                visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                layer:Optional[str]=None,
+                density:Optional[float]=None, elasticity:Optional[float]=None, friction:Optional[float]=None,
+                mass:Optional[Union[float, Sequence[float], np.ndarray]]=None,
+                fixed_object=False, can_rotate=True, can_collide=True,
+                velocities:Optional[Union[Vector2, Sequence[Vector2], np.ndarray]]=None,
+                angular_velocity:float=0.) -> ActorGroup:
+    """
+    Create many rectangles in one go. Specify either centers or bottom_lefts as (n, 2) array
+    or sequence of coordinates, other parameters can be one value for all rectangles or
+    one value per rectangle.
+    """
+    assert (centers is None) != (bottom_lefts is None), "Specify either centers or bottom_lefts, only one or the other."
+    positions = np.asarray(centers if centers is not None else bottom_lefts, dtype=float).reshape(-1, 2)
+    n = len(positions)
+    widths, heights, angles = _broadcast(widths, n), _broadcast(heights, n), _broadcast(angles, n)
+    if bottom_lefts is not None:
+        positions = positions + np.stack((widths, heights), axis=1) / 2.
+
+    body_type = pymunk.Body.DYNAMIC if any(v is not None for v in (density, mass)) else pymunk.Body.KINEMATIC
+    if fixed_object:
+        body_type = pymunk.Body.STATIC
+
+    masses = moments = None
+    if mass is not None:
+        masses = _broadcast(mass, n)
+        moments = masses * (widths * widths + heights * heights) / 12. # same as pymunk.moment_for_box
+
+    bodies = _create_bodies(positions, angles, masses, moments, body_type)
+    shapes:List[pymunk.Shape] = [pymunk.Poly.create_box(body, size=(w, h), radius=0)
+                                 for body, w, h in zip(bodies, widths.tolist(), heights.tolist())]
+
+    return _create_group(shapes, bodies, color=color, border=border, visible=visible,
+                         density=density, elasticity=elasticity, friction=friction,
+                         can_rotate=can_rotate, can_collide=can_collide,
+                         colliision_group=colliision_group, collision_type=collision_type, layer=layer,
+                         velocities=velocities, angular_velocity=angular_velocity)
+
+def create_particles(capacity:int=10000,
+                     size:int=2,
+                     color:PyGameColor="white",
+                     lifetime:float=2.0,
+                     position:Coordinates=(0, 0),
+                     velocity:Vector2=(0, 0),
+                     velocity_spread:float=0.,
+                     rate:float=0.,
+                     gravity_scale:float=1.0,
+                     damping:float=0.0,
+                     fade:bool=True,
+                     collide:bool=False,
+                     elasticity:float=0.3,
+                     friction:float=0.1,
+                     kill_on_collision:bool=False,
+                     layer:Optional[str]=None,
+                     visible:bool=True) -> ParticleSystem:
+    """
+    Create particle system for cosmetic effects like sparks, smoke or rain.
+    Particles don't go through physics engine so you can have many thousands of them.
+    Use emit() on returned system to spawn particles or set rate to spawn them continuously
+    at position. If collide is True, particles bounce off fixed objects, with layer
+    only off fixed objects on layers the particle layer collides with.
+    """
+    particles = ParticleSystem(space,
+                               capacity=capacity, size=size, color=color,
+                               lifetime=lifetime, position=position,
+                               velocity=velocity, velocity_spread=velocity_spread,
+                               rate=rate, gravity_scale=gravity_scale, damping=damping,
+                               fade=fade, collide=collide, elasticity=elasticity,
+                               friction=friction, kill_on_collision=kill_on_collision,
+                               layer=layer, dt=1./screen_fps(), visible=visible)
+    _drawables.append(particles)
+    return particles
+
+def create_fluid(capacity:int=20000,
+                 spacing:float=6.,
+                 density:float=1.,
+                 color:PyGameColor="dodgerblue",
+                 stiffness:float=0.5,
+                 viscosity:float=0.1,
+                 drag:float=0.2,
+                 iterations:int=1,
+                 substeps:int=2,
+                 gravity_scale:float=1.0,
+                 layer:Optional[str]=None,
+                 visible:bool=True) -> Fluid:
+    """
+    Create liquid made of particles that flows around objects and pushes them, so objects
+    lighter than the liquid density float and heavier ones sink. Use fill_rect() or emit()
+    on returned fluid to add liquid. Spacing is how far apart particles are at rest, smaller
+    spacing gives smoother liquid but needs more particles for the same amount of it.
+    About 10000 particles fit in a 60 fps frame with default iterations and substeps.
+    """
+    fluid = Fluid(space,
+                  capacity=capacity, spacing=spacing, density=density, color=color,
+                  stiffness=stiffness, viscosity=viscosity, drag=drag,
+                  iterations=iterations, substeps=substeps, gravity_scale=gravity_scale,
+                  layer=layer, dt=1./screen_fps(), visible=visible)
+    _drawables.append(fluid)
+    return fluid
+
+def create_level(color:PyGameColor="gray", border=0,
+                 elasticity:Optional[float]=None, friction:Optional[float]=None,
+                 colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                 layer:Optional[str]=None,
+                 visible:bool=True, z_order:int=0) -> Compound:
+    """
+    Create level geometry builder. Walls, platforms and slopes added with add_rect, add_line,
+    add_lines, add_polygon and add_circle are attached to the shared static body instead of
+    each getting its own body and actor, and are all drawn in one pass. Coordinates are world
+    coordinates.
+    """
+    level = Compound(space, space.static_body, color=color, border=border,
+                     elasticity=elasticity, friction=friction,
+                     colliision_group=colliision_group, collision_type=collision_type, layer=layer,
+                     visible=visible, z_order=z_order)
+    _drawables.append(level)
+    _body_to_compounds.setdefault(space.static_body, []).append(level)
+    return level
+
+def create_compound(center:Coordinates=(0, 0), angle=0.0,
+                    color:PyGameColor="red", border=0,
+                    density:Optional[float]=None, mass:Optional[float]=None,
+                    elasticity:Optional[float]=None, friction:Optional[float]=None,
+                    colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                    layer:Optional[str]=None,
+                    fixed_object=False,
+                    velocity:Vector2=Vec2d.zero(), angular_velocity:float=0.,
+                    visible:bool=True, z_order:int=0) -> Compound:
+    """
+    Create object made of several shapes on one body, add shapes with add_rect, add_circle,
+    add_line, add_lines or add_polygon using coordinates relative to center. Object is
+    dynamic if density or mass is given, mass is spread over the shapes by area.
+    compound[i] gives actor for shape i that can be used to move or push the whole object.
+    """
+    body_type = pymunk.Body.DYNAMIC if any(n is not None for n in (density, mass)) else pymunk.Body.KINEMATIC
+    if fixed_object:
+        body_type = pymunk.Body.STATIC
+
+    body = pymunk.Body(body_type=body_type)
+    body.position = Vec2d(*center)
+    body.angle = angle
+    if body_type != pymunk.Body.STATIC:
+        body.velocity = Vec2d(*velocity)
+        body.angular_velocity = math.radians(angular_velocity)
+
+    compound = Compound(space, body, color=color, border=border,
+                        density=density, mass=mass,
+                        elasticity=elasticity, friction=friction,
+                        colliision_group=colliision_group, collision_type=collision_type, layer=layer,
+                        visible=visible, z_order=z_order)
+    _drawables.append(compound)
+    _body_to_compounds[body] = [compound]
+    return compound
+
+def create_tilemap(layout:Union[str, np.ndarray, Sequence[Sequence[int]]],
+                   tiles:Optional[Dict[int, Union[str, PyGameColor]]]=None,
+                   tile_size:float=32,
+                   bottom_left:Coordinates=(0, 0),
+                   solid:Optional[Iterable[int]]=None,
+                   chunk_size:int=16,
+                   color:PyGameColor="gray",
+                   elasticity:Optional[float]=None, friction:Optional[float]=None,
+                   colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                   layer:Optional[str]=None,
+                   visible:bool=True, z_order:int=-1) -> Tilemap:
+    """
+    Create tile map from CSV or JSON file or grid of tile ids where first row is the top
+    of the map and 0 means no tile. tiles maps tile id to image path or color, tiles not
+    in it are drawn with color. solid is set of tile ids that collide, by default all tiles do.
+    Solid tiles are merged into few big boxes on the shared static body.
+    """
+    grid = load_tile_grid(layout) if isinstance(layout, str) else np.asarray(layout, dtype=np.int64)
+    tilemap = Tilemap(space, grid, tiles=tiles or {}, tile_size=tile_size,
+                      bottom_left=bottom_left, solid=solid, chunk_size=chunk_size, color=color,
+                      elasticity=elasticity, friction=friction,
+                      colliision_group=colliision_group, collision_type=collision_type, layer=layer,
+                      visible=visible, z_order=z_order)
+    _drawables.append(tilemap)
+    _body_to_compounds.setdefault(space.static_body, []).append(tilemap.colliders)
+    return tilemap
+
 def create_hud(width:Optional[float]=None, height:Optional[float]=None,
                 color:PyGameColor=(25, 25, 25, 50),
                 image_path:Union[str, Iterable[str]]=[],
@@ -760,6 +1499,7 @@ def create_hud(width:Optional[float]=None, height:Optional[float]=None,
                 paint_mode:ImagePaintMode=ImagePaintMode.CENTER,
                 draw_options:Optional[DrawOptions]=None,
                 visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                layer:Optional[str]=None,
                 density:Optional[float]=None, elasticity:Optional[float]=None, friction:Optional[float]=None,
                 mass:Optional[float]=None, moment:Optional[float]=None,
                 fixed_object=False, can_rotate=False, can_collide=False,
@@ -781,7 +1521,7 @@ def create_hud(width:Optional[float]=None, height:Optional[float]=None,
                 transparency_enabled=transparency_enabled,
                 paint_mode=paint_mode,
                 draw_options=draw_options,
-                visible=visible, colliision_group=colliision_group, collision_type=collision_type,
+                visible=visible, colliision_group=colliision_group, collision_type=collision_type, layer=layer,
                 density=density, elasticity=elasticity, friction=friction,
                 mass=mass, moment=moment,
                 fixed_object=fixed_object, can_rotate=can_rotate, can_collide=can_collide,
@@ -797,6 +1537,7 @@ def create_screen_walls(left:Optional[Union[float, bool]]=None,
                         extra_length:float=0.,
                         draw_options:Optional[DrawOptions]=None,
                         visible:bool=True, colliision_group:Optional[int]=None, collision_type:Optional[int]=None,
+                        layer:Optional[str]=None,
                         density:Optional[float]=None, elasticity:Optional[float]=None,
                         fixed_object=True, can_rotate=False, can_collide=True,
                         friction:Optional[float]=None) -> Tuple[Optional[Actor], Optional[Actor], Optional[Actor], Optional[Actor]]:
@@ -817,7 +1558,7 @@ def create_screen_walls(left:Optional[Union[float, bool]]=None,
                             transparency_enabled=transparency_enabled,
                             density=density, elasticity=elasticity, friction=friction,
                             draw_options=draw_options,
-                            visible=visible, colliision_group=colliision_group, collision_type=collision_type,
+                            visible=visible, colliision_group=colliision_group, collision_type=collision_type, layer=layer,
                             fixed_object=fixed_object, can_rotate=can_rotate, can_collide=can_collide,
                             velocity=velocity, angular_velocity=angular_velocity)
     if right is not None:
@@ -827,7 +1568,7 @@ def create_screen_walls(left:Optional[Union[float, bool]]=None,
                             transparency_enabled=transparency_enabled,
                             density=density, elasticity=elasticity, friction=friction,
                             draw_options=draw_options,
-                            visible=visible, colliision_group=colliision_group, collision_type=collision_type,
+                            visible=visible, colliision_group=colliision_group, collision_type=collision_type, layer=layer,
                             fixed_object=fixed_object, can_rotate=can_rotate, can_collide=can_collide,
                             velocity=velocity, angular_velocity=angular_velocity)
     if top is not None:
@@ -837,7 +1578,7 @@ def create_screen_walls(left:Optional[Union[float, bool]]=None,
                             transparency_enabled=transparency_enabled,
                             density=density, elasticity=elasticity, friction=friction,
                             draw_options=draw_options,
-                            visible=visible, colliision_group=colliision_group, collision_type=collision_type,
+                            visible=visible, colliision_group=colliision_group, collision_type=collision_type, layer=layer,
                             fixed_object=fixed_object, can_rotate=can_rotate, can_collide=can_collide,
                             velocity=velocity, angular_velocity=angular_velocity)
     if bottom is not None:
@@ -847,7 +1588,7 @@ def create_screen_walls(left:Optional[Union[float, bool]]=None,
                             transparency_enabled=transparency_enabled,
                             density=density, elasticity=elasticity, friction=friction,
                             draw_options=draw_options,
-                            visible=visible, colliision_group=colliision_group, collision_type=collision_type,
+                            visible=visible, colliision_group=colliision_group, collision_type=collision_type, layer=layer,
                             fixed_object=fixed_object, can_rotate=can_rotate, can_collide=can_collide,
                             velocity=velocity, angular_velocity=angular_velocity)
     return bottom_wall, right_wall, top_wall, left_wall
@@ -862,17 +1603,19 @@ def create_pin_joint(actor1:Union[Actor, pymunk.Body], actor2:Union[Actor, Coord
     else:
         body1 = actor1
 
+    anchor:Optional[pymunk.Body] = None
     if isinstance(actor2, Actor):
         body2 = actor2.shape.body
     elif isinstance(actor2, pymunk.Body):
         body2 = actor2
     else: # create kinematic body that doesn't participate in physics
-        body2 = pymunk.Body(body_type=pymunk.Body.KINEMATIC)
+        body2 = anchor = pymunk.Body(body_type=pymunk.Body.KINEMATIC)
         body2.position = Vec2d(*actor2)
         space.add(body2)
 
     joint = pymunk.constraints.PinJoint(body1, body2, anchor1, anchor2)
     space.add(joint)
+    _joints.add(joint, anchor=anchor)
     return joint
 
 def create_spring_joint(actor1:Union[Actor, pymunk.Body], actor2:Union[Actor, pymunk.Body],
@@ -905,6 +1648,7 @@ def create_spring_joint(actor1:Union[Actor, pymunk.Body], actor2:Union[Actor, py
                                             stiffness=stiffness,
                                             damping=damping)
     space.add(joint)
+    _joints.add(joint)
     return joint
 
 def create_rotary_spring_joint(actor1:Union[Actor, pymunk.Body], actor2:Union[Actor, pymunk.Body],
@@ -935,9 +1679,145 @@ def create_rotary_spring_joint(actor1:Union[Actor, pymunk.Body], actor2:Union[Ac
                                             stiffness=stiffness,
                                             damping=damping)
     space.add(joint)
+    _joints.add(joint)
     return joint
 
 
+def _create_linked(bodies:List[pymunk.Body], shapes:List[pymunk.Shape], joints:List[pymunk.Constraint],
+                   path_members:Sequence[int], path_points:Sequence[Coordinates],
+                   color:PyGameColor, width:int, closed:bool, filled:bool,
+                   elasticity:Optional[float], friction:Optional[float],
+                   collision_type:Optional[int], layer:Optional[str], visible:bool)->Rope:
+    """Add parts of rope, chain or soft body to space in one go, parts share filter group so they don't collide"""
+    global _next_shape_group
+    group_id = _next_shape_group
+    _next_shape_group += 1
+    for shape in shapes:
+        shape.filter = pymunk.ShapeFilter(group=group_id)
+        collision_layers.apply(shape, layer)
+        if elasticity is not None:
+            shape.elasticity = elasticity
+        if friction is not None:
+            shape.friction = friction
+        if collision_type is not None:
+            shape.collision_type = collision_type
+
+    common.add_shuffled(space, bodies, shapes, *joints)
+
+    rope = Rope(shapes, joints, path_members=path_members, path_points=path_points,
+                color=color, width=width, closed=closed, filled=filled, visible=visible)
+    _drawables.append(rope)
+    _body_to_group.update((body, (rope, i)) for i, body in enumerate(bodies))
+    _batched_constraints.update(joints)
+    _joints.add_all(joints)
+    return rope
+
+def _pin_to_world(body:pymunk.Body, anchor:Coordinates=(0, 0))->pymunk.constraints.PivotJoint:
+    """Pin local anchor of the body to where it is now in the world"""
+    return pymunk.constraints.PivotJoint(space.static_body, body, body.local_to_world(anchor), anchor)
+
+def create_rope(start:Coordinates, end:Coordinates, segments:int=20,
+                radius:float=2, color:PyGameColor="white", width:int=2,
+                mass:float=1.0, fixed_start:bool=True, fixed_end:bool=False,
+                elasticity:Optional[float]=None, friction:Optional[float]=None,
+                collision_type:Optional[int]=None, layer:Optional[str]=None,
+                visible:bool=True) -> Rope:
+    """
+    Create rope from start to end made of small balls kept at most segment length apart,
+    so rope can go slack but doesn't stretch. mass is mass of the whole rope.
+    Rope doesn't collide with itself and is drawn as one line, rope[i] gives actor for ball i.
+    """
+    points = np.linspace(np.asarray(start, dtype=float), np.asarray(end, dtype=float), segments + 1)
+    link_length = float(np.linalg.norm(points[1] - points[0]))
+    node_mass = mass / len(points)
+    moment = pymunk.moment_for_circle(node_mass, 0, radius)
+    bodies, shapes = [], [] # shapes only hold weak references to bodies
+    for xy in points.tolist():
+        body = pymunk.Body(node_mass, moment)
+        body.position = xy
+        bodies.append(body)
+        shapes.append(pymunk.Circle(body, radius))
+    joints:List[pymunk.Constraint] = [pymunk.constraints.SlideJoint(a, b, (0, 0), (0, 0), 0, link_length)
+                                      for a, b in zip(bodies[:-1], bodies[1:])]
+    if fixed_start:
+        joints.append(_pin_to_world(bodies[0]))
+    if fixed_end:
+        joints.append(_pin_to_world(bodies[-1]))
+    return _create_linked(bodies, shapes, joints, path_members=range(len(shapes)), path_points=[(0, 0)] * len(shapes),
+                          color=color, width=width, closed=False, filled=False,
+                          elasticity=elasticity, friction=friction,
+                          collision_type=collision_type, layer=layer, visible=visible)
+
+def create_chain(start:Coordinates, end:Coordinates, links:int=10,
+                 width:int=6, color:PyGameColor="gray",
+                 mass:float=1.0, fixed_start:bool=True, fixed_end:bool=False,
+                 elasticity:Optional[float]=None, friction:Optional[float]=None,
+                 collision_type:Optional[int]=None, layer:Optional[str]=None,
+                 visible:bool=True) -> Rope:
+    """
+    Create chain from start to end made of rigid links joined at their ends.
+    Unlike rope, chain links keep their length and push back when squeezed.
+    mass is mass of the whole chain, chain[i] gives actor for link i.
+    """
+    start, end = Vec2d(*start), Vec2d(*end)
+    step = (end - start) / links
+    half = step.length / 2.
+    link_mass = mass / links
+    moment = pymunk.moment_for_segment(link_mass, (-half, 0), (half, 0), width / 2.)
+    bodies, shapes = [], [] # shapes only hold weak references to bodies
+    for i in range(links):
+        body = pymunk.Body(link_mass, moment)
+        body.position = start + step * (i + 0.5)
+        body.angle = step.angle
+        bodies.append(body)
+        shapes.append(pymunk.Segment(body, (-half, 0), (half, 0), width / 2.))
+    joints:List[pymunk.Constraint] = [pymunk.constraints.PivotJoint(a, b, (half, 0), (-half, 0))
+                                      for a, b in zip(bodies[:-1], bodies[1:])]
+    if fixed_start:
+        joints.append(_pin_to_world(bodies[0], (-half, 0)))
+    if fixed_end:
+        joints.append(_pin_to_world(bodies[-1], (half, 0)))
+    return _create_linked(bodies, shapes, joints,
+                          path_members=[0] + list(range(links)),
+                          path_points=[(-half, 0)] + [(half, 0)] * links,
+                          color=color, width=width, closed=False, filled=False,
+                          elasticity=elasticity, friction=friction,
+                          collision_type=collision_type, layer=layer, visible=visible)
+
+def create_soft_body(polygon:Sequence[Coordinates], resolution:float=20,
+                     color:PyGameColor="green", mass:float=1.0,
+                     stiffness:float=0.8, damping:float=0.3,
+                     elasticity:Optional[float]=None, friction:Optional[float]=None,
+                     collision_type:Optional[int]=None, layer:Optional[str]=None,
+                     visible:bool=True) -> Rope:
+    """
+    Create soft body filling the polygon with balls about resolution apart held together
+    by springs. stiffness is ratio of the stiffest springs physics step handles and damping
+    is ratio of critical damping. Drawn as filled polygon through outline balls.
+    """
+    nodes, n_outline, springs = soft_body_mesh(polygon, resolution)
+    node_mass = mass / len(nodes)
+    radius = resolution / 2.
+    moment = pymunk.moment_for_circle(node_mass, 0, radius)
+    bodies, shapes = [], [] # shapes only hold weak references to bodies
+    for xy in nodes.tolist():
+        body = pymunk.Body(node_mass, moment)
+        body.position = xy
+        bodies.append(body)
+        shapes.append(pymunk.Circle(body, radius))
+
+    # stiffest spring physics step can handle is about node mass * fps^2, damping is ratio of critical
+    rest = np.linalg.norm(nodes[springs[:, 0]] - nodes[springs[:, 1]], axis=1)
+    k = np.full(len(rest), stiffness * node_mass * physics_fps()**2)
+    d = damping * 2 * np.sqrt(k * node_mass)
+    joints = [pymunk.constraints.DampedSpring(bodies[a], bodies[b], (0, 0), (0, 0), r, ki, di)
+              for (a, b), r, ki, di in zip(springs.tolist(), rest.tolist(), k.tolist(), d.tolist())]
+    return _create_linked(bodies, shapes, joints, path_members=range(n_outline), path_points=[(0, 0)] * n_outline,
+                          color=color, width=0, closed=True, filled=True,
+                          elasticity=elasticity, friction=friction,
+                          collision_type=collision_type, layer=layer, visible=visible)
+
+
 def start(screen_title:str=_screen_props.title,
           screen_width=_screen_props.width,
           screen_height=_screen_props.height,
@@ -945,10 +1825,17 @@ def start(screen_title:str=_screen_props.title,
           screen_image_path:Optional[str]=_screen_props.image_path,
           screen_fps=_screen_props.fps,
           physics_fps_multiplier:int=4,
-          gravity:Optional[Union[float, Vector2]]=None):
+          gravity:Optional[Union[float, Vector2]]=None,
+          headless:bool=False):
+    """
+    Start the game in current world. A headless game has no window and doesn't read
+    events or wait between frames, update() runs as fast as it can and draws nothing
+    unless render() is called, which is what batch simulation in many worlds needs.
+    """
 
     global  _running, screen, draw_options, noone, _physics_fps_multiplier
 
+    _screen_props.headless = headless
     set_screen_size(screen_width, screen_height)
     set_screen_color(screen_color)
     set_screen_image(screen_image_path)
@@ -973,16 +1860,327 @@ def start(screen_title:str=_screen_props.title,
                         color=(0, 0, 0, 0), bottom_left=(-1000,-1000),
                         visible=False, can_collide=False)
 
-def remove(actor:Actor):
+def remove(actor:Union[Actor, Drawable]):
     global _camera_follow
-    """Remove actor from game"""
+    """Remove actor, member of actor group or whole group from game"""
+    if isinstance(actor, Drawable):
+        _drawables.remove(actor)
+        _cancel_collisions(actor)
+        if isinstance(actor, Compound):
+            _body_to_compounds[actor.body].remove(actor)
+        elif isinstance(actor, Tilemap):
+            _body_to_compounds[space.static_body].remove(actor.colliders)
+        objs = actor.physics_objects()
+        for o in objs:
+            if isinstance(o, pymunk.Body):
+                _body_to_group.pop(o, None)
+            elif isinstance(o, pymunk.Shape):
+                _events.detach(o)
+                _scheduler.cancel_owned(o)
+                _timers.cancel_owned(o)
+                _cancel_collisions(o)
+        space.remove(*_with_joints(objs))
+        return
+
     if _camera_follow.actor == actor:
         camera_follow_actor(None)
+    _events.detach(actor.shape)
+    _scheduler.cancel_owned(actor.shape)
+    _timers.cancel_owned(actor.shape)
+    _cancel_collisions(actor.shape)
+    _stop_animations(actor)
+    for compound in _body_to_compounds.get(actor.shape.body, ()):
+        index = compound.index_of(actor.shape)
+        if index is not None:
+            compound.remove_piece(index)
+            return
+    member = _body_to_group.pop(actor.shape.body, None)
+    if member is not None:
+        space.remove(*_with_joints(member[0]._remove_member(member[1])))
+        return
+
+    pool = _actor_pools.get(actor, None)
+    if pool is not None:
+        space.remove(*_joints.detach(actor.shape.body))
+        pool.release(actor)
+        return
+
     _actors.remove(actor)
-    for event_code, actors in _actors_handlers.items():
-        actors.discard(actor)
+    if _shape_to_actor.pop(actor.shape, None) is not None:
+        space.remove(actor.shape)
+        return
     _body_to_actor.pop(actor.shape.body, None)
-    space.remove(actor.shape, actor.shape.body)
+    space.remove(actor.shape, actor.shape.body, *_joints.detach(actor.shape.body))
+
+def _stop_animations(actor:Actor)->None:
+    """Take animations of actor out of the animator, they are left started so pool can play them again"""
+    for costume in actor.costumes.values():
+        spec = costume.animation
+        if spec._animator is not None:
+            spec._animator.stop(spec)
+
+def _with_joints(objs:List[Any])->List[Any]:
+    """Add joints of bodies in objs and anchor bodies they leave behind, each object once"""
+    seen = set(objs)
+    for o in list(objs):
+        if isinstance(o, pymunk.Body):
+            for extra in _joints.detach(o):
+                if extra not in seen:
+                    seen.add(extra)
+                    objs.append(extra)
+    return objs
+
+def remove_joint(joint:pymunk.Constraint):
+    """Remove joint from game, kinematic body made for it by create_pin_joint goes with it"""
+    member = _body_to_group.get(joint.a, None) or _body_to_group.get(joint.b, None)
+    if member is not None and isinstance(member[0], Rope):
+        member[0]._live_joints.discard(joint)
+    space.remove(*_joints.remove(joint))
+
+def remove_all():
+    """
+    Remove all actors, groups, joints and everything else from the game in one go,
+    for example to build next level from scratch. The game keeps running.
+    """
+    camera_follow_actor(None)
+    space.remove(*[s for s in space.shapes if s is not noone.shape],
+                 *[b for b in space.bodies if b is not noone.shape.body],
+                 *space.constraints)
+    _actors.clear()
+    _actors.add(noone)
+    _events.clear(keep=noone.shape)
+    _scheduler.cancel_owners(keep=noone.shape)
+    _timers.cancel_owners(keep=noone.shape)
+    for owner in list(_collision_owners):
+        _cancel_collisions(owner)
+    animator.clear()
+    _body_to_actor.clear()
+    _body_to_actor[noone.shape.body] = noone
+    _shape_to_actor.clear()
+    _drawables.clear()
+    _body_to_group.clear()
+    _body_to_compounds.clear()
+    _actor_pools.clear()
+    _joints.clear()
+    if _world_bounds is not None:
+        _world_bounds.frozen.clear()
+    contacts.graph_of(space).invalidate()
+
+@dataclass
+class _PooledState:
+    """State of pooled actor when it was created so it can be reset on release"""
+    position:Vec2d
+    angle:float
+    visible:bool
+
+class ActorPool:
+    """
+    Actors created up front and recycled so that spawning during play doesn't allocate
+    new bodies and shapes. Released actors are taken out of the space, hidden and stop
+    receiving events until they are acquired again. Their scripts, timers and collision
+    handlers are cancelled, so set those up after acquire().
+    """
+    def __init__(self, factory:Callable[[], Actor], size:int, grow:bool=True):
+        self.factory = factory
+        self.grow = grow
+        self._free:List[Actor] = []
+        self._in_use:Set[Actor] = set()
+        self._states:Dict[Actor, _PooledState] = {}
+        for _ in range(size):
+            self._add()
+
+    def _add(self)->Actor:
+        actor = self.factory()
+        body = actor.shape.body
+        self._states[actor] = _PooledState(position=body.position, angle=body.angle,
+                                           visible=actor.visible)
+        _actor_pools[actor] = self
+        self._park(actor)
+        return actor
+
+    def _park(self, actor:Actor)->None:
+        state = self._states[actor]
+        _events.suspend(actor.shape)
+        _scheduler.cancel_owned(actor.shape)
+        _timers.cancel_owned(actor.shape)
+        _cancel_collisions(actor.shape)
+        _stop_animations(actor)
+        _actors.discard(actor)
+
+        if _camera_follow.actor == actor:
+            camera_follow_actor(None)
+
+        shape, body = actor.shape, actor.shape.body
+        if shape.space is not None:
+            space.remove(shape)
+        if body.space is not None and body is not space.static_body:
+            space.remove(body)
+
+        # reset state so next acquire starts fresh
+        if body.body_type != pymunk.Body.STATIC:
+            body.position = state.position
+            body.angle = state.angle
+            body.velocity = 0, 0
+            body.angular_velocity = 0
+            body.force = 0, 0
+            body.torque = 0
+        actor.visible = state.visible
+        self._free.append(actor)
+
+    def acquire(self, center:Optional[Coordinates]=None,
+                velocity:Optional[Vector2]=None,
+                angle:Optional[float]=None)->Optional[Actor]:
+        """
+        Get actor from the pool and put it in the game, optionally moving it to center
+        with given velocity and angle (degrees). Returns None if pool is empty and can't grow.
+        """
+        if not self._free:
+            if not self.grow:
+                return None
+            self._add()
+        actor = self._free.pop()
+
+        body = actor.shape.body
+        if center is not None:
+            body.position = center
+        if velocity is not None:
+            body.velocity = velocity
+        if angle is not None:
+            body.angle = math.radians(angle)
+        if body.space is None:
+            space.add(body)
+        space.add(actor.shape)
+
+        _actors.add(actor)
+        _events.resume(actor.shape)
+        for costume in actor.costumes.values():
+            spec = costume.animation
+            if spec.started and spec._animator is not None:
+                spec._animator.play(spec)
+
+        self._in_use.add(actor)
+        return actor
+
+    def release(self, actor:Actor)->None:
+        """Return actor to the pool, it is removed from the game until acquired again"""
+        if actor in self._in_use:
+            self._in_use.remove(actor)
+            self._park(actor)
+
+    def release_all(self)->None:
+        for actor in list(self._in_use):
+            self.release(actor)
+
+    def in_use(self)->Set[Actor]:
+        return self._in_use
+
+    def available(self)->int:
+        return len(self._free)
+
+    def __len__(self)->int:
+        return len(self._free) + len(self._in_use)
+
+def pool(factory:Callable[[], Actor], size:int, grow:bool=True)->ActorPool:
+    """
+    Create pool of actors for things that are spawned and removed often like bullets.
+    factory is called to create each actor, for example, lambda: game.create_circle(...).
+    Use acquire() to spawn an actor and release() or game.remove() to put it back.
+    If pool runs out and grow is True, new actors are created using factory.
+    """
+    return ActorPool(factory, size, grow=grow)
+
+@dataclass
+class _FrozenState:
+    body_type:int
+    mass:float
+    moment:float
+    visible:bool
+
+@dataclass
+class WorldBounds:
+    """Region outside which actors are despawned, put to sleep or frozen"""
+    bb:pymunk.BB
+    action:BoundsAction=BoundsAction.DESPAWN
+    on_exit:Optional[Callable[[Actor], Any]]=None
+    frozen:Dict[Actor, _FrozenState]=field(default_factory=dict)
+
+def set_world_bounds(bottom_left:Optional[Coordinates]=None,
+                     top_right:Optional[Coordinates]=None,
+                     action:BoundsAction=BoundsAction.DESPAWN,
+                     on_exit:Optional[Callable[[Actor], Any]]=None,
+                     enabled:bool=True)->None:
+    """
+    Automatically despawn, sleep or freeze actors once they are completely outside
+    of the region. Region defaults to the screen. on_exit(actor) is called before the
+    action is applied. Fixed objects are never affected. Actors frozen by earlier bounds
+    stay frozen until unfreeze() is called, disabling bounds brings them all back.
+    """
+    global _world_bounds
+    frozen = _world_bounds.frozen if _world_bounds is not None else {}
+    if not enabled:
+        for actor in list(frozen):
+            unfreeze(actor)
+        _world_bounds = None
+        return
+    left, bottom = bottom_left if bottom_left is not None else (screen_left(), screen_bottom())
+    right, top = top_right if top_right is not None else (screen_right(), screen_top())
+    _world_bounds = WorldBounds(bb=pymunk.BB(left, bottom, right, top),
+                                action=action, on_exit=on_exit, frozen=frozen)
+
+def unfreeze(actor:Actor)->None:
+    """Bring back actor that was frozen or put to sleep for leaving world bounds"""
+    body = actor.shape.body
+    state = _world_bounds.frozen.pop(actor, None) if _world_bounds is not None else None
+    if state is not None:
+        body.body_type = state.body_type
+        if state.body_type == pymunk.Body.DYNAMIC:
+            body.mass, body.moment = state.mass, state.moment
+        actor.visible = state.visible
+    elif body.body_type == pymunk.Body.DYNAMIC and body.is_sleeping:
+        body.activate()
+
+def _apply_world_bounds(bounds:WorldBounds)->None:
+    """Find actors outside of bounds by querying the region around bounds and apply the action"""
+    region = bounds.bb
+    far = 1.0E7
+    # region outside bounds as four strips
+    outside = (pymunk.BB(region.left - far, region.bottom - far, region.left, region.top + far),
+               pymunk.BB(region.right, region.bottom - far, region.right + far, region.top + far),
+               pymunk.BB(region.left, region.bottom - far, region.right, region.bottom),
+               pymunk.BB(region.left, region.top, region.right, region.top + far))
+
+    leaving:Dict[pymunk.Body, Actor] = {}
+    for bb in outside:
+        for shape in space.bb_query(bb, pymunk.ShapeFilter()):
+            body = shape.body
+            if body is None or body.body_type == pymunk.Body.STATIC or body in leaving \
+                    or shape.bb.intersects(region):
+                continue
+            actor = _actor_of(body)
+            if actor is None or actor is noone or actor in bounds.frozen:
+                continue
+            if bounds.action == BoundsAction.SLEEP and body.is_sleeping:
+                continue
+            leaving[body] = actor
+
+    for body, actor in leaving.items():
+        if bounds.on_exit is not None:
+            bounds.on_exit(actor)
+        if bounds.action == BoundsAction.DESPAWN:
+            if body.space is not None:
+                remove(actor)
+        elif bounds.action == BoundsAction.SLEEP:
+            if body.body_type == pymunk.Body.DYNAMIC:
+                body.sleep()
+            else:
+                body.velocity, body.angular_velocity = (0, 0), 0
+        elif bounds.action == BoundsAction.FREEZE:
+            bounds.frozen[actor] = _FrozenState(body_type=body.body_type,
+                                                mass=body.mass, moment=body.moment,
+                                                visible=actor.visible)
+            body.body_type = pymunk.Body.KINEMATIC
+            body.velocity, body.angular_velocity = (0, 0), 0
+            actor.hide()
 
 def screen_size()->Tuple[int, int]:
     return _screen_props.width, _screen_props.height
@@ -992,7 +2190,10 @@ def screen_height()->int:
     return _screen_props.height
 def set_screen_size(width:int, height:int):
     global screen
-    screen = pygame.display.set_mode((width, height))
+    if _screen_props.headless:
+        screen = pygame.Surface((width, height))
+    else:
+        screen = pygame.display.set_mode((width, height))
     _screen_props.width = width
     _screen_props.height = height
     _scale_screen_image()
@@ -1016,11 +2217,21 @@ def set_screen_image(image_path:Optional[str]):
     _scale_screen_image()
     _screen_props.image_path = image_path
 
+def set_frame_pacing(max_skipped_frames:int=2, busy_loop:bool=False)->None:
+    """
+    When frames take longer than 1/fps, skip drawing up to max_skipped_frames frames in a row
+    so game time keeps up with real time, 0 always draws and lets the game slow down instead.
+    busy_loop waits for next frame more exactly at the cost of keeping the CPU busy.
+    """
+    global _pacer
+    _pacer = FramePacer(max_skipped_frames=max_skipped_frames, busy_loop=busy_loop)
+
 def set_screen_fps(fps:int):
     _screen_props.fps = fps
 
 def set_screen_title(title:str):
-    pygame.display.set_caption(title)
+    if not _screen_props.headless:
+        pygame.display.set_caption(title)
     _screen_props.title = title
 
 def on_frame():
@@ -1039,132 +2250,182 @@ def mouse_button_name(button:int)->str:
 def key_pressed()->Set[str]:
     return down_keys
 
-def update():
-    global _running, screen
-    assert screen is not None, "screen is None"
+def start_script(script:Union[ScriptCoroutine, Callable[[], ScriptCoroutine]],
+                 actor:Optional[Actor]=None)->Script:
+    """
+    Run script, an async function or generator, a bit every frame from next frame on.
+    Scripts sleep with await game.wait(seconds) and move actors with await actor.glide(xy, seconds),
+    generators do the same with yield seconds and yield from actor.glide(xy, seconds).
+    Scripts of an actor stop when it is removed.
+    """
+    return _scheduler.start(script, owner=actor.shape if actor is not None else None)
 
-    if not _running:
-        return
+def game_time()->float:
+    """Seconds of game time since start, the clock scripts and timers run on"""
+    return _clock.time
 
-    # first call physics so manual overrides can happen later
-    # use fixed fps for dt instead of actual dt
-    physics_fps = _screen_props.fps * _physics_fps_multiplier
-    for _ in range(_physics_fps_multiplier):
-        space.step(1.0 / physics_fps)
+def after(seconds:float, callback:Callable[[], Any], actor:Optional[Actor]=None)->Timer:
+    """
+    Call callback once after seconds of game time. Returns timer, cancel() stops it.
+    Timers of an actor are cancelled when it is removed.
+    """
+    return _timers.after(seconds, callback, owner=actor.shape if actor is not None else None)
 
-    if _camera_follow.actor:
-        camera_view_bottomleft = camera.bottom_left
-        camera_view_topright = camera.bottom_left + Vec2d(screen_width(), screen_height())
+def every(seconds:float, callback:Callable[[], Any], actor:Optional[Actor]=None)->Timer:
+    """Call callback every seconds of game time until timer is cancelled"""
+    return _timers.every(seconds, callback, owner=actor.shape if actor is not None else None)
 
-        # create smaller view to accomodate full actor
-        actor_dim = Vec2d(_camera_follow.actor.width(), _camera_follow.actor.height())
-        camera_view_bottomleft += actor_dim
-        camera_view_topright -= actor_dim
+def pause()->None:
+    """Stop game time, physics, scripts, timers and particles, events and drawing go on"""
+    _clock.paused = True
 
-        if common.is_second_rect_outside(camera_view_bottomleft, camera_view_topright,
-                                         _camera_follow.actor.bottomleft(), _camera_follow.actor.topright()):
-            ds = ((_camera_follow.actor.bottomleft()-_camera_follow.offset)-camera.bottom_left)
-            if ds.length > _camera_follow.min_distance:
-                ds = ds.normalized() * _camera_follow.speed
-                camera.move_by(ds)
-        d_angle = _camera_follow.actor.angle - camera.angle
-        if abs(d_angle) > _camera_follow.min_angle:
-            camera.turn_to(d_angle * _camera_follow.angle_speed)
+def unpause()->None:
+    _clock.paused = False
 
-    # poll for events
-    # pygame.QUIT event means the user clicked X to close your window
-    # TODO: optimize this by registering actors for events instead of looping through all actors
-    # TODO: ability to remove handler
-    # TODO: ability to remove actor
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            quit = True
-            for actor in _actors_handlers.get(pygame.QUIT, []):
-                quit = quit or actor.on_quit()
-            if quit:
-                end()
-        if event.type == pygame.KEYDOWN:
-            key_name = pygame.key.name(event.key)
-            down_keys.add(key_name)
-            for actor in _actors_handlers.get(pygame.KEYDOWN, []):
-                actor.on_keydown(key_name, event.key,
-                                 event.mod, event.unicode,
-                                 event.scancode, event.window)
-        if event.type == pygame.KEYUP:
-            key_name = pygame.key.name(event.key)
-            for actor in _actors_handlers.get(pygame.KEYUP, []):
-                actor.on_keyup(key_name, event.key,
-                                 event.mod,
-                                 event.scancode, event.window)
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            button_name = mouse_button_name(event.button)
-            down_mousbuttons.add(button_name)
-            pos = pygame_util.from_pygame(Vec2d(*event.pos), screen)
-            for actor in _actors_handlers.get(pygame.MOUSEBUTTONDOWN, []):
-                actor.on_mousedown(pos, button_name, event.button,
-                                   event.touch, event.window)
-        if event.type == pygame.MOUSEBUTTONUP:
-            button_name = mouse_button_name(event.button)
-            pos = pygame_util.from_pygame(Vec2d(*event.pos), screen)
-            for actor in _actors_handlers.get(pygame.MOUSEBUTTONUP, []):
-                actor.on_mouseup(pos, button_name, event.button,
-                                 event.touch, event.window)
-        if event.type == pygame.MOUSEMOTION:
-            pos = pygame_util.from_pygame(Vec2d(*event.pos), screen)
-            for actor in _actors_handlers.get(pygame.MOUSEMOTION, []):
-                actor.on_mousemove(pos, event.rel, event.buttons,
-                                   event.touch, event.window)
-        if event.type == pygame.MOUSEWHEEL:
-            for actor in _actors_handlers.get(pygame.MOUSEWHEEL, []):
-                actor.on_mousewheel(event.x, event.y, event.flipped,
-                                    event.touch, event.window)
-
-        if down_keys:
-            _camera_controls_keydown(down_keys)
+def is_paused()->bool:
+    return _clock.paused
 
-        if event.type==pygame.KEYUP and down_keys:
-            for actor in _actors_handlers.get(pygame.KEYUP, []):
-                actor.on_keypress(down_keys)
-            down_keys.clear()
-        if event.type==pygame.MOUSEBUTTONUP and down_mousbuttons:
-            for actor in _actors_handlers.get(pygame.MOUSEBUTTONUP, []):
-                actor.on_mousebutton(down_mousbuttons)
-            down_mousbuttons.clear()
+def set_time_scale(scale:float)->None:
+    """Run game time faster (scale > 1, fast-forward) or slower (slow motion) than real time"""
+    assert scale >= 0, "time scale can't be negative"
+    _clock.scale = scale
 
-    # call on_frame() to update your game state
-    on_frame()
+def time_scale()->float:
+    return _clock.scale
+
+def frame_events()->List[pygame.event.Event]:
+    """
+    Raw pygame events of current frame before they were merged, for handlers that
+    need every mouse motion or key repeat
+    """
+    return _frame_events
+
+def _shapes_under(event_name:str, screen_pos:Tuple[int, int])->List[pymunk.Shape]:
+    """Shapes under mouse at pygame screen position, only looked up if somebody is listening"""
+    if not _events.wants_hits(event_name):
+        return []
+    assert screen is not None, "screen is None"
+    pos = pygame_util.from_pygame(Vec2d(*screen_pos), screen)
+    world = tuple(camera.unapply_array(np.array([tuple(pos)], dtype=float))[0])
+    # test only shapes of listeners, space queries skip shapes that can't collide like HUDs
+    return [shape for shape in _events.targets(event_name) if shape.point_query(world).distance <= 0]
+
+def _dispatch_quit(event:pygame.event.Event):
+    _events.publish("on_quit")
+    end()
+
+def _dispatch_keydown(event:pygame.event.Event):
+    key_name = pygame.key.name(event.key)
+    down_keys.add(key_name)
+    _events.publish("on_keydown", key_name, event.key, event.mod, event.unicode,
+                    event.scancode, event.window)
+
+def _dispatch_keyup(event:pygame.event.Event):
+    key_name = pygame.key.name(event.key)
+    _events.publish("on_keyup", key_name, event.key, event.mod,
+                    event.scancode, event.window)
+
+def _dispatch_mousedown(event:pygame.event.Event):
+    assert screen is not None, "screen is None"
+    button_name = mouse_button_name(event.button)
+    down_mousbuttons.add(button_name)
+    pos = pygame_util.from_pygame(Vec2d(*event.pos), screen)
+    _events.publish("on_mousedown", pos, button_name, event.button, event.touch, event.window,
+                    hits=_shapes_under("on_mousedown", event.pos))
 
+def _dispatch_mouseup(event:pygame.event.Event):
     assert screen is not None, "screen is None"
+    button_name = mouse_button_name(event.button)
+    pos = pygame_util.from_pygame(Vec2d(*event.pos), screen)
+    _events.publish("on_mouseup", pos, button_name, event.button, event.touch, event.window,
+                    hits=_shapes_under("on_mouseup", event.pos))
 
+def _dispatch_mousemove(event:pygame.event.Event):
+    assert screen is not None, "screen is None"
+    pos = pygame_util.from_pygame(Vec2d(*event.pos), screen)
+    _events.publish("on_mousemove", pos, event.rel, event.buttons, event.touch, event.window,
+                    hits=_shapes_under("on_mousemove", event.pos))
+
+def _dispatch_mousewheel(event:pygame.event.Event):
+    _events.publish("on_mousewheel", event.x, event.y, event.flipped, event.touch, event.window,
+                    hits=_shapes_under("on_mousewheel", pygame.mouse.get_pos()))
+
+# pygame event type to function that publishes it to handlers
+_event_dispatch:Dict[int, Callable[[pygame.event.Event], None]] = {
+    pygame.QUIT: _dispatch_quit,
+    pygame.KEYDOWN: _dispatch_keydown,
+    pygame.KEYUP: _dispatch_keyup,
+    pygame.MOUSEBUTTONDOWN: _dispatch_mousedown,
+    pygame.MOUSEBUTTONUP: _dispatch_mouseup,
+    pygame.MOUSEMOTION: _dispatch_mousemove,
+    pygame.MOUSEWHEEL: _dispatch_mousewheel,
+}
+
+def render()->pygame.Surface:
+    """Draw the frame now, for headless games which don't draw in update(), returns the screen"""
+    assert screen is not None, "screen is None"
+    _render()
+    return screen
+
+def create_observation(width:int, height:int, grayscale:bool=False,
+                       palette:Optional[Sequence[PyGameColor]]=None,
+                       out:Optional[Union[np.ndarray, shared_memory.SharedMemory]]=None,
+                       view:Optional[Tuple[Coordinates, Coordinates]]=None)->ObservationTarget:
+    """
+    Target for render_observation() of width x height pixels, drawn straight into out, a
+    uint8 array or shared memory block, or into a new array. See ObservationTarget.
+    """
+    return ObservationTarget(width, height, grayscale=grayscale, palette=palette, out=out, view=view)
+
+def render_observation(target:ObservationTarget)->np.ndarray:
+    """
+    Draw the world on target at its own resolution, without texts and overlays of the
+    screen, returns target.array which now holds the frame
+    """
+    target.fit_camera(camera, screen_size())
+    _draw_world(target.surface, target.camera)
+    _draw_joints(target.surface, target.camera)
+    return target.array
+
+def _draw_world(surface:pygame.Surface, view:Camera):
+    """Draw background, drawables and actors on surface as seen by view"""
     if _screen_props.color:
-        screen.fill(_screen_props.color)
+        surface.fill(_screen_props.color)
     if _screen_props.image_scaled:
         bg_image = _screen_props.image_scaled
-        # common.draw_tiled_background(screen, camera, bg_image)
-        if camera.scale != 1.:
+        # common.draw_tiled_background(surface, view, bg_image)
+        if view.scale != 1.:
             bg_image = pygame.transform.scale(bg_image,
-                (int(bg_image.get_width()*camera.scale),
-                    int(bg_image.get_height()*camera.scale)))
-        if camera.bottom_left != (0, 0):
-            start_x = camera.bottom_left[0] - (camera.bottom_left[0] // bg_image.get_width()) * bg_image.get_width()
-            start_y = camera.bottom_left[1] - (camera.bottom_left[1] // bg_image.get_height()) * bg_image.get_height()
+                (int(bg_image.get_width()*view.scale),
+                    int(bg_image.get_height()*view.scale)))
+        if view.bottom_left != (0, 0):
+            start_x = view.bottom_left[0] - (view.bottom_left[0] // bg_image.get_width()) * bg_image.get_width()
+            start_y = view.bottom_left[1] - (view.bottom_left[1] // bg_image.get_height()) * bg_image.get_height()
             bg_topleft = start_x, start_y # flipped y
         else:
             bg_topleft = Vec2d(0, 0)
-        common.tiled_blit(bg_image, bg_topleft, screen)
-        if camera.angle != 0.:
-            angled_screen = pygame.transform.rotate(screen, camera.angle)
-            top_left = ((screen_width()-angled_screen.get_width()) //2,
-                        (screen_height()-angled_screen.get_height()) //2)
-            screen.blit(angled_screen, top_left)
-
-    for actor in _actors:
-        actor.update()
+        common.tiled_blit(bg_image, bg_topleft, surface)
+        if view.angle != 0.:
+            angled_surface = pygame.transform.rotate(surface, view.angle)
+            top_left = ((surface.get_width()-angled_surface.get_width()) //2,
+                        (surface.get_height()-angled_surface.get_height()) //2)
+            surface.blit(angled_surface, top_left)
+
+    for drawable in _drawables:
+        if drawable.z_order < 0:
+            drawable.draw(surface, camera=view)
     for actor in _actors:
-        actor.draw(screen, camera=camera)
+        actor.draw(surface, camera=view)
+    for drawable in _drawables:
+        if drawable.z_order >= 0:
+            drawable.draw(surface, camera=view)
 
+def _draw_joints(surface:pygame.Surface, view:Camera):
+    """Draw pin and spring joints on surface as seen by view"""
     # draw pin joints
     for constraint in space.constraints:
+        if constraint in _batched_constraints:
+            continue
         if isinstance(constraint, pymunk.PinJoint):
             body_a, body_b = constraint.a, constraint.b
 
@@ -1173,30 +2434,155 @@ def update():
             anchor_a_world = body_a.position + body_a.rotation_vector.rotated(constraint.anchor_a.angle) * constraint.anchor_a.length
             anchor_b_world = body_b.position + body_b.rotation_vector.rotated(constraint.anchor_b.angle) * constraint.anchor_b.length
 
-            common.draw_vertices(screen=screen, is_local=False,
-                                 polygone_or_lines=False, border=1, camera=camera,
+            common.draw_vertices(screen=surface, is_local=False,
+                                 polygone_or_lines=False, border=1, camera=view,
                                  vertices=[anchor_a_world, anchor_b_world],
                                  color="black")
         # draw spring joints
         elif isinstance(constraint, pymunk.DampedSpring):
             vertices = common.spring_line_segments(constraint, 10)
-            common.draw_vertices(screen=screen, is_local=False,
-                                 polygone_or_lines=False, border=1, camera=camera,
+            common.draw_vertices(screen=surface, is_local=False,
+                                 polygone_or_lines=False, border=1, camera=view,
                                  vertices=vertices,
                                  color="black")
 
+def _render():
+    """Draw the frame and put it on screen"""
+    assert screen is not None, "screen is None"
+
+    _draw_world(screen, camera)
+    _profiler.mark("draw")
+    _draw_joints(screen, camera)
+    _profiler.mark("constraints")
+
     # draw texts from noone
     common.draw_texts(screen, noone.texts)
 
     if show_mouse_coordinates:
         common.print_to(screen, f'{mouse_xy()}')
 
+    if show_stats:
+        _stats_overlay.draw(screen, stats)
+    _profiler.mark("draw")
+
     # flip() the display to put your work on screen
-    pygame.display.flip()
+    if not _screen_props.headless:
+        pygame.display.flip()
+    _profiler.mark("flip")
+
+def update():
+    global _running, screen
+    assert screen is not None, "screen is None"
+
+    if not _running:
+        return
+    _profiler.begin()
+
+    # game time passed in this frame, none while paused
+    global _physics_steps_due
+    dt = _clock.tick(1.0 / _screen_props.fps)
+
+    # first call physics so manual overrides can happen later
+    # use fixed fps for dt instead of actual dt, time scale changes number of steps
+    physics_fps = _screen_props.fps * _physics_fps_multiplier
+    _physics_steps_due += dt * physics_fps
+    steps = int(_physics_steps_due + 1e-9)
+    _physics_steps_due -= steps
+    for _ in range(steps):
+        bullets.sweep(space, 1.0 / physics_fps)
+        space.step(1.0 / physics_fps)
+    if steps:
+        contacts.graph_of(space).invalidate()
+
+    if _world_bounds is not None:
+        _apply_world_bounds(_world_bounds)
+
+    if _camera_follow.actor:
+        camera_view_bottomleft = camera.bottom_left
+        camera_view_topright = camera.bottom_left + Vec2d(screen_width(), screen_height())
+
+        # create smaller view to accomodate full actor
+        actor_dim = Vec2d(_camera_follow.actor.width(), _camera_follow.actor.height())
+        camera_view_bottomleft += actor_dim
+        camera_view_topright -= actor_dim
+
+        if common.is_second_rect_outside(camera_view_bottomleft, camera_view_topright,
+                                         _camera_follow.actor.bottomleft(), _camera_follow.actor.topright()):
+            ds = ((_camera_follow.actor.bottomleft()-_camera_follow.offset)-camera.bottom_left)
+            if ds.length > _camera_follow.min_distance:
+                ds = ds.normalized() * _camera_follow.speed
+                camera.move_by(ds)
+        d_angle = _camera_follow.actor.angle - camera.angle
+        if abs(d_angle) > _camera_follow.min_angle:
+            camera.turn_to(d_angle * _camera_follow.angle_speed)
+    _profiler.mark("physics")
+
+    # poll for events, drained once per frame and merged so handlers run once per frame
+    # pygame.QUIT event means the user clicked X to close your window
+    global _frame_events
+    _frame_events = pygame.event.get() if not _screen_props.headless else []
+    for event in coalesce(_frame_events):
+        dispatch = _event_dispatch.get(event.type, None)
+        if dispatch is not None:
+            dispatch(event)
+
+        if event.type==pygame.KEYUP and down_keys:
+            _events.publish("on_keypress", down_keys)
+            down_keys.clear()
+        if event.type==pygame.MOUSEBUTTONUP and down_mousbuttons:
+            _events.publish("on_mousebutton", down_mousbuttons,
+                            hits=_shapes_under("on_mousebutton", event.pos))
+            down_mousbuttons.clear()
+
+    if down_keys:
+        _camera_controls_keydown(down_keys)
+    _profiler.mark("events")
+
+    # call on_frame() to update your game state
+    on_frame()
+    _profiler.mark("on_frame")
+
+    # resume scripts and call timers that are due
+    if not _clock.paused:
+        _scheduler.run(dt)
+        _timers.run(dt)
+    _profiler.mark("scripts")
+
+    animator.advance(_clock.time)
+    for actor in _actors:
+        actor.update()
+    if not _clock.paused:
+        for drawable in _drawables:
+            drawable.update(dt)
+    _profiler.mark("update")
+
+    if _screen_props.headless:
+        _profiler.mark("wait")
+        _profiler.end()
+        return
+
+    # drawing is skipped when frames fall behind, physics never is
+    if _pacer.should_render(_screen_props.fps):
+        _render()
 
     # This will pause the game loop until 1/60 seconds have passed
     # since the last tick. This limits the loop to _running at 60 FPS.
-    clock.tick(_screen_props.fps)
+    _pacer.wait(clock, _screen_props.fps)
+    _profiler.mark("wait")
+    _profiler.end()
+
+def stats()->FrameStats:
+    """
+    Milliseconds recent frames spent in each phase of update(), as moving averages and
+    percentiles, and number of actors, shapes, bodies and joints in the game now
+    """
+    frame_stats = _profiler.stats()
+    frame_stats.actors = len(_actors)
+    frame_stats.shapes = len(space.shapes)
+    frame_stats.bodies = len(space.bodies)
+    frame_stats.constraints = len(space.constraints)
+    frame_stats.pacing = _pacer.stats(_screen_props.fps)
+    return frame_stats
 
 def too_left(actor:Actor)->bool:
     return actor.left() < 0
@@ -1234,11 +2620,96 @@ def stop_sound(file_path:str)->None:
 def end():
     global _running
 
-    if _running:
+    if _running and _screen_props.headless:
+        _running = False
+    elif _running:
         pygame.quit()
         pygame.display.quit()
         pygame.mixer.quit()
         _running = False
         exit(0)
 
-# TODO: make radians and degrees consistent in APIs
\ No newline at end of file
+# TODO: make radians and degrees consistent in APIs
+def _new_world_state()->Dict[str, Any]:
+    """Module globals that make up one world, as they are before start()"""
+    return dict(
+        show_mouse_coordinates=False, show_stats=False,
+        clock=pygame.time.Clock(), screen=None, draw_options=None,
+        space=pymunk.Space(), camera=Camera(), camera_controls=None,
+        down_keys=set(), down_mousbuttons=set(), noone=None, on_frame=lambda: None,
+        _actors=set(), _body_to_actor={}, _drawables=[], _body_to_group={}, _actor_pools={},
+        _world_bounds=None, _shape_to_actor={}, _body_to_compounds={}, _collision_handlers={},
+        _collision_owners={},
+        _next_collision_type=1 << 16, _next_shape_group=1 << 16,
+        _batched_constraints=weakref.WeakSet(), _joints=JointRegistry(),
+        _camera_follow=CameraFollow(), _events=EventBus(), _frame_events=[],
+        _profiler=FrameProfiler(), _stats_overlay=StatsOverlay(), _pacer=FramePacer(),
+        _clock=GameClock(), _physics_steps_due=0., _scheduler=Scheduler(), _timers=Timers(),
+        animator=Animator(), collision_layers=CollisionLayers(), _running=False, _physics_fps_multiplier=4, _screen_props=ScreenProps())
+
+class World:
+    """
+    Everything one game has: physics space, actors, camera, events, scripts, timers, clocks
+    and the surface it draws on. game.* functions work on the current world, which is
+    default_world unless another world is made current with `with world:`. Any game function
+    can also be called on the world, world.create_circle(...) is game.create_circle(...)
+    with world current, and world.space, world.camera, ... are its state.
+
+    Only one world can have a window, others are started with headless=True. They don't
+    share anything but sounds, so many of them can be stepped
+    in one process, or built and stepped in worker processes of a pool for batch runs.
+    Objects of a world, like pools, should be used while the world is current.
+    """
+    def __init__(self, state:Optional[Dict[str, Any]]=None):
+        # state of the current world lives in module globals, _state is only up to date
+        # while the world is not current
+        self._state = state if state is not None else _new_world_state()
+
+    def __enter__(self)->'World':
+        _world_stack.append(_current_world)
+        _switch_to(self)
+        return self
+
+    def __exit__(self, *exc_info)->None:
+        _switch_to(_world_stack.pop())
+
+    def __getattr__(self, name:str)->Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._state:
+            return globals()[name] if self is _current_world else self._state[name]
+        attr = globals().get(name, None)
+        if callable(attr) and not isinstance(attr, type):
+            def call(*args, **kwargs):
+                with self:
+                    return attr(*args, **kwargs)
+            call.__name__, call.__doc__ = name, attr.__doc__
+            return call
+        raise AttributeError(f"game has no function or state {name}")
+
+    def step(self, frames:int=1)->None:
+        """Run update() for frames with this world current"""
+        with self:
+            for _ in range(frames):
+                update()
+
+def _switch_to(world:World)->None:
+    global _current_world
+    if world is _current_world:
+        return
+    g = globals()
+    old = _current_world._state
+    for name in old:
+        old[name] = g[name]
+    g.update(world._state)
+    animation.animator = world._state["animator"]
+    layers.collision_layers = world._state["collision_layers"]
+    _current_world = world
+
+# state as it is now becomes the default world, the one game.* functions use unless told otherwise
+default_world = World({name: globals()[name] for name in _new_world_state()})
+_current_world = default_world
+_world_stack:List[World] = []
+
+def current_world()->World:
+    return _current_world
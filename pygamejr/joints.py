@@ -0,0 +1,62 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import pymunk
+
+
+class JointRegistry:
+    """
+    Joints added to the game indexed by the bodies they connect, so joints of a body are
+    found without scanning space.constraints. A joint can own a hidden anchor body, like
+    the kinematic body create_pin_joint() makes for a point in the world. The anchor
+    belongs to the joint alone and goes away with it.
+    """
+    def __init__(self):
+        self._by_body:Dict[pymunk.Body, Set[pymunk.Constraint]] = {}
+        self._anchors:Dict[pymunk.Constraint, pymunk.Body] = {}
+
+    def __len__(self)->int:
+        return len({joint for joints in self._by_body.values() for joint in joints})
+
+    def add(self, joint:pymunk.Constraint, anchor:Optional[pymunk.Body]=None)->None:
+        for body in (joint.a, joint.b):
+            self._by_body.setdefault(body, set()).add(joint)
+        if anchor is not None:
+            self._anchors[joint] = anchor
+
+    def add_all(self, joints:Iterable[pymunk.Constraint])->None:
+        for joint in joints:
+            self.add(joint)
+
+    def joints_of(self, body:pymunk.Body)->Set[pymunk.Constraint]:
+        return set(self._by_body.get(body, ()))
+
+    def anchor_of(self, joint:pymunk.Constraint)->Optional[pymunk.Body]:
+        return self._anchors.get(joint, None)
+
+    def remove(self, joint:pymunk.Constraint)->List[Any]:
+        """Forget the joint, returns the joint and its anchor body to take out of the space"""
+        for body in (joint.a, joint.b):
+            joints = self._by_body.get(body, None)
+            if joints is not None:
+                joints.discard(joint)
+                if not joints:
+                    del self._by_body[body]
+        anchor = self._anchors.pop(joint, None)
+        if anchor is not None:
+            self._by_body.pop(anchor, None)
+            return [joint, anchor]
+        return [joint]
+
+    def detach(self, body:pymunk.Body)->List[Any]:
+        """
+        Forget all joints of the body, in time proportional to their number.
+        Returns the joints and anchor bodies they leave behind to take out of the space.
+        """
+        objs:List[Any] = []
+        for joint in self._by_body.pop(body, ()):
+            objs.extend(self.remove(joint))
+        return objs
+
+    def clear(self)->None:
+        self._by_body.clear()
+        self._anchors.clear()
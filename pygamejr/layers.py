@@ -0,0 +1,137 @@
+from typing import Dict, Iterable, Optional, Tuple
+from dataclasses import dataclass
+import weakref
+
+import numpy as np
+import pymunk
+
+from pygamejr import contacts
+
+DEFAULT_LAYER = "default"
+_ALL = pymunk.ShapeFilter.ALL_MASKS()
+_MAX_LAYERS = 32 # pymunk categories are 32 bit
+
+class CollisionLayers:
+    """
+    Named collision layers and which layers collide with which, compiled to pymunk
+    ShapeFilter categories and masks. Each layer is one category bit, mask of a layer
+    has bits of all layers it collides with. Pairs rejected by masks are dropped right
+    after the broad phase so they never reach the narrow phase.
+
+    Layers are created on first use and collide with everything until told otherwise.
+    Shapes given a filter through apply() are remembered so changing the matrix
+    updates shapes that already exist.
+    """
+    def __init__(self):
+        self._bits:Dict[str, int] = {DEFAULT_LAYER: 1} # shapes that can't collide use category 0x1 too
+        self._masks:Dict[str, int] = {DEFAULT_LAYER: _ALL}
+        self._shapes:'weakref.WeakKeyDictionary[pymunk.Shape, Tuple[str, bool]]' = weakref.WeakKeyDictionary()
+
+    def names(self)->Tuple[str, ...]:
+        return tuple(self._bits)
+
+    def category(self, layer:str)->int:
+        bit = self._bits.get(layer, None)
+        if bit is None:
+            assert len(self._bits) < _MAX_LAYERS, f"At most {_MAX_LAYERS} collision layers are supported"
+            bit = self._bits[layer] = 1 << len(self._bits)
+            self._masks[layer] = _ALL
+        return bit
+
+    def mask(self, layer:str)->int:
+        self.category(layer)
+        return self._masks[layer]
+
+    def collides(self, a:str, b:str)->bool:
+        return bool(self.mask(a) & self.category(b))
+
+    def set_collides(self, a:str, b:str, collides:bool=True)->None:
+        """Make two layers collide or not, both ways"""
+        self._set(a, b, collides)
+        self._reapply({a, b})
+
+    def set_matrix(self, matrix:Dict[str, Iterable[str]])->None:
+        """
+        Set layers that each listed layer collides with, for example
+        {"bullet": ["enemy", "terrain"], "particle": ["terrain"]}.
+        Two layers collide if either lists the other, layers not listed keep their settings.
+        """
+        matrix = {a: set(others) for a, others in matrix.items()}
+        for a, others in matrix.items():
+            for b in set(self.names()) | others:
+                self._set(a, b, b in others or a in matrix.get(b, ()))
+        self._reapply(set(matrix) | {b for others in matrix.values() for b in others})
+
+    def _set(self, a:str, b:str, collides:bool)->None:
+        bit_a, bit_b = self.category(a), self.category(b)
+        if collides:
+            self._masks[a] |= bit_b
+            self._masks[b] |= bit_a
+        else:
+            self._masks[a] &= ~bit_b
+            self._masks[b] &= ~bit_a
+
+    def filter_for(self, layer:Optional[str]=None, can_collide:bool=True, group:int=0)->pymunk.ShapeFilter:
+        layer = layer if layer is not None else DEFAULT_LAYER
+        return pymunk.ShapeFilter(group=group, categories=self.category(layer),
+                                  mask=self.mask(layer) if can_collide else 0)
+
+    def apply(self, shape:pymunk.Shape, layer:Optional[str]=None, can_collide:bool=True)->None:
+        """Put shape on the layer, group of its filter is kept"""
+        layer = layer if layer is not None else DEFAULT_LAYER
+        shape.filter = self.filter_for(layer, can_collide=can_collide, group=shape.filter.group)
+        self._shapes[shape] = (layer, can_collide)
+
+    def layer_of(self, shape:pymunk.Shape)->str:
+        return self._shapes.get(shape, (DEFAULT_LAYER, True))[0]
+
+    def can_collide(self, shape:pymunk.Shape)->bool:
+        return self._shapes.get(shape, (DEFAULT_LAYER, True))[1]
+
+    def _reapply(self, layers:set)->None:
+        for shape, (layer, can_collide) in list(self._shapes.items()):
+            if layer in layers and can_collide:
+                shape.filter = self.filter_for(layer, group=shape.filter.group)
+
+collision_layers = CollisionLayers() # of the current world, game swaps it with the world
+
+@dataclass
+class PairCounts:
+    """How many shape pairs got how far through collision detection"""
+    broad_phase:int = 0 # pairs with overlapping bounding boxes that can collide at all
+    narrow_phase:int = 0 # of those, pairs that pass groups and masks and are tested exactly
+    contacts:int = 0 # pairs that touch
+
+def count_pairs(space:pymunk.Space)->PairCounts:
+    """
+    Count pairs for the current state of the space, meant for debugging as it looks at every shape.
+    Pairs of shapes on the same body and pairs of two static bodies are never
+    collided by pymunk so they are not counted.
+    """
+    shapes = [s for s in space.shapes if s.body is not None]
+    counts = PairCounts(contacts=contacts.graph_of(space).pair_count())
+    if len(shapes) < 2:
+        return counts
+    bbs = np.array([(s.bb.left, s.bb.bottom, s.bb.right, s.bb.top) for s in shapes], dtype=float)
+    filters = np.array([tuple(s.filter) for s in shapes], dtype=np.int64).reshape(-1, 3)
+    body_ids = np.array([s.body.id for s in shapes], dtype=np.uint64)
+    moving = np.array([s.body.body_type != pymunk.Body.STATIC for s in shapes], dtype=bool)
+
+    # sweep along x, pairs of each shape with shapes starting before its right edge
+    order = np.argsort(bbs[:, 0], kind='stable')
+    bbs, filters, body_ids, moving = bbs[order], filters[order], body_ids[order], moving[order]
+    ends = np.searchsorted(bbs[:, 0], bbs[:, 2], side='right')
+    n_candidates = np.maximum(ends - np.arange(len(bbs)) - 1, 0)
+    first = np.repeat(np.arange(len(bbs)), n_candidates)
+    second = first + 1 + (np.arange(n_candidates.sum()) - np.repeat(np.cumsum(n_candidates) - n_candidates, n_candidates))
+
+    broad = (bbs[first, 1] <= bbs[second, 3]) & (bbs[second, 1] <= bbs[first, 3]) & \
+            (body_ids[first] != body_ids[second]) & (moving[first] | moving[second])
+    first, second = first[broad], second[broad]
+    group_a, group_b = filters[first, 0], filters[second, 0]
+    passes = ((group_a == 0) | (group_a != group_b)) & \
+             ((filters[first, 1] & filters[second, 2]) != 0) & \
+             ((filters[second, 1] & filters[first, 2]) != 0)
+    counts.broad_phase = int(broad.sum())
+    counts.narrow_phase = int(passes.sum())
+    return counts
@@ -0,0 +1,76 @@
+from typing import Optional, Sequence, Tuple, Union
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+from pymunk import Vec2d
+
+from pygamejr.common import Camera, Coordinates, PyGameColor
+
+GRAYSCALE = [(i, i, i) for i in range(256)] # palette whose index is the gray level
+
+class ObservationTarget:
+    """
+    Small surface the scene is drawn on for agents instead of the screen. The surface is
+    made over the pixels of array, which is the caller's own (height, width) or
+    (height, width, 3) uint8 array or one made in a shared memory block, so drawing a frame
+    writes the observation in place and nothing is copied. RGB targets hold colors, palette
+    and grayscale targets hold for each pixel the index of the nearest palette color, which
+    for grayscale is the gray level, the mean of the color's channels.
+
+    The target has its own camera. With view=None it sees what the game camera sees on
+    screen, scaled down to fit, otherwise it sees the fixed world rect view given as
+    (bottom_left, top_right). The view is centered when its aspect ratio differs.
+    """
+    def __init__(self, width:int, height:int, grayscale:bool=False,
+                 palette:Optional[Sequence[PyGameColor]]=None,
+                 out:Optional[Union[np.ndarray, shared_memory.SharedMemory]]=None,
+                 view:Optional[Tuple[Coordinates, Coordinates]]=None):
+        assert width > 0 and height > 0, "observation size must be positive"
+        assert not (grayscale and palette is not None), "grayscale already sets palette"
+        if grayscale:
+            palette = GRAYSCALE
+        self.palette = [pygame.Color(color) for color in palette] if palette is not None else None
+        assert self.palette is None or 0 < len(self.palette) <= 256, "palette must have 1 to 256 colors"
+
+        shape = (height, width) if self.palette is not None else (height, width, 3)
+        if out is None:
+            out = np.zeros(shape, dtype=np.uint8)
+        elif isinstance(out, shared_memory.SharedMemory):
+            out = np.ndarray(shape, dtype=np.uint8, buffer=out.buf)
+        assert out.shape == shape and out.dtype == np.uint8, f"out must be {shape} uint8 array"
+        assert out.flags.c_contiguous, "out must be C contiguous to draw into it"
+        self.array:np.ndarray = out # observation, rows top to bottom
+
+        if self.palette is not None:
+            self.surface = pygame.image.frombuffer(out, (width, height), "P")
+            self.surface.set_palette(self.palette)
+        else:
+            self.surface = pygame.image.frombuffer(out, (width, height), "RGB")
+        self.view = view
+        self.camera = Camera()
+
+    @property
+    def size(self)->Tuple[int, int]:
+        return self.surface.get_size()
+
+    def fit_camera(self, camera:Camera, screen_size:Tuple[int, int])->Camera:
+        """Set target camera from game camera and screen size, or from view if set"""
+        width, height = self.size
+        if self.view is None:
+            view_size = Vec2d(*screen_size)
+            scale = min(width / view_size.x, height / view_size.y)
+            self.camera.scale, self.camera.angle = camera.scale * scale, camera.angle
+            bottom_left = camera.bottom_left * scale
+        else:
+            view_bottom_left, view_top_right = Vec2d(*self.view[0]), Vec2d(*self.view[1])
+            view_size = view_top_right - view_bottom_left
+            assert view_size.x > 0 and view_size.y > 0, "view must have bottom_left below and left of top_right"
+            scale = min(width / view_size.x, height / view_size.y)
+            self.camera.scale, self.camera.angle = scale, 0.
+            bottom_left = view_bottom_left * scale
+        # center the view in the target
+        margin = (Vec2d(width, height) - view_size * scale) / 2
+        self.camera.bottom_left = bottom_left - margin
+        self.camera._update_transform()
+        return self.camera
@@ -0,0 +1,81 @@
+from typing import Optional
+from dataclasses import dataclass
+import time
+
+import numpy as np
+import pygame
+
+from pygamejr.utils import ExponentialMovingAverage
+
+@dataclass
+class PacingStats:
+    """How well frames keep up with target fps"""
+    budget:float=0. # ms each frame has at target fps
+    budget_used:float=0. # moving average of work per frame over budget, above 1 means behind
+    jitter:float=0. # ms, standard deviation of time between frames
+    lag:float=0. # ms real time is ahead of game time
+    missed:int=0 # frames whose work took longer than budget
+    skipped:int=0 # frames not drawn to catch up
+
+class FramePacer:
+    """
+    Decides whether a frame is drawn and how long to wait after it. Lag is how far real time
+    got ahead of frames. When more than a frame behind, drawing is skipped, never physics, for
+    at most max_skipped_frames frames in a row, and there is no waiting until lag is worked off.
+    With max_skipped_frames=0 frames are always drawn and paced like plain clock.tick().
+    busy_loop waits with clock.tick_busy_loop(), which spins the CPU for more exact frame times.
+    """
+    def __init__(self, max_skipped_frames:int=2, busy_loop:bool=False,
+                 max_lag_frames:int=15, window:int=120):
+        self.max_skipped_frames = max_skipped_frames
+        self.busy_loop = busy_loop
+        self.max_lag_frames = max_lag_frames # lag beyond this many frames is forgiven, not caught up
+        self.missed = 0
+        self.skipped = 0
+        self._lag = 0. # seconds
+        self._skipped_in_row = 0
+        self._intervals = np.zeros(window) # seconds between ends of recent frames
+        self._frames = 0
+        self._used:Optional[ExponentialMovingAverage] = None
+        self._frame_start:Optional[float] = None
+
+    def should_render(self, fps:int)->bool:
+        if self._lag > 1. / fps and self._skipped_in_row < self.max_skipped_frames:
+            self._skipped_in_row += 1
+            self.skipped += 1
+            return False
+        self._skipped_in_row = 0
+        return True
+
+    def wait(self, clock:pygame.time.Clock, fps:int)->None:
+        """Wait for next frame, call once at end of each frame"""
+        budget = 1. / fps
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            busy = now - self._frame_start
+            self.missed += busy > budget
+            if self._used is None:
+                self._used = ExponentialMovingAverage(0.05, initial_value=busy / budget)
+            else:
+                self._used.add(busy / budget)
+
+        if self.max_skipped_frames > 0 and self._lag > budget / 2:
+            clock.tick() # behind, catch up without waiting
+        elif self.busy_loop:
+            clock.tick_busy_loop(fps)
+        else:
+            clock.tick(fps)
+
+        end = time.perf_counter()
+        if self._frame_start is not None:
+            interval = end - self._frame_start
+            self._intervals[self._frames % len(self._intervals)] = interval
+            self._frames += 1
+            self._lag = min(max(self._lag + interval - budget, 0.), budget * self.max_lag_frames)
+        self._frame_start = end
+
+    def stats(self, fps:int)->PacingStats:
+        intervals = self._intervals[:min(self._frames, len(self._intervals))]
+        return PacingStats(budget=1000. / fps, budget_used=self._used.value if self._used is not None else 0.,
+                           jitter=float(intervals.std() * 1000.) if len(intervals) else 0.,
+                           lag=self._lag * 1000., missed=self.missed, skipped=self.skipped)
@@ -0,0 +1,413 @@
+from typing import Dict, List, Optional, Tuple, Union
+import math
+
+import numpy as np
+
+import pygame
+import pymunk
+from pymunk import Vec2d
+
+from pygamejr.common import PyGameColor, Coordinates, Vector2, Camera
+from pygamejr.actor import Drawable
+from pygamejr import layers
+
+_GRID_CELLS = 256 # cells along longer side of grid that drops particles far from shapes
+
+class ParticleSystem(Drawable):
+    """
+    Cosmetic particles such as sparks, smoke or rain kept in NumPy arrays.
+
+    Particles are not pymunk bodies, they are moved in one vectorized pass
+    with space gravity and can optionally bounce off (or die at) static shapes
+    of the space. Particles never push bodies or each other. With a layer they
+    only hit shapes on layers the particle layer collides with. 50000 particles
+    bouncing among a few dozen static shapes take about 10 ms to update and 8 ms
+    to draw at size 2.
+    """
+    def __init__(self, space:pymunk.Space,
+                 capacity:int=10000,
+                 size:int=2,
+                 color:PyGameColor="white",
+                 lifetime:float=2.0,
+                 gravity_scale:float=1.0,
+                 damping:float=0.0,
+                 fade:bool=True,
+                 collide:bool=False,
+                 elasticity:float=0.3,
+                 friction:float=0.1,
+                 kill_on_collision:bool=False,
+                 layer:Optional[str]=None,
+                 rate:float=0.,
+                 position:Coordinates=(0, 0),
+                 velocity:Vector2=(0, 0),
+                 velocity_spread:float=0.,
+                 dt:float=1./60,
+                 visible:bool=True,
+                 z_order:int=0):
+        super().__init__(visible=visible, z_order=z_order)
+        self.space = space
+        self.capacity = capacity
+        self.size = size
+        self.color = color
+        self.lifetime = lifetime
+        self.gravity_scale = gravity_scale
+        self.damping = damping
+        self.fade = fade
+        self.collide = collide
+        self.elasticity = elasticity
+        self.friction = friction
+        self.kill_on_collision = kill_on_collision
+        self.layer = layer
+        self.dt = dt
+
+        # continuous emitter, rate is particles per second
+        self.rate = rate
+        self.position = Vec2d(*position)
+        self.velocity = Vec2d(*velocity)
+        self.velocity_spread = velocity_spread
+        self._emit_carry = 0.
+
+        # particles [0, count) are alive
+        self.count = 0
+        self.positions = np.zeros((capacity, 2), dtype=float)
+        self.velocities = np.zeros((capacity, 2), dtype=float)
+        self.life = np.zeros(capacity, dtype=float)
+        self.max_life = np.ones(capacity, dtype=float)
+        self.colors = np.zeros((capacity, 4), dtype=np.uint8)
+
+        self._rng = np.random.default_rng()
+        self._dots:Dict[int, pygame.Surface] = {} # cache of particle surfaces by packed RGBA
+
+    def __len__(self)->int:
+        return self.count
+
+    def emit(self, count:int,
+             position:Optional[Union[Coordinates, np.ndarray]]=None,
+             velocity:Optional[Union[Vector2, np.ndarray]]=None,
+             velocity_spread:Optional[float]=None,
+             lifetime:Optional[Union[float, np.ndarray]]=None,
+             color:Optional[Union[PyGameColor, np.ndarray]]=None)->int:
+        """
+        Add particles. position and velocity can be one value for all particles or (count, 2) arrays.
+        velocity_spread is std dev of random velocity added to each particle.
+        Particles that don't fit in capacity are dropped, returns number of particles added.
+        """
+        count = min(int(count), self.capacity - self.count)
+        if count <= 0:
+            return 0
+        s = slice(self.count, self.count + count)
+
+        position = self.position if position is None else position
+        velocity = self.velocity if velocity is None else velocity
+        velocity_spread = self.velocity_spread if velocity_spread is None else velocity_spread
+        lifetime = self.lifetime if lifetime is None else lifetime
+        color = self.color if color is None else color
+
+        self.positions[s] = np.asarray(position, dtype=float).reshape(-1, 2)
+        self.velocities[s] = np.asarray(velocity, dtype=float).reshape(-1, 2)
+        if velocity_spread:
+            self.velocities[s] += self._rng.normal(0., velocity_spread, (count, 2))
+        self.life[s] = lifetime
+        self.max_life[s] = lifetime
+        if isinstance(color, np.ndarray):
+            self.colors[s] = color.reshape(-1, 4)
+        else:
+            self.colors[s] = tuple(pygame.Color(color))
+
+        self.count += count
+        return count
+
+    def clear(self)->None:
+        self.count = 0
+
+    def update(self, dt:Optional[float]=None)->None:
+        """Move particles by dt seconds of game time, self.dt if not given"""
+        dt = self.dt if dt is None else dt
+
+        if self.rate > 0:
+            self._emit_carry += self.rate * dt
+            n = int(self._emit_carry)
+            if n:
+                self._emit_carry -= n
+                self.emit(n)
+
+        n = self.count
+        if n == 0:
+            return
+
+        pos, vel, life = self.positions[:n], self.velocities[:n], self.life[:n]
+        life -= dt
+
+        g = self.space.gravity
+        if self.gravity_scale and (g.x or g.y):
+            vel += np.array((g.x, g.y)) * (self.gravity_scale * dt)
+        if self.damping:
+            vel *= max(0., 1. - self.damping * dt)
+
+        new_pos = pos + vel * dt
+        alive = life > 0
+        if self.collide:
+            hit = self._collide(pos, new_pos, vel)
+            if self.kill_on_collision:
+                alive &= ~hit
+        pos[:] = new_pos
+
+        # compact alive particles to front of arrays
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            k = len(keep)
+            for a in (self.positions, self.velocities, self.life, self.max_life, self.colors):
+                a[:k] = a[keep]
+            self.count = k
+
+    def _static_shapes(self, low:np.ndarray, high:np.ndarray)->List[pymunk.Shape]:
+        """Static shapes overlapping bounding box of particle paths, given by their low and high corners"""
+        bb = pymunk.BB(low[:, 0].min(), low[:, 1].min(), high[:, 0].max(), high[:, 1].max())
+        return [q for q in self.space.bb_query(bb, layers.collision_layers.filter_for(self.layer))
+                if q.body is not None and q.body.body_type == pymunk.Body.STATIC and not q.sensor]
+
+    def _collide(self, start:np.ndarray, end:np.ndarray, vel:np.ndarray)->np.ndarray:
+        """Bounce particles off static shapes, changes end and vel in place, returns mask of hits"""
+        hit = np.zeros(len(start), dtype=bool)
+        low, high = np.minimum(start, end), np.maximum(start, end)
+        shapes = self._static_shapes(low, high)
+        if not shapes:
+            return hit
+        # most particles are far from every shape, they are dropped once instead of tested per shape
+        near = np.flatnonzero(_near_shapes(shapes, low, high))
+        low, high = low[near], high[near]
+        for shape in shapes:
+            shape_bb = shape.bb
+            # only particles whose path overlaps shape bb need exact test
+            candidates = near[(high[:, 0] >= shape_bb.left) & (low[:, 0] <= shape_bb.right) &
+                              (high[:, 1] >= shape_bb.bottom) & (low[:, 1] <= shape_bb.top)]
+            if len(candidates) == 0:
+                continue
+
+            p0, p1 = start[candidates], end[candidates]
+            if isinstance(shape, pymunk.Segment):
+                idx, contact, normal = _hit_segment(shape, p0, p1)
+            elif isinstance(shape, pymunk.Poly):
+                idx, contact, normal = _hit_poly(shape, p0, p1)
+            elif isinstance(shape, pymunk.Circle):
+                idx, contact, normal = _hit_circle(shape, p1)
+            else:
+                continue
+            if len(idx) == 0:
+                continue
+
+            idx = candidates[idx]
+            hit[idx] = True
+            v = vel[idx]
+            vn = np.sum(v * normal, axis=1, keepdims=True)
+            # only reflect particles moving into the shape
+            vn = np.minimum(vn, 0.)
+            v_normal, v_tangent = vn * normal, v - vn * normal
+            vel[idx] = v_tangent * (1. - self.friction) - v_normal * self.elasticity
+            end[idx] = contact + normal * 1e-3
+        return hit
+
+    def _dot(self, rgba:int)->pygame.Surface:
+        dot = self._dots.get(rgba, None)
+        if dot is None:
+            color = ((rgba >> 24) & 0xFF, (rgba >> 16) & 0xFF, (rgba >> 8) & 0xFF, rgba & 0xFF)
+            dot = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
+            dot.fill(color)
+            self._dots[rgba] = dot
+        return dot
+
+    def draw(self, screen:pygame.Surface, camera:Camera)->None:
+        n = self.count
+        if not self.visible or n == 0:
+            return
+
+        size = max(1, round(self.size * camera.scale))
+        xy = camera.apply_array(self.positions[:n])
+        x = xy[:, 0].astype(np.int32) - size // 2
+        y = (screen.get_height() - xy[:, 1]).astype(np.int32) - size // 2
+        width, height = screen.get_size()
+        on_screen = (x > -size) & (x < width) & (y > -size) & (y < height)
+        if not on_screen.any():
+            return
+        x, y = x[on_screen], y[on_screen]
+
+        colors = self.colors[:n][on_screen]
+        alpha = colors[:, 3].astype(float)
+        if self.fade:
+            alpha *= np.clip(self.life[:n][on_screen] / self.max_life[:n][on_screen], 0., 1.)
+
+        if screen.get_bytesize() == 4:
+            self._draw_pixels(screen, x, y, colors[:, :3], alpha, size)
+        elif screen.get_bitsize() >= 24:
+            self._draw_pixels3d(screen, x, y, colors[:, :3], alpha, size)
+        else:
+            self._draw_blits(screen, x, y, colors, alpha, size)
+
+    def _draw_pixels(self, screen:pygame.Surface, x:np.ndarray, y:np.ndarray,
+                     rgb:np.ndarray, alpha:np.ndarray, size:int)->None:
+        """Write particles directly into 32 bit screen pixels, blending when particles are transparent"""
+        width, height = screen.get_size()
+        row = screen.get_pitch() // 4
+        opaque = bool((alpha >= 255).all())
+        shifts = [np.uint32(shift) for shift in screen.get_shifts()[:3]]
+        keep = np.uint32(~sum(screen.get_masks()[:3]) & 0xFFFFFFFF) # alpha bits of screen pixels stay
+        channels = [rgb[:, k].astype(np.int32) for k in range(3)]
+        color = sum(c.astype(np.uint32) << shift for c, shift in zip(channels, shifts))
+        weight = alpha.astype(np.int32) + 1 # blend weight out of 256
+        # each pixel is one 32 bit integer, so a pixel is read and written once instead of per channel
+        buffer = screen.get_buffer()
+        pixels = np.frombuffer(buffer, dtype=np.uint32)
+        try:
+            for dx in range(size):
+                for dy in range(size):
+                    px, py = x + dx, y + dy
+                    inside = np.flatnonzero((px >= 0) & (px < width) & (py >= 0) & (py < height))
+                    index = py[inside] * row + px[inside]
+                    dest = pixels[index]
+                    if opaque:
+                        pixels[index] = (dest & keep) | color[inside]
+                        continue
+                    out = dest & keep
+                    w = weight[inside]
+                    for c, shift in zip(channels, shifts):
+                        d = ((dest >> shift) & np.uint32(0xFF)).astype(np.int32)
+                        out |= (d + (((c[inside] - d) * w) >> 8)).astype(np.uint32) << shift
+                    pixels[index] = out
+        finally:
+            del pixels, buffer # unlock screen
+
+    def _draw_pixels3d(self, screen:pygame.Surface, x:np.ndarray, y:np.ndarray,
+                       rgb:np.ndarray, alpha:np.ndarray, size:int)->None:
+        """Write particles into 24 bit screen pixels channel by channel, blending when particles are transparent"""
+        width, height = screen.get_size()
+        opaque = bool((alpha >= 255).all())
+        a = (alpha / 255.)[:, None]
+        pixels = pygame.surfarray.pixels3d(screen)
+        try:
+            for dx in range(size):
+                for dy in range(size):
+                    px, py = x + dx, y + dy
+                    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+                    px, py = px[inside], py[inside]
+                    if opaque:
+                        pixels[px, py] = rgb[inside]
+                    else:
+                        dest = pixels[px, py].astype(float)
+                        pixels[px, py] = (dest + (rgb[inside] - dest) * a[inside]).astype(np.uint8)
+        finally:
+            del pixels # unlock screen
+
+    def _draw_blits(self, screen:pygame.Surface, x:np.ndarray, y:np.ndarray,
+                    colors:np.ndarray, alpha:np.ndarray, size:int)->None:
+        """Blit cached dot surfaces, used for screens without direct pixel access"""
+        if size != self.size:
+            self._dots.clear()
+            self.size = size
+        colors = colors.astype(np.uint32)
+        # quantize alpha so that cache of dot surfaces stays small
+        colors[:, 3] = (alpha.astype(np.uint32) // 16) * 16 + 15
+        keys = (colors[:, 0] << 24) | (colors[:, 1] << 16) | (colors[:, 2] << 8) | colors[:, 3]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        dots = [self._dot(k) for k in unique_keys.tolist()]
+        screen.blits([(dots[i], (px, py)) for i, px, py in zip(inverse.tolist(), x.tolist(), y.tolist())],
+                     doreturn=False)
+
+
+def _near_shapes(shapes:List[pymunk.Shape], low:np.ndarray, high:np.ndarray)->np.ndarray:
+    """
+    Mask of particle paths, given by low and high corners of their boxes, that may overlap
+    bb of one of shapes. Shape bbs are marked on a coarse grid over the paths, widened left
+    and down by the longest path, so a path can only overlap a bb if its low corner is in
+    a marked cell.
+    """
+    # reductions by column, numpy reduces (n, 2) arrays along first axis many times slower
+    origin = np.array((low[:, 0].min(), low[:, 1].min()))
+    extent = np.array((high[:, 0].max(), high[:, 1].max())) - origin
+    size = high - low
+    longest = (size[:, 0].max(), size[:, 1].max())
+    cell = max(float(extent.max()) / _GRID_CELLS, 1.)
+    cols, rows = int(extent[0] / cell) + 1, int(extent[1] / cell) + 1
+    marked = np.zeros((cols, rows), dtype=bool)
+    for shape in shapes:
+        bb = shape.bb
+        left = max(math.floor((bb.left - longest[0] - origin[0]) / cell), 0)
+        bottom = max(math.floor((bb.bottom - longest[1] - origin[1]) / cell), 0)
+        right = min(math.floor((bb.right - origin[0]) / cell), cols - 1)
+        top = min(math.floor((bb.top - origin[1]) / cell), rows - 1)
+        if left <= right and bottom <= top:
+            marked[left:right + 1, bottom:top + 1] = True
+    # same division as for shapes so a path and a bb at the same coordinate land in the same cell
+    cells = ((low - origin) / cell).astype(int)
+    return marked[np.minimum(cells[:, 0], cols - 1), np.minimum(cells[:, 1], rows - 1)]
+
+def _hit_segment(shape:pymunk.Segment, p0:np.ndarray, p1:np.ndarray)->Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Particles whose path p0->p1 crosses the segment, returns indices, contact points and normals"""
+    body = shape.body
+    a, b = body.local_to_world(shape.a), body.local_to_world(shape.b)
+    a, b = np.array((a.x, a.y)), np.array((b.x, b.y))
+    seg = b - a
+    seg_len = math.hypot(seg[0], seg[1])
+    if seg_len == 0:
+        return np.empty(0, dtype=int), np.empty((0, 2)), np.empty((0, 2))
+    normal = np.array((-seg[1], seg[0])) / seg_len
+
+    # signed distance of path ends from segment line, shifted by segment radius
+    r = shape.radius
+    d0 = (p0 - a) @ normal
+    d1 = (p1 - a) @ normal
+    side = np.where(d0 >= 0, 1., -1.)
+    d0, d1 = d0 * side, d1 * side
+    crosses = (d0 >= r) & (d1 < r)
+    t = np.where(crosses, (d0 - r) / np.where(d0 - d1 == 0, 1., d0 - d1), 0.)
+    contact = p0 + (p1 - p0) * t[:, None]
+    along = (contact - a) @ (seg / seg_len)
+    crosses &= (along >= 0) & (along <= seg_len)
+
+    idx = np.flatnonzero(crosses)
+    return idx, contact[idx], normal[None, :] * side[idx, None]
+
+def _hit_poly(shape:pymunk.Poly, p0:np.ndarray, p1:np.ndarray)->Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Particles whose path p0->p1 enters or ends inside convex polygon,
+    returns indices, points on boundary and outward normals"""
+    body = shape.body
+    vertices = np.array([tuple(body.local_to_world(v)) for v in shape.get_vertices()])
+    edges = np.roll(vertices, -1, axis=0) - vertices
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    normals = np.stack((edges[:, 1], -edges[:, 0]), axis=1) / lengths[:, None] # outward for CCW vertices
+
+    # signed distance of path ends from each edge line, negative means inside
+    d0 = np.einsum('pvk,vk->pv', p0[:, None, :] - vertices[None, :, :], normals) - shape.radius
+    d1 = np.einsum('pvk,vk->pv', p1[:, None, :] - vertices[None, :, :], normals) - shape.radius
+
+    # path enters polygon through the edge where it crossed latest among edges it crossed,
+    # this is same as clipping the path against all half planes
+    crossing = (d0 >= 0) & (d1 < 0)
+    t = np.where(crossing, d0 / np.where(d0 - d1 == 0, 1., d0 - d1), -1.)
+    edge = np.argmax(t, axis=1)
+    t_enter = t[np.arange(len(p0)), edge]
+    contact = p0 + (p1 - p0) * np.maximum(t_enter, 0.)[:, None]
+    entering = (t_enter >= 0) & \
+        (np.einsum('pvk,vk->pv', contact[:, None, :] - vertices[None, :, :], normals) - shape.radius < 1e-6).all(axis=1)
+
+    # particles that were already inside are pushed out through the nearest edge
+    inside = (d0 < 0).all(axis=1) & (d1 < 0).all(axis=1)
+    nearest = np.argmax(d1, axis=1)
+    edge = np.where(inside, nearest, edge)
+    contact = np.where(inside[:, None],
+                       p1 - normals[nearest] * d1[np.arange(len(p1)), nearest][:, None],
+                       contact)
+
+    idx = np.flatnonzero(entering | inside)
+    return idx, contact[idx], normals[edge[idx]]
+
+def _hit_circle(shape:pymunk.Circle, p:np.ndarray)->Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Particles inside circle, returns indices, closest points on boundary and outward normals"""
+    c = shape.body.local_to_world(shape.offset)
+    d = p - np.array((c.x, c.y))
+    dist = np.hypot(d[:, 0], d[:, 1])
+    idx = np.flatnonzero(dist < shape.radius)
+    if len(idx) == 0:
+        return idx, np.empty((0, 2)), np.empty((0, 2))
+    normal = d[idx] / np.maximum(dist[idx], 1e-9)[:, None]
+    contact = np.array((c.x, c.y)) + normal * shape.radius
+    return idx, contact, normal
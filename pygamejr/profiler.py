@@ -0,0 +1,147 @@
+from typing import Callable, Dict, List, Optional, Sequence
+from dataclasses import dataclass, field
+import time
+
+import numpy as np
+import pygame
+
+from pygamejr.utils import ExponentialMovingAverage
+from pygamejr.pacing import PacingStats
+
+# phases of game.update() in the order they run, wait is time clock.tick() sleeps
+PHASES = ("physics", "events", "on_frame", "scripts", "update", "draw", "constraints", "flip", "wait")
+
+@dataclass
+class PhaseStats:
+    """Milliseconds spent in a phase"""
+    last:float=0.
+    average:float=0. # exponential moving average
+    p50:float=0. # percentiles over recent frames
+    p95:float=0.
+    p99:float=0.
+
+@dataclass
+class FrameStats:
+    """What frames cost recently, by phase, and what is in the game now"""
+    frames:int=0 # frames profiled so far
+    phases:Dict[str, PhaseStats]=field(default_factory=dict)
+    busy:PhaseStats=field(default_factory=PhaseStats) # whole frame except wait
+    fps:float=0.
+    actors:int=0
+    shapes:int=0
+    bodies:int=0
+    constraints:int=0
+    pacing:PacingStats=field(default_factory=PacingStats)
+
+class FrameProfiler:
+    """
+    Times phases of each frame with perf_counter_ns. Call begin() when frame starts and
+    mark(phase) when each phase ends, the phase gets the time since previous mark.
+    Recent frames are kept in a ring buffer for percentiles, which are only computed
+    when stats() is asked for.
+    """
+    def __init__(self, phases:Sequence[str]=PHASES, window:int=240, weight:float=0.05):
+        self.phases = tuple(phases)
+        self.window = window
+        self.weight = weight
+        self.frames = 0
+        self._index = {phase: i for i, phase in enumerate(self.phases)}
+        self._samples = np.zeros((window, len(self.phases)), dtype=np.int64) # ns
+        self._current = np.zeros(len(self.phases), dtype=np.int64)
+        self._averages:List[Optional[ExponentialMovingAverage]] = [None] * (len(self.phases) + 1)
+        self._last_mark = time.perf_counter_ns()
+
+    def begin(self)->None:
+        self._current[:] = 0
+        self._last_mark = time.perf_counter_ns()
+
+    def mark(self, phase:str)->None:
+        now = time.perf_counter_ns()
+        self._current[self._index[phase]] += now - self._last_mark
+        self._last_mark = now
+
+    def end(self)->None:
+        """Frame is done, record its phases"""
+        self._samples[self.frames % self.window] = self._current
+        self.frames += 1
+        busy = float(self._current.sum() - self._current[self._index["wait"]]) \
+            if "wait" in self._index else float(self._current.sum())
+        for i, ns in enumerate([*self._current.tolist(), busy]):
+            average = self._averages[i]
+            if average is None:
+                self._averages[i] = ExponentialMovingAverage(self.weight, initial_value=ns)
+            else:
+                average.add(ns)
+
+    def stats(self)->FrameStats:
+        stats = FrameStats(frames=self.frames)
+        if not self.frames:
+            return stats
+        samples = self._samples[:min(self.frames, self.window)] / 1e6
+        last = self._samples[(self.frames - 1) % self.window] / 1e6
+        busy = samples.sum(axis=1)
+        if "wait" in self._index:
+            busy -= samples[:, self._index["wait"]]
+        p50, p95, p99 = np.percentile(np.column_stack((samples, busy)), (50, 95, 99), axis=0)
+        averages = [a.value / 1e6 if a is not None else 0. for a in self._averages]
+        for i, phase in enumerate(self.phases):
+            stats.phases[phase] = PhaseStats(last=float(last[i]), average=averages[i],
+                                             p50=float(p50[i]), p95=float(p95[i]), p99=float(p99[i]))
+        stats.busy = PhaseStats(last=float(busy[(self.frames - 1) % self.window]), average=averages[-1],
+                                p50=float(p50[-1]), p95=float(p95[-1]), p99=float(p99[-1]))
+        frame_ms = float(samples.sum(axis=1).mean())
+        stats.fps = 1000. / frame_ms if frame_ms > 0 else 0.
+        return stats
+
+class StatsOverlay:
+    """Table of frame stats drawn at top left of the screen, refreshed every few frames"""
+    def __init__(self, refresh_frames:int=15, font_size:int=18,
+                 color="white", background_color=(0, 0, 0, 180)):
+        self.refresh_frames = refresh_frames
+        self.font_size = font_size
+        self.color = color
+        self.background_color = background_color
+        self._font:Optional[pygame.font.Font] = None
+        self._surface:Optional[pygame.Surface] = None
+        self._frames = 0
+
+    def rows(self, stats:FrameStats)->List[List[str]]:
+        rows = [["ms", "avg", "p50", "p95", "p99"]]
+        for name, phase in [*stats.phases.items(), ("busy", stats.busy)]:
+            rows.append([name] + [f"{value:.2f}" for value in
+                                  (phase.average, phase.p50, phase.p95, phase.p99)])
+        return rows
+
+    def draw(self, screen:pygame.Surface, stats:Callable[[], FrameStats])->None:
+        """Draw the table, stats are only collected when it is refreshed"""
+        if self._surface is None or self._frames % self.refresh_frames == 0:
+            self._surface = self._render(stats())
+        self._frames += 1
+        screen.blit(self._surface, (0, 0))
+
+    def _render(self, stats:FrameStats)->pygame.Surface:
+        if self._font is None:
+            self._font = pygame.font.Font(None, self.font_size)
+        font, pad = self._font, 4
+        title = font.render(f"{stats.fps:.1f} fps  actors {stats.actors}  shapes {stats.shapes}  "
+                            f"bodies {stats.bodies}  joints {stats.constraints}", True, self.color)
+        pacing = stats.pacing
+        subtitle = font.render(f"budget {pacing.budget_used*100:.0f}%  jitter {pacing.jitter:.2f} ms  "
+                               f"missed {pacing.missed}  skipped {pacing.skipped}", True, self.color)
+        cells = [[font.render(cell, True, self.color) for cell in row] for row in self.rows(stats)]
+        widths = [max(row[i].get_width() for row in cells) + 2 * pad for i in range(len(cells[0]))]
+        height = font.get_linesize()
+
+        surface = pygame.Surface((max(title.get_width(), subtitle.get_width(), sum(widths)) + 2 * pad,
+                                  height * (len(cells) + 2) + 2 * pad), pygame.SRCALPHA)
+        surface.fill(self.background_color)
+        surface.blit(title, (pad, pad))
+        surface.blit(subtitle, (pad, pad + height))
+        for j, row in enumerate(cells):
+            x = pad
+            for i, cell in enumerate(row):
+                # names left aligned, numbers right aligned
+                left = x if i == 0 else x + widths[i] - cell.get_width() - pad
+                surface.blit(cell, (left, pad + (j + 2) * height))
+                x += widths[i]
+        return surface
@@ -0,0 +1,124 @@
+from typing import Any, List, Sequence, Set, Tuple
+
+import numpy as np
+
+import pygame
+import pymunk
+
+from pygamejr.common import PyGameColor, Coordinates, Camera
+from pygamejr.actor import ActorGroup
+
+
+class Rope(ActorGroup):
+    """
+    Bodies linked by joints one after another, used for ropes, chains and soft bodies.
+
+    Instead of drawing each member, one polyline goes through path points, each path
+    point is a point given in local coordinates of a member. If filled, the polygon
+    made by the path is filled, which is how soft bodies are drawn. Like in ActorGroup,
+    rope[i] returns an Actor view of member i. Removing a member also removes its joints.
+    """
+    def __init__(self, shapes:Sequence[pymunk.Shape],
+                 joints:Sequence[pymunk.Constraint],
+                 path_members:Sequence[int],
+                 path_points:Sequence[Coordinates],
+                 color:PyGameColor="white",
+                 width:int=2,
+                 closed:bool=False,
+                 filled:bool=False,
+                 visible:bool=True):
+        super().__init__(shapes, colors=[color] * len(shapes), visible=visible)
+        self.joints = list(joints)
+        self.color = color
+        self.width = width
+        self.closed = closed
+        self.filled = filled
+        self._path_members = np.asarray(path_members, dtype=int)
+        self._path_points = np.asarray(path_points, dtype=float).reshape(-1, 2)
+        self._live_joints:Set[pymunk.Constraint] = set(self.joints)
+
+    def physics_objects(self)->List[Any]:
+        return super().physics_objects() + [j for j in self.joints if j in self._live_joints]
+
+    def _remove_member(self, index:int)->List[Any]:
+        objs = super()._remove_member(index)
+        if objs:
+            body = self.bodies[index]
+            attached = [j for j in self.joints if j in self._live_joints and body in (j.a, j.b)]
+            self._live_joints.difference_update(attached)
+            objs.extend(attached)
+        return objs
+
+    def path(self)->np.ndarray:
+        """(n, 2) world coordinates of path points of alive members"""
+        keep = self.alive[self._path_members]
+        members, local = self._path_members[keep], self._path_points[keep]
+        bodies = self.bodies
+        positions = np.array([tuple(bodies[i].position) for i in members.tolist()], dtype=float).reshape(-1, 2)
+        angles = np.array([bodies[i].angle for i in members.tolist()], dtype=float)
+        cos, sin = np.cos(angles), np.sin(angles)
+        return positions + np.stack((local[:, 0]*cos - local[:, 1]*sin,
+                                     local[:, 0]*sin + local[:, 1]*cos), axis=-1)
+
+    def draw(self, screen:pygame.Surface, camera:Camera)->None:
+        if not self.visible or not len(self.shapes):
+            return
+        points = camera.apply_array(self.path())
+        if len(points) < 2:
+            return
+        points[:, 1] = screen.get_height() - points[:, 1]
+        points = points.tolist()
+        if self.filled and len(points) > 2:
+            pygame.draw.polygon(screen, self.color, points, 0)
+        else:
+            width = max(1, int(round(self.width * camera.scale)))
+            pygame.draw.lines(screen, self.color, self.closed, points, width)
+
+
+def _inside(points:np.ndarray, polygon:np.ndarray)->np.ndarray:
+    """Mask of points inside polygon, even-odd rule"""
+    inside = np.zeros(len(points), dtype=bool)
+    x, y = points[:, 0], points[:, 1]
+    for (x0, y0), (x1, y1) in zip(polygon.tolist(), np.roll(polygon, -1, axis=0).tolist()):
+        if y0 == y1:
+            continue
+        crosses = (y0 > y) != (y1 > y)
+        x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+def _distance_to_outline(points:np.ndarray, polygon:np.ndarray)->np.ndarray:
+    distance = np.full(len(points), np.inf)
+    for a, b in zip(polygon, np.roll(polygon, -1, axis=0)):
+        ab = b - a
+        t = np.clip(((points - a) @ ab) / max(ab @ ab, 1e-12), 0., 1.)
+        distance = np.minimum(distance, np.linalg.norm(points - (a + t[:, None] * ab), axis=1))
+    return distance
+
+def soft_body_mesh(polygon:Sequence[Coordinates], spacing:float)->Tuple[np.ndarray, int, np.ndarray]:
+    """
+    Nodes filling the polygon about spacing apart and springs between neighbouring nodes.
+    Returns node positions, number of nodes on the outline, which come first and in order,
+    and (m, 2) array of node index pairs for springs.
+    """
+    polygon = np.asarray(polygon, dtype=float).reshape(-1, 2)
+    outline = []
+    for a, b in zip(polygon, np.roll(polygon, -1, axis=0)):
+        steps = max(1, int(np.ceil(np.linalg.norm(b - a) / spacing)))
+        outline.append(a + (b - a) * (np.arange(steps) / steps)[:, None])
+    outline_nodes = np.concatenate(outline)
+
+    low, high = polygon.min(axis=0), polygon.max(axis=0)
+    xs = np.arange(low[0] + spacing, high[0], spacing)
+    ys = np.arange(low[1] + spacing, high[1], spacing)
+    grid = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+    # keep grid nodes inside and not too close to the outline
+    grid = grid[_inside(grid, polygon)]
+    grid = grid[_distance_to_outline(grid, polygon) > spacing * 0.5]
+    nodes = np.concatenate((outline_nodes, grid))
+
+    # structural and shear springs to all nodes within reach
+    distances = np.linalg.norm(nodes[:, None, :] - nodes[None, :, :], axis=-1)
+    first, second = np.nonzero(np.triu(distances <= spacing * 1.5, k=1))
+    springs = np.stack((first, second), axis=-1)
+    return nodes, len(outline_nodes), springs
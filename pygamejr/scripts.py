@@ -0,0 +1,142 @@
+from typing import Any, Callable, Coroutine, Dict, Generator, List, Optional, Set, Tuple, Union
+import heapq
+import itertools
+import types
+
+# Scripts are coroutines, either async functions or plain generators. A script yields
+# None to sleep till next frame or a number of seconds to sleep that long, and is sent
+# back the seconds that passed. Async functions do the same with await wait(seconds).
+ScriptCoroutine = Union[Coroutine[Any, Any, Any], Generator[Optional[float], Optional[float], Any]]
+
+@types.coroutine
+def wait(seconds:float)->Generator[Optional[float], Optional[float], Optional[float]]:
+    """Sleep for seconds of game time, returns seconds that actually passed"""
+    return (yield float(seconds))
+
+@types.coroutine
+def next_frame()->Generator[Optional[float], Optional[float], Optional[float]]:
+    """Sleep till next frame, returns seconds that passed"""
+    return (yield None)
+
+@types.coroutine
+def tween(seconds:float, apply:Callable[[float], None])->Generator[Optional[float], Optional[float], None]:
+    """Call apply(t) every frame with t going from 0 to 1 over seconds"""
+    elapsed = 0.
+    apply(0.)
+    while elapsed < seconds:
+        elapsed += (yield None) or 0.
+        apply(min(elapsed / seconds, 1.) if seconds > 0 else 1.)
+
+class Script:
+    """Running script, cancel() stops it"""
+    def __init__(self, coroutine:ScriptCoroutine, owner:Optional[Any]=None):
+        self.coroutine = coroutine
+        self.owner = owner
+        self.done = False
+        self.result:Any = None
+        self._started = False
+        self._yielded_at = 0. # game time when script last went to sleep
+
+    @property
+    def running(self)->bool:
+        """True while script's own code runs, for example when it removes its own actor"""
+        coroutine = self.coroutine
+        return bool(coroutine.cr_running if isinstance(coroutine, types.CoroutineType) else coroutine.gi_running)
+
+    def cancel(self)->None:
+        if not self.done:
+            self.done = True
+            # a running coroutine can't be closed, scheduler closes it when it yields
+            if not self.running:
+                self.coroutine.close()
+
+class Scheduler:
+    """
+    Runs scripts cooperatively on the game clock. Scripts that sleep till next frame wait
+    in a list, scripts that sleep longer are parked in a heap by wake up time, so a frame
+    only costs as much as scripts that wake up in it.
+    """
+    def __init__(self):
+        self.time = 0. # game time in seconds
+        self._ready:List[Script] = []
+        self._sleeping:List[Tuple[float, int, Script]] = []
+        self._order = itertools.count() # keeps scripts waking at same time in order
+        self._by_owner:Dict[Any, Set[Script]] = {}
+
+    def __len__(self)->int:
+        return len(self._ready) + sum(1 for _, _, script in self._sleeping if not script.done)
+
+    def start(self, coroutine:Union[ScriptCoroutine, Callable[[], ScriptCoroutine]],
+              owner:Optional[Any]=None)->Script:
+        """Start script on next run(), owner's scripts can be cancelled together"""
+        if callable(coroutine) and not isinstance(coroutine, (types.CoroutineType, types.GeneratorType)):
+            coroutine = coroutine()
+        assert isinstance(coroutine, (types.CoroutineType, types.GeneratorType)), \
+            "script must be an async function or a generator"
+        script = Script(coroutine, owner=owner)
+        script._yielded_at = self.time
+        if owner is not None:
+            self._by_owner.setdefault(owner, set()).add(script)
+        self._ready.append(script)
+        return script
+
+    def cancel_owned(self, owner:Any)->None:
+        for script in self._by_owner.pop(owner, ()):
+            script.cancel()
+
+    def cancel_owners(self, keep:Optional[Any]=None)->None:
+        """Cancel scripts of all owners except keep, scripts without owner go on"""
+        for owner in list(self._by_owner):
+            if owner is not keep:
+                self.cancel_owned(owner)
+
+    def run(self, dt:float)->None:
+        """Advance game time by dt and resume scripts that are due"""
+        self.time += dt
+        ready, self._ready = self._ready, []
+        # tolerance so sleeping a whole number of frames isn't lost to rounding of the sum of dts
+        while self._sleeping and self._sleeping[0][0] <= self.time + 1e-9:
+            ready.append(heapq.heappop(self._sleeping)[2])
+        for i, script in enumerate(ready):
+            if script.done: # cancelled while asleep
+                self._forget(script)
+                continue
+            try:
+                self._resume(script)
+            except BaseException:
+                # scripts that didn't get to run this frame run next frame
+                self._ready = ready[i+1:] + self._ready
+                raise
+
+    def _resume(self, script:Script)->None:
+        try:
+            if script._started:
+                command = script.coroutine.send(self.time - script._yielded_at)
+            else:
+                script._started = True
+                command = script.coroutine.send(None)
+        except StopIteration as stop:
+            script.done, script.result = True, stop.value
+            self._forget(script)
+            return
+        except BaseException:
+            script.done = True
+            self._forget(script)
+            raise
+
+        if script.done: # cancelled itself, for example by removing its own actor
+            script.coroutine.close()
+            self._forget(script)
+            return
+        script._yielded_at = self.time
+        if command is None:
+            self._ready.append(script)
+        else:
+            heapq.heappush(self._sleeping, (self.time + float(command), next(self._order), script))
+
+    def _forget(self, script:Script)->None:
+        scripts = self._by_owner.get(script.owner, None)
+        if scripts is not None:
+            scripts.discard(script)
+            if not scripts:
+                del self._by_owner[script.owner]
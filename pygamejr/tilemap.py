@@ -0,0 +1,240 @@
+from typing import Any, Dict, List, Optional, Tuple, Union, Iterable
+import os
+import csv
+import json
+import math
+
+import numpy as np
+
+import pygame
+import pymunk
+from pymunk import Vec2d
+
+from pygamejr.common import PyGameColor, Coordinates, Camera
+from pygamejr.actor import Drawable
+from pygamejr.compound import Compound
+from pygamejr import common
+from pygamejr import utils
+
+TileSpec = Union[str, PyGameColor] # image path or color
+
+def load_tile_grid(path:str)->np.ndarray:
+    """
+    Load grid of tile ids from CSV or JSON file, first row is the top of the map.
+    JSON can be list of rows, {"tiles": rows} or Tiled map with tile layer.
+    Empty cells and negative ids are returned as 0 which means no tile.
+    """
+    full_path = utils.full_path_abs(path)
+    if os.path.splitext(full_path)[1].lower() == '.json':
+        with open(full_path, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            if 'tiles' in data:
+                data = data['tiles']
+            else: # Tiled map
+                layer = next(l for l in data['layers'] if 'data' in l)
+                data = np.asarray(layer['data'], dtype=np.int64).reshape(layer['height'], layer['width'])
+        grid = np.asarray(data, dtype=np.int64)
+    else:
+        with open(full_path, 'r', newline='') as f:
+            rows = [[int(v) if v.strip() else 0 for v in row] for row in csv.reader(f) if row]
+        width = max(len(row) for row in rows)
+        grid = np.zeros((len(rows), width), dtype=np.int64)
+        for r, row in enumerate(rows):
+            grid[r, :len(row)] = row
+    return np.maximum(grid, 0)
+
+def merge_rects(solid:np.ndarray)->List[Tuple[int, int, int, int]]:
+    """
+    Greedily cover solid cells with as few rectangles as possible: take a horizontal
+    run of cells and grow it down while the rows below have the same run free.
+    Returns (row, col, height, width) tuples.
+    """
+    rows, cols = solid.shape
+    free = solid.astype(bool).copy()
+    rects = []
+    for r in range(rows):
+        line = free[r]
+        if not line.any():
+            continue
+        # start and end of each run of free cells in this row
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], line.view(np.int8), [0]))))
+        for c0, c1 in zip(edges[0::2].tolist(), edges[1::2].tolist()):
+            h = 1
+            while r + h < rows and free[r + h, c0:c1].all():
+                h += 1
+            free[r:r + h, c0:c1] = False
+            rects.append((r, c0, h, c1 - c0))
+    return rects
+
+class Tilemap(Drawable):
+    """
+    Grid of tiles drawn from cached chunks with merged colliders.
+
+    Tiles are drawn into chunk surfaces the first time a chunk comes into view and
+    only chunks inside the screen are drawn. Solid tiles are merged into as few boxes
+    as possible which are attached to the shared static body through colliders compound,
+    so a whole level is a handful of shapes with far fewer seams for bodies to snag on.
+    """
+    def __init__(self, space:pymunk.Space, grid:np.ndarray,
+                 tiles:Dict[int, TileSpec],
+                 tile_size:float=32,
+                 bottom_left:Coordinates=(0, 0),
+                 solid:Optional[Iterable[int]]=None,
+                 chunk_size:int=16,
+                 color:PyGameColor="gray",
+                 elasticity:Optional[float]=None,
+                 friction:Optional[float]=None,
+                 colliision_group:Optional[int]=None,
+                 collision_type:Optional[int]=None,
+                 layer:Optional[str]=None,
+                 visible:bool=True,
+                 z_order:int=-1):
+        super().__init__(visible=visible, z_order=z_order)
+        self.space = space
+        self.grid = np.asarray(grid, dtype=np.int64)
+        self.tiles = tiles
+        self.tile_size = tile_size
+        self.bottom_left = Vec2d(*bottom_left)
+        self.solid = set(solid) if solid is not None else None # None means every tile is solid
+        self.chunk_size = chunk_size
+        self.color = color
+
+        self.colliders = Compound(space, space.static_body,
+                                  elasticity=elasticity, friction=friction,
+                                  colliision_group=colliision_group, collision_type=collision_type,
+                                  layer=layer, visible=False)
+        self._chunks:Dict[Tuple[int, int], pygame.Surface] = {}
+        self._scaled:Dict[Tuple[int, int], pygame.Surface] = {}
+        self._scaled_for:Optional[Tuple[float, float]] = None # camera scale and angle of _scaled
+        self._tile_images:Dict[int, pygame.Surface] = {}
+
+        self._build_colliders()
+
+    @property
+    def rows(self)->int:
+        return self.grid.shape[0]
+    @property
+    def cols(self)->int:
+        return self.grid.shape[1]
+
+    def solid_mask(self)->np.ndarray:
+        if self.solid is None:
+            return self.grid > 0
+        return np.isin(self.grid, list(self.solid))
+
+    def _build_colliders(self)->None:
+        self.colliders.clear()
+        ts, (x, y), rows = self.tile_size, self.bottom_left, self.rows
+        boxes = []
+        for r, c, h, w in merge_rects(self.solid_mask()):
+            left, right = x + c*ts, x + (c + w)*ts
+            top, bottom = y + (rows - r)*ts, y + (rows - r - h)*ts
+            boxes.append(pymunk.Poly(self.space.static_body,
+                                     [(left, bottom), (right, bottom), (right, top), (left, top)],
+                                     radius=0))
+        if boxes:
+            self.colliders.add_shapes(boxes)
+
+    def physics_objects(self)->List[Any]:
+        return self.colliders.physics_objects()
+
+    def cell_at(self, xy:Coordinates)->Optional[Tuple[int, int]]:
+        """(row, col) of the tile at world coordinates, None if outside the map"""
+        col = math.floor((xy[0] - self.bottom_left.x) / self.tile_size)
+        row = self.rows - 1 - math.floor((xy[1] - self.bottom_left.y) / self.tile_size)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def tile_at(self, xy:Coordinates)->int:
+        cell = self.cell_at(xy)
+        return int(self.grid[cell]) if cell is not None else 0
+
+    def set_tile(self, row:int, col:int, tile:int, update_colliders:bool=True)->None:
+        """Change a tile, pass update_colliders=False when changing many tiles and call update_colliders() after"""
+        was_solid = self._is_solid(int(self.grid[row, col]))
+        self.grid[row, col] = tile
+        key = (col // self.chunk_size, row // self.chunk_size)
+        self._chunks.pop(key, None)
+        self._scaled.pop(key, None)
+        if update_colliders and was_solid != self._is_solid(tile):
+            self._build_colliders()
+
+    def update_colliders(self)->None:
+        self._build_colliders()
+
+    def _is_solid(self, tile:int)->bool:
+        return tile > 0 and (self.solid is None or tile in self.solid)
+
+    def _tile_image(self, tile:int)->pygame.Surface:
+        image = self._tile_images.get(tile, None)
+        if image is None:
+            size = int(round(self.tile_size))
+            spec = self.tiles.get(tile, self.color)
+            if isinstance(spec, str) and os.path.splitext(spec)[1]:
+                image = common.get_image(spec)[0][1]
+                image = pygame.transform.smoothscale(image.convert_alpha(), (size, size))
+            else:
+                image = pygame.Surface((size, size), pygame.SRCALPHA)
+                image.fill(spec)
+            self._tile_images[tile] = image
+        return image
+
+    def _chunk(self, key:Tuple[int, int])->pygame.Surface:
+        """Surface with tiles of chunk (chunk col, chunk row), drawn once and cached"""
+        surface = self._chunks.get(key, None)
+        if surface is None:
+            n, size = self.chunk_size, int(round(self.tile_size))
+            block = self.grid[key[1]*n:(key[1]+1)*n, key[0]*n:(key[0]+1)*n]
+            surface = pygame.Surface((block.shape[1]*size, block.shape[0]*size), pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 0))
+            surface.blits([(self._tile_image(tile), (c*size, r*size))
+                           for (r, c), tile in np.ndenumerate(block) if tile > 0], doreturn=False)
+            self._chunks[key] = surface
+        return surface
+
+    def draw(self, screen:pygame.Surface, camera:Camera)->None:
+        if not self.visible or self.grid.size == 0:
+            return
+        width, height = screen.get_size()
+        if self._scaled_for != (camera.scale, camera.angle):
+            self._scaled.clear()
+            self._scaled_for = (camera.scale, camera.angle)
+
+        # world region covered by the screen, in tile cells
+        corners = camera.unapply_array(np.array([[0, 0], [width, 0], [0, height], [width, height]], dtype=float))
+        ts, n = self.tile_size, self.chunk_size
+        col0, col1 = (corners[:, 0].min() - self.bottom_left.x) / ts, (corners[:, 0].max() - self.bottom_left.x) / ts
+        row0 = self.rows - (corners[:, 1].max() - self.bottom_left.y) / ts
+        row1 = self.rows - (corners[:, 1].min() - self.bottom_left.y) / ts
+        chunk_cols = range(max(0, math.floor(col0) // n), min((self.cols - 1) // n, math.floor(col1) // n) + 1)
+        chunk_rows = range(max(0, math.floor(row0) // n), min((self.rows - 1) // n, math.floor(row1) // n) + 1)
+
+        blits = []
+        for cj in chunk_rows:
+            for ci in chunk_cols:
+                chunk = self._chunk((ci, cj))
+                # world corners of the chunk
+                left = self.bottom_left.x + ci*n*ts
+                top = self.bottom_left.y + (self.rows - cj*n)*ts
+                right = left + chunk.get_width() / round(ts) * ts
+                bottom = top - chunk.get_height() / round(ts) * ts
+                if camera.angle == 0:
+                    (x0, y0), (x1, y1) = camera.apply_array(np.array([[left, top], [right, bottom]]))
+                    x0, x1 = round(x0), round(x1)
+                    y0, y1 = round(height - y0), round(height - y1)
+                    scaled = self._scaled.get((ci, cj), None)
+                    if scaled is None:
+                        scaled = chunk if chunk.get_size() == (x1 - x0, y1 - y0) else \
+                                 pygame.transform.scale(chunk, (max(1, x1 - x0), max(1, y1 - y0)))
+                        self._scaled[(ci, cj)] = scaled
+                    blits.append((scaled, (x0, y0)))
+                else:
+                    scaled = self._scaled.get((ci, cj), None)
+                    if scaled is None:
+                        scaled = pygame.transform.rotozoom(chunk, math.degrees(camera.angle), camera.scale)
+                        self._scaled[(ci, cj)] = scaled
+                    cx, cy = camera.apply_array(np.array([[(left + right)/2., (top + bottom)/2.]]))[0]
+                    blits.append((scaled, scaled.get_rect(center=(cx, height - cy))))
+        screen.blits(blits, doreturn=False)
@@ -0,0 +1,114 @@
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+import heapq
+import itertools
+
+@dataclass
+class GameClock:
+    """Game time, stops while paused and runs faster or slower than real time with scale"""
+    time:float=0. # seconds of game time since start
+    scale:float=1.
+    paused:bool=False
+
+    def tick(self, dt:float)->float:
+        """Advance by dt of real time, returns how much game time passed"""
+        if self.paused:
+            return 0.
+        dt *= self.scale
+        self.time += dt
+        return dt
+
+class Timer:
+    """Callback waiting in Timers, cancel() stops it"""
+    __slots__ = ("due", "interval", "callback", "owner", "cancelled", "_timers")
+
+    def __init__(self, due:float, interval:Optional[float], callback:Callable[[], Any],
+                 owner:Optional[Any], timers:'Timers'):
+        self.due = due # game time when callback is called next
+        self.interval = interval # seconds between calls of repeating timer, None if called once
+        self.callback = callback
+        self.owner = owner
+        self.cancelled = False
+        self._timers = timers
+
+    @property
+    def active(self)->bool:
+        return not self.cancelled
+
+    def cancel(self)->None:
+        if not self.cancelled:
+            self.cancelled = True
+            self._timers._cancelled(self)
+
+class Timers:
+    """
+    Delayed and repeating callbacks on game time, kept in a min-heap by due time so a
+    frame only looks at timers that are due. Cancelled timers stay in the heap until they
+    come up, the heap is rebuilt when most of it is cancelled.
+    """
+    def __init__(self):
+        self.time = 0.
+        self._heap:List[Tuple[float, int, Timer]] = []
+        self._order = itertools.count() # timers due at same time are called in order made
+        self._dead = 0 # cancelled timers still in heap
+        self._by_owner:Dict[Any, Set[Timer]] = {}
+
+    def __len__(self)->int:
+        return len(self._heap) - self._dead
+
+    def after(self, seconds:float, callback:Callable[[], Any], owner:Optional[Any]=None)->Timer:
+        """Call callback once after seconds of game time"""
+        return self._add(Timer(self.time + seconds, None, callback, owner, self))
+
+    def every(self, seconds:float, callback:Callable[[], Any], owner:Optional[Any]=None)->Timer:
+        """Call callback every seconds of game time, first call is after seconds"""
+        assert seconds > 0, "interval of repeating timer must be positive"
+        return self._add(Timer(self.time + seconds, seconds, callback, owner, self))
+
+    def _add(self, timer:Timer)->Timer:
+        if timer.owner is not None:
+            self._by_owner.setdefault(timer.owner, set()).add(timer)
+        heapq.heappush(self._heap, (timer.due, next(self._order), timer))
+        return timer
+
+    def _cancelled(self, timer:Timer)->None:
+        self._dead += 1
+        self._forget(timer)
+        if self._dead > 64 and self._dead > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._dead = 0
+
+    def _forget(self, timer:Timer)->None:
+        timers = self._by_owner.get(timer.owner, None)
+        if timers is not None:
+            timers.discard(timer)
+            if not timers:
+                del self._by_owner[timer.owner]
+
+    def cancel_owned(self, owner:Any)->None:
+        for timer in list(self._by_owner.get(owner, ())):
+            timer.cancel()
+
+    def cancel_owners(self, keep:Optional[Any]=None)->None:
+        """Cancel timers of all owners except keep, timers without owner go on"""
+        for owner in list(self._by_owner):
+            if owner is not keep:
+                self.cancel_owned(owner)
+
+    def run(self, dt:float)->None:
+        """Advance game time by dt and call timers that are due, repeating ones as many times as they came due"""
+        self.time += dt
+        # callbacks can add and cancel timers, which may rebuild the heap
+        while self._heap and self._heap[0][0] <= self.time + 1e-9:
+            _, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                self._dead -= 1
+                continue
+            if timer.interval is None:
+                timer.cancelled = True # done, so cancel() after this is a no-op
+                self._forget(timer)
+            else:
+                timer.due += timer.interval
+                heapq.heappush(self._heap, (timer.due, next(self._order), timer))
+            timer.callback()
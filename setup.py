@@ -7,7 +7,7 @@ with open("README.md", "r", encoding='utf_8') as fh:
     long_description = fh.read()
 
 install_requires=[
-    'pygame', 'pymunk'
+    'pygame', 'pymunk>=7', 'numpy'
 ]
 
 setuptools.setup(
@@ -0,0 +1,35 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pytest
+
+from pygamejr import game
+
+@pytest.fixture
+def world():
+    world = game.World()
+    with world:
+        game.start(headless=True)
+        yield world
+
+def test_removed_actors_drop_collision_handlers(world):
+    for _ in range(50):
+        ball = game.create_circle(radius=10, center=(100, 100))
+        game.on_collision(ball, None, begin=lambda a, b, arbiter: True)
+        game.remove(ball)
+    assert not game._collision_owners
+    assert sum(len(handlers) for handlers in game._collision_handlers.values()) == 0
+
+def test_remove_all_and_pool_drop_collision_handlers(world):
+    pool = game.pool(lambda: game.create_circle(radius=10, center=(100, 100)), 1)
+    ball = pool.acquire()
+    game.on_collision(ball, None, begin=lambda a, b, arbiter: True)
+    pool.release(ball)
+    assert not game._collision_owners
+
+    group = game.create_circles(centers=[(10, 10), (50, 50)], radii=5)
+    game.on_collision(group, None, begin=lambda a, b, arbiter: True)
+    game.remove_all()
+    assert not game._collision_owners
+    assert not game._collision_handlers
@@ -0,0 +1,79 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pytest
+
+from pygamejr import game
+
+@pytest.fixture
+def world():
+    world = game.World()
+    with world:
+        game.start(headless=True, gravity=-900)
+        yield world
+
+def _touched_shapes(actor, exact):
+    return {other.shape for other, _ in game.touches_who(actor, exact=exact)}
+
+def _assert_graph_matches_query(actor, *others):
+    for other in (None, *others):
+        assert actor.touches(other, exact=False) == actor.touches(other, exact=True)
+    assert actor.is_grounded(exact=False) == actor.is_grounded(exact=True)
+    assert _touched_shapes(actor, False) == _touched_shapes(actor, True)
+
+def test_resting_contacts_match_shape_queries(world):
+    floor = game.create_rect(width=400, height=20, bottom_left=(0, 0), fixed_object=True)
+    wall = game.create_rect(width=20, height=200, bottom_left=(300, 20), fixed_object=True)
+    box = game.create_rect(width=40, height=40, center=(100, 60), density=1)
+    top = game.create_rect(width=20, height=20, center=(100, 100), density=1)
+    leaning = game.create_circle(radius=10, center=(285, 30), density=1)
+    for _ in range(60):
+        leaning.apply_force((500000, 0)) # pushed against the wall
+        game.update()
+
+    for actor in (box, top, leaning):
+        _assert_graph_matches_query(actor, floor, wall, box, top)
+        assert actor.is_grounded()
+    assert box.touches(floor) and box.touches(top) and not box.touches(wall)
+    assert _touched_shapes(box, None) == {floor.shape, top.shape}
+    assert _touched_shapes(leaning, None) == {floor.shape, wall.shape}
+
+    # ground normal points up from what the actor stands on
+    grounding = top.get_grounding()
+    assert grounding.has_body
+    assert grounding.normal.y == pytest.approx(1., abs=1e-3)
+    assert floor.get_grounding().normal.y <= 0 # floor only has things on top of it
+
+def test_contacts_end_when_bodies_separate(world):
+    floor = game.create_rect(width=400, height=20, bottom_left=(0, 0), fixed_object=True)
+    ball = game.create_circle(radius=10, center=(100, 30), density=1)
+    for _ in range(30):
+        game.update()
+    assert ball.touches(floor) and ball.is_grounded()
+
+    ball.velocity = (0, 600)
+    game.update()
+    _assert_graph_matches_query(ball, floor)
+    assert not ball.touches() and not ball.is_grounded()
+    assert list(game.touches_who(ball)) == []
+
+def test_kinematic_actor_moved_by_hand_uses_shape_query(world):
+    level = game.create_level()
+    level.add_rect(width=400, height=20, bottom_left=(0, 0))
+    platform = game.create_rect(width=60, height=10, center=(100, 200))
+    game.update()
+    assert not platform.touches() and not platform.is_grounded()
+
+    # solver makes no contacts between kinematic and static bodies, default query finds them
+    platform.position = (100, 24)
+    assert platform.touches(exact=True) and platform.is_grounded(exact=True)
+    assert not platform.touches(exact=False)
+    game.update()
+    assert platform.touches() and platform.is_grounded()
+    assert len(list(game.touches_who(platform))) == 1
+
+    # touching something above is not standing on it
+    level.add_rect(width=400, height=20, bottom_left=(0, 300))
+    platform.position = (100, 296)
+    assert platform.touches() and not platform.is_grounded()
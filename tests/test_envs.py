@@ -0,0 +1,49 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pytest
+
+from pygamejr import game
+from pygamejr.envs import Env, VectorEnv
+
+class FallEnv(Env):
+    observation_shape = (1,)
+
+    def start(self):
+        game.start(headless=True, gravity=-1000)
+
+    def reset(self, rng):
+        self.ball = game.create_circle(radius=5, center=(100, 300), density=1)
+
+    def act(self, action):
+        pass
+
+    def outcome(self):
+        return 0., self.ball.shape.body.position.y < 250
+
+    def observe(self, out):
+        out[0] = self.ball.shape.body.position.y
+
+class NoOutcomeEnv(Env):
+    def reset(self, rng):
+        pass
+    def act(self, action):
+        pass
+    def observe(self, out):
+        pass
+
+def test_env_missing_method_fails_up_front():
+    with pytest.raises(TypeError):
+        VectorEnv(NoOutcomeEnv, num_envs=2)
+
+def test_in_process_envs_step_and_reset():
+    with VectorEnv(FallEnv, num_envs=2) as envs:
+        assert np.all(envs.reset()[:, 0] == 300)
+        terminated_any = False
+        for _ in range(60):
+            observations, rewards, terminated, truncated = envs.step(np.zeros(2, dtype=np.float32))
+            terminated_any |= terminated.any()
+        assert terminated_any
+        assert np.all(observations[:, 0] > 250)
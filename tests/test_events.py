@@ -0,0 +1,38 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from pygamejr import game
+
+@pytest.fixture
+def world():
+    world = game.World()
+    with world:
+        game.start(screen_width=400, screen_height=400, headless=True)
+        yield world
+
+def click(x, y):
+    """Mouse down at world position, camera is not moved so only y flips"""
+    game._dispatch_mousedown(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, 400 - y),
+                                                button=1, touch=False, window=None))
+
+def test_mouse_events_hit_hud(world):
+    hud = game.create_hud(width=100, height=50, bottom_left=(10, 10))
+    clicks = []
+    game.handle(hud.on_mousedown, lambda actor, *args: clicks.append(actor))
+    click(50, 30)
+    click(300, 300)
+    assert clicks == [hud]
+
+def test_untargeted_mouse_handler_gets_all_clicks(world):
+    ball = game.create_circle(radius=10, center=(100, 100))
+    hits, anywhere = [], []
+    game.handle(ball.on_mousedown, lambda actor, *args: hits.append(actor))
+    game.handle(ball.on_mousedown, lambda actor, *args: anywhere.append(actor), targeted=False)
+    click(100, 100)
+    click(300, 300)
+    assert hits == [ball]
+    assert anywhere == [ball, ball]
@@ -0,0 +1,27 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pytest
+
+from pygamejr import game
+
+@pytest.fixture
+def world():
+    world = game.World()
+    with world:
+        game.start(headless=True)
+        yield world
+
+def test_empty_groups(world):
+    for group in (game.create_circles(centers=np.zeros((0, 2))),
+                  game.create_rects(bottom_lefts=np.zeros((0, 2)))):
+        assert len(group) == 0 and list(group) == []
+    game.update()
+    game.render()
+
+def test_len_counts_members_in_game(world):
+    group = game.create_circles(centers=[(10, 10), (50, 50), (90, 90)], radii=5)
+    game.remove(group[1])
+    assert len(group) == len(list(group)) == 2
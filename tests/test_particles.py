@@ -0,0 +1,55 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pytest
+
+from pygamejr import game
+
+@pytest.fixture
+def world():
+    world = game.World()
+    with world:
+        game.start(headless=True, gravity=-900)
+        yield world
+
+def test_particles_fall_bounce_and_expire(world):
+    game.create_line(start_pt=(0, 100), end_pt=(600, 100), radius=2, fixed_object=True)
+    particles = game.create_particles(capacity=500, lifetime=1., collide=True, elasticity=0.5)
+    xs = np.linspace(50, 550, 500)
+    particles.emit(500, position=np.stack((xs, np.full(500, 300.)), axis=1), velocity=(0, -300))
+    bounced = False
+    for _ in range(50):
+        game.update()
+        assert len(particles) == 500
+        assert (particles.positions[:500, 1] > 100).all() # none went through the line
+        bounced |= bool((particles.velocities[:500, 1] > 0).all())
+    assert bounced
+    for _ in range(12):
+        game.update()
+    assert len(particles) == 0
+
+def test_particles_far_apart_hit_small_shapes(world):
+    game.create_rect(width=20, height=20, bottom_left=(290, 90), fixed_object=True)
+    game.create_circle(radius=10, center=(900, 100), fixed_object=True)
+    particles = game.create_particles(capacity=2000, lifetime=10., collide=True, kill_on_collision=True)
+    xs = np.linspace(0, 1200, 2000)
+    particles.emit(2000, position=np.stack((xs, np.full(2000, 200.)), axis=1), velocity=(0, -200))
+    for _ in range(40):
+        game.update()
+    # particles fall straight down, only those above the rect and the circle die
+    dead = xs[~np.isin(xs, particles.positions[:len(particles), 0])]
+    assert (((dead > 290) & (dead < 310)) | ((dead > 890) & (dead < 910))).all()
+    assert np.isin(xs[((xs > 290) & (xs < 310)) | ((xs > 895) & (xs < 905))], dead).all()
+
+def test_particles_are_drawn_on_screen(world):
+    particles = game.create_particles(capacity=10, size=2, color="red", fade=False, gravity_scale=0.)
+    particles.emit(1, position=(100, 100))
+    fading = game.create_particles(capacity=10, size=2, color=(0, 0, 255, 128), fade=False, gravity_scale=0.)
+    fading.emit(1, position=(200, 100))
+    screen = game.render()
+    height = screen.get_height()
+    assert tuple(screen.get_at((100, height - 100)))[:3] == (255, 0, 0)
+    background, blended = screen.get_at((0, 0)), screen.get_at((200, height - 100))
+    assert blended.b == background.b + (255 - background.b) * 129 // 256 # half way to particle color
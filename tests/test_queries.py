@@ -0,0 +1,71 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from types import SimpleNamespace
+
+import pytest
+
+from pygamejr import game
+
+@pytest.fixture
+def scene():
+    world = game.World()
+    with world:
+        game.start(headless=True, gravity=0)
+        wall = game.create_rect(width=20, height=100, bottom_left=(0, 0), fixed_object=True)
+        level = game.create_level()
+        floor = level[level.add_rect(width=50, height=10, bottom_left=(100, 0))]
+        balls = game.create_circles(centers=[(300, 50), (410, 50), (520, 50)], radii=10, density=1)
+        ship = game.create_compound(center=(650, 50), density=1)
+        nose = ship[ship.add_circle(radius=10, center=(-20, 0))]
+        tail = ship[ship.add_rect(width=20, height=20, center=(20, 0))]
+        game.update()
+        yield SimpleNamespace(wall=wall, floor=floor, balls=[balls[i] for i in range(3)], nose=nose, tail=tail)
+
+def test_actors_in_rect_maps_shapes_to_actors(scene):
+    for exact in (True, False):
+        assert set(game.actors_in_rect((0, 0), (120, 5), exact=exact)) == {scene.wall, scene.floor}
+        assert game.actors_in_rect((400, 40), (420, 60), exact=exact) == [scene.balls[1]]
+        assert game.actors_in_rect((665, 45), (700, 55), exact=exact) == [scene.tail]
+    # box corner is outside the ball although their bounding boxes overlap
+    assert set(game.actors_in_rect((0, 0), (292, 42))) == {scene.wall, scene.floor}
+    assert set(game.actors_in_rect((0, 0), (292, 42), exact=False)) == {scene.wall, scene.floor, scene.balls[0]}
+
+def test_actors_in_radius_nearest_first(scene):
+    assert game.actors_in_radius((400, 50), 100) == [scene.balls[1], scene.balls[0]]
+    assert game.actors_in_radius((400, 50), 100, filter=lambda a: a is not scene.balls[1]) == [scene.balls[0]]
+    assert game.actors_in_radius((125, 15), 10) == [scene.floor]
+
+def test_nearest_actor_skips_filtered_actors(scene):
+    assert game.nearest_actor((600, 50)) is scene.nose
+    assert game.nearest_actor((600, 50), filter=lambda a: a is not scene.nose) is scene.tail
+    assert game.nearest_actor((600, 50), max_distance=10) is None
+    assert game.nearest_actor((60, 50)) is scene.wall
+
+def test_raycast_hits_in_order(scene):
+    hits = game.raycast_all((-50, 50), (800, 50))
+    assert [hit.actor for hit in hits] == [scene.wall, *scene.balls, scene.nose, scene.tail]
+    assert [hit.alpha for hit in hits] == sorted(hit.alpha for hit in hits)
+    first = game.raycast((-50, 50), (800, 50))
+    assert first.actor is scene.wall and first.point.x == pytest.approx(0.)
+    assert game.raycast((-50, 50), (800, 50), filter=lambda a: a is not scene.wall).actor is scene.balls[0]
+    assert game.raycast((50, 5), (800, 5)).actor is scene.floor
+    assert game.raycast((50, 200), (800, 200)) is None
+
+def test_batch_queries_match_single_queries(scene):
+    corners = [((0, 0), (120, 5)), ((400, 40), (420, 60)), ((665, 45), (700, 55))]
+    assert game.actors_in_rects([c[0] for c in corners], [c[1] for c in corners]) == \
+        [game.actors_in_rect(*c) for c in corners]
+    centers = [(400, 50), (125, 15), (900, 900)]
+    assert game.actors_in_radii(centers, [100, 10, 5]) == [game.actors_in_radius(c, r) for c, r in
+                                                          zip(centers, [100, 10, 5])]
+    assert game.actors_in_radii(centers, 100) == [game.actors_in_radius(c, 100) for c in centers]
+    points = [(600, 50), (60, 50), (900, 900)]
+    assert game.nearest_actors(points, max_distance=100) == \
+        [game.nearest_actor(p, max_distance=100) for p in points]
+    starts = [(-50, 50), (50, 5), (50, 200)]
+    hits = game.raycasts(starts, (800, 50))
+    assert [hit.actor if hit else None for hit in hits] == [scene.wall, scene.floor, None]
+    hits = game.raycasts(starts, [(800, 50), (800, 5), (300, 50)])
+    assert [hit.actor if hit else None for hit in hits] == [scene.wall, scene.floor, scene.balls[0]]
@@ -0,0 +1,61 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pytest
+
+from pygamejr import game
+from pygamejr.scripts import Scheduler
+
+@pytest.fixture
+def world():
+    world = game.World()
+    with world:
+        game.start(headless=True)
+        yield world
+
+def run_frames(n):
+    for _ in range(n):
+        game.update()
+
+def test_script_removes_own_actor(world):
+    ball = game.create_circle(radius=10, center=(100, 100))
+    async def despawn():
+        await game.wait(0.05)
+        game.remove(ball)
+    script = game.start_script(despawn, actor=ball)
+    run_frames(10)
+    assert script.done
+    assert ball not in game._actors
+
+def test_script_pools_own_actor(world):
+    pool = game.pool(lambda: game.create_circle(radius=10, center=(100, 100)), 1)
+    ball = pool.acquire()
+    async def despawn():
+        await game.wait(0.05)
+        pool.release(ball)
+        await game.wait(1.) # never resumed, script was cancelled
+        raise AssertionError("script of released actor kept running")
+    script = game.start_script(despawn, actor=ball)
+    run_frames(10)
+    assert script.done
+    assert pool.acquire() is ball
+
+def test_failing_script_keeps_others():
+    scheduler = Scheduler()
+    ran = []
+    def failing():
+        yield None
+        raise ValueError("boom")
+    def other():
+        while True:
+            ran.append(scheduler.time)
+            yield None
+    scheduler.start(failing)
+    scheduler.start(other)
+    scheduler.run(0.1)
+    with pytest.raises(ValueError):
+        scheduler.run(0.1)
+    scheduler.run(0.1)
+    # other script didn't run in the frame that failed but wasn't lost
+    assert ran == pytest.approx([0.1, 0.3])
@@ -0,0 +1,20 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pytest
+
+from pygamejr import game
+
+def particle_travel(time_scale):
+    with game.World():
+        game.start(headless=True, gravity=0)
+        game.set_time_scale(time_scale)
+        particles = game.create_particles(capacity=10, lifetime=100.)
+        particles.emit(1, position=(100, 100), velocity=(60, 0), velocity_spread=0.)
+        for _ in range(30):
+            game.update()
+        return particles.positions[0, 0] - 100
+
+def test_particles_follow_time_scale():
+    assert particle_travel(0.25) == pytest.approx(particle_travel(1.) / 4)
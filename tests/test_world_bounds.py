@@ -0,0 +1,71 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pymunk
+import pytest
+
+from pygamejr import game, BoundsAction
+
+@pytest.fixture
+def world():
+    world = game.World()
+    with world:
+        game.start(headless=True, gravity=0)
+        yield world
+
+def _leave_right(actor, frames=30):
+    actor.velocity = (1000, 0)
+    for _ in range(frames):
+        game.update()
+
+def test_despawn_removes_actors_that_leave(world):
+    exited = []
+    game.set_world_bounds((0, 0), (400, 400), on_exit=exited.append)
+    ball = game.create_circle(radius=10, center=(380, 200), density=1)
+    stays = game.create_circle(radius=10, center=(200, 200), density=1)
+    _leave_right(ball)
+    assert exited == [ball]
+    assert ball.shape.space is None and stays.shape.space is not None
+
+def test_sleep_stops_actors_that_leave(world):
+    game.set_world_bounds((0, 0), (400, 400), action=BoundsAction.SLEEP)
+    ball = game.create_circle(radius=10, center=(380, 200), density=1)
+    platform = game.create_rect(width=20, height=20, center=(380, 100))
+    platform.velocity = (1000, 0)
+    _leave_right(ball)
+    assert ball.shape.body.is_sleeping
+    assert platform.velocity == (0, 0) and platform.shape.space is not None
+    game.unfreeze(ball)
+    assert not ball.shape.body.is_sleeping
+
+def test_freeze_hides_actors_until_unfrozen(world):
+    game.set_world_bounds((0, 0), (400, 400), action=BoundsAction.FREEZE)
+    ball = game.create_circle(radius=10, center=(380, 200), density=1)
+    mass = ball.mass
+    _leave_right(ball)
+    body = ball.shape.body
+    assert body.body_type == pymunk.Body.KINEMATIC and body.velocity == (0, 0)
+    assert ball.is_hidden()
+    game.unfreeze(ball)
+    assert body.body_type == pymunk.Body.DYNAMIC and ball.mass == pytest.approx(mass)
+    assert not ball.is_hidden()
+
+def test_changing_bounds_keeps_frozen_actors(world):
+    game.set_world_bounds((0, 0), (400, 400), action=BoundsAction.FREEZE)
+    ball = game.create_circle(radius=10, center=(380, 200), density=1)
+    other = game.create_circle(radius=10, center=(380, 300), density=1)
+    _leave_right(ball)
+    other.velocity = (0, 0)
+
+    game.set_world_bounds((0, 0), (800, 400), action=BoundsAction.DESPAWN)
+    game.update()
+    assert ball.is_hidden() and ball.shape.space is not None
+    game.unfreeze(ball)
+    assert ball.shape.body.body_type == pymunk.Body.DYNAMIC and not ball.is_hidden()
+
+    game.set_world_bounds((0, 0), (400, 400), action=BoundsAction.FREEZE)
+    _leave_right(other)
+    assert other.is_hidden()
+    game.set_world_bounds(enabled=False)
+    assert other.shape.body.body_type == pymunk.Body.DYNAMIC and not other.is_hidden()
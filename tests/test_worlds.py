@@ -0,0 +1,32 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from pygamejr import game
+
+def test_collision_layers_are_per_world():
+    a, b = game.World(), game.World()
+    with b:
+        game.start(headless=True)
+        ball_b = game.create_circle(radius=10, center=(100, 100), layer="x")
+        mask_b = ball_b.shape.filter.mask
+    with a:
+        game.start(headless=True)
+        game.create_circle(radius=10, center=(100, 100), layer="x")
+        game.set_layers_collide("x", "y", False)
+        assert not game.layers_collide("x", "y")
+    with b:
+        assert game.layers_collide("x", "y")
+        assert ball_b.shape.filter.mask == mask_b
+
+def test_particles_use_layers_of_their_world():
+    with game.World():
+        game.start(headless=True, gravity=0)
+        game.create_line(start_pt=(200, 0), end_pt=(200, 400), radius=2, fixed_object=True, layer="wall")
+        game.set_layers_collide("spark", "wall", False)
+        particles = game.create_particles(capacity=10, lifetime=100., collide=True, layer="spark")
+        particles.emit(1, position=(150, 200), velocity=(300, 0), velocity_spread=0.)
+        for _ in range(30):
+            game.update()
+        assert particles.positions[0, 0] > 200 # went through the wall
+    assert game.layers_collide("spark", "wall")